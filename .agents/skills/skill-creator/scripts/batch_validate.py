@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Batch Skill Validator - Validates every skill under a folder in one run
+
+Usage:
+    python batch_validate.py <path/to/skills-root> [--jobs N] [--format json|junit]
+        [--output report-file] [--cache cache-file] [--no-cache] [--index [index-file]]
+
+Examples:
+    python batch_validate.py .agents/skills
+    python batch_validate.py .agents/skills --format junit --output skills.xml
+
+Every skill folder (a directory containing SKILL.md) is checked with the same
+rules as quick_validate.py, on a process pool. All problems are reported for
+each skill, not just the first. Results are cached by the SHA-256 of SKILL.md
+and the validator version, so unchanged skills are not checked again. The
+default cache lives in $XDG_CACHE_HOME/skill-creator (~/.cache/skill-creator)
+and keeps only the results used by the latest run.
+
+With --index, the results stored in the skill index (see skill_index.py) are
+reported for skills whose files still have their indexed sizes and mtimes,
+and only the other skills are validated (and cached) as above. The index is
+read, not updated; run `skill_index.py update` to refresh it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from quick_validate import VALIDATOR_VERSION, find_problems
+from skill_files import find_skill_dirs, iter_skill_files
+from skill_index import SkillIndex, default_index_path
+
+
+CACHE_VERSION = 1
+
+
+def default_cache_path(filename='validate-cache.json'):
+    """Cache file location, following the XDG base directory convention."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'skill-creator' / filename
+
+
+def load_cache(cache_path):
+    """Load cached results, or an empty cache if missing, unreadable or outdated."""
+    try:
+        cache = json.loads(Path(cache_path).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('results', {})
+
+
+def save_cache(cache_path, results):
+    """Write the cache atomically so concurrent CI jobs never read half a file."""
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'results': results}, sort_keys=True))
+    os.replace(tmp_path, cache_path)
+
+
+def cache_key(skill_md_bytes):
+    """Key a result by SKILL.md contents and the rules that checked them."""
+    return f"{VALIDATOR_VERSION}:{hashlib.sha256(skill_md_bytes).hexdigest()}"
+
+
+def _check_one(skill_dir):
+    """Validate one skill inside a pool worker."""
+    start = time.perf_counter()
+    try:
+        problems = find_problems(skill_dir)
+    except Exception as e:
+        problems = [f"Validator error: {e}"]
+    return problems, time.perf_counter() - start
+
+
+def _indexed_problems(index, skill_dir):
+    """The index's stored problems for a skill whose files are unchanged, else None."""
+    try:
+        files = [(relpath, st) for relpath, _, st in iter_skill_files(skill_dir)]
+    except OSError:
+        return None
+    return index.stored_problems(skill_dir, files)
+
+
+def validate_all(skills_root, jobs=None, cache_path=None, use_cache=True, index_path=None):
+    """
+    Validate every skill under a root folder.
+
+    Args:
+        skills_root: Folder to search for skill folders
+        jobs: Number of worker processes (0 or None for one per CPU)
+        cache_path: Result cache file (defaults to default_cache_path())
+        use_cache: Read cached results; fresh results are always written back
+        index_path: Reuse this skill index's stored results for unchanged skills
+
+    Returns:
+        Report dict with one record per skill and overall counts
+    """
+    skills_root = Path(skills_root).resolve()
+    start = time.perf_counter()
+    cache_path = Path(cache_path) if cache_path else default_cache_path()
+    previous = load_cache(cache_path) if use_cache else {}
+    # Results used in this run land in cache.maps[0]; only those are saved, so
+    # results for old versions of SKILL.md don't pile up
+    cache = ChainMap({}, previous)
+    index = SkillIndex(index_path) if index_path is not None else None
+
+    records = []
+    to_check = []
+    for skill_dir in find_skill_dirs(skills_root):
+        record = {'skill': skill_dir.name, 'path': str(skill_dir)}
+        records.append(record)
+        problems = _indexed_problems(index, skill_dir) if index else None
+        if problems is not None:
+            record.update(problems=problems, cached=True, seconds=0.0)
+            continue
+        try:
+            key = cache_key((skill_dir / 'SKILL.md').read_bytes())
+        except OSError as e:
+            record.update(valid=False, problems=[f"Cannot read SKILL.md: {e}"], cached=False, seconds=0.0)
+            continue
+        record['_key'] = key
+        if key in cache:
+            cache[key] = cache[key]
+            record.update(problems=cache[key], cached=True, seconds=0.0)
+        else:
+            to_check.append(record)
+    if index:
+        index.close()
+
+    if len(to_check) > 1 and jobs != 1:
+        workers = min(jobs or os.cpu_count() or 1, len(to_check))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_check_one, [Path(record['path']) for record in to_check]))
+    else:
+        outcomes = [_check_one(Path(record['path'])) for record in to_check]
+
+    for record, (problems, seconds) in zip(to_check, outcomes):
+        record.update(problems=problems, cached=False, seconds=round(seconds, 6))
+        cache[record['_key']] = problems
+
+    for record in records:
+        record.pop('_key', None)
+        record['valid'] = not record['problems']
+
+    used = cache.maps[0]
+    if used.keys() != previous.keys():
+        try:
+            save_cache(cache_path, used)
+        except OSError as e:
+            print(f"⚠️  Could not write validation cache {cache_path}: {e}", file=sys.stderr)
+
+    return _report(skills_root, records, start)
+
+
+def _report(skills_root, records, start):
+    """Wrap per-skill records in a report with overall counts."""
+    invalid = sum(1 for record in records if not record['valid'])
+    return {
+        'root': str(skills_root),
+        'validator_version': VALIDATOR_VERSION,
+        'seconds': round(time.perf_counter() - start, 4),
+        'counts': {
+            'total': len(records),
+            'valid': len(records) - invalid,
+            'invalid': invalid,
+            'cached': sum(1 for record in records if record['cached']),
+        },
+        'skills': records,
+    }
+
+
+def to_junit(report):
+    """Render a report as JUnit XML, one test case per skill."""
+    counts = report['counts']
+    suite = ET.Element('testsuite', {
+        'name': 'skill-validation',
+        'tests': str(counts['total']),
+        'failures': str(counts['invalid']),
+        'errors': '0',
+        'time': str(report['seconds']),
+    })
+    for record in report['skills']:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': 'skills',
+            'name': record['skill'],
+            'file': record['path'],
+            'time': str(record['seconds']),
+        })
+        if record['problems']:
+            failure = ET.SubElement(case, 'failure', {'message': record['problems'][0]})
+            failure.text = '\n'.join(record['problems'])
+    ET.indent(suite)
+    return ET.tostring(suite, encoding='unicode', xml_declaration=True) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate every skill under a folder and report all problems.",
+    )
+    parser.add_argument('skills_root', help="Folder containing skill folders")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--format', choices=('json', 'junit'), default='json', help="Report format")
+    parser.add_argument('--output', '-o', help="Write the report here instead of stdout")
+    parser.add_argument('--cache', help="Result cache file")
+    parser.add_argument('--no-cache', action='store_true', help="Revalidate every skill")
+    parser.add_argument('--index', nargs='?', const=default_index_path(), metavar='INDEX_FILE',
+                        help="Use the skill index (default location if no file is given)")
+    args = parser.parse_args()
+
+    report = validate_all(
+        args.skills_root,
+        jobs=args.jobs,
+        cache_path=args.cache,
+        use_cache=not args.no_cache,
+        index_path=args.index,
+    )
+    text = to_junit(report) if args.format == 'junit' else json.dumps(report, indent=2) + '\n'
+
+    if args.output:
+        Path(args.output).write_text(text)
+        counts = report['counts']
+        print(
+            f"{'✅' if not counts['invalid'] else '❌'} {counts['valid']}/{counts['total']} skills valid "
+            f"({counts['cached']} from cache), report written to {args.output}"
+        )
+    else:
+        sys.stdout.write(text)
+
+    sys.exit(1 if report['counts']['invalid'] else 0)
+
+
+if __name__ == "__main__":
+    main()
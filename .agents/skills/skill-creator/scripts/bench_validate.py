@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Validator Benchmark - Compares quick_validate against the old full-read path
+
+Usage:
+    python bench_validate.py [--skills N] [--body-kb N] [--repeat N] [--startup-runs N]
+
+Builds a temporary corpus of skills with realistic frontmatter and large
+bodies, then times:
+
+- per-skill validation: the old approach (read the whole file, regex out the
+  frontmatter, parse with PyYAML) against find_problems(), which reads only
+  the frontmatter and parses the flat subset without PyYAML
+- startup: a fresh interpreter importing quick_validate, with and without
+  PyYAML being imported as well (the old module imported it unconditionally)
+
+Both paths are checked to produce the same frontmatter for every skill.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from quick_validate import find_problems, parse_frontmatter, read_frontmatter
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+FRONTMATTERS = [
+    "name: {name}\ndescription: Build and debug {name} integrations. Use when wiring up the client, "
+    "fixing protocol bugs, or mapping product UX to API calls.",
+    "name: {name}\ndescription: 'Guidance for {name}: setup, configuration and common pitfalls.'\n"
+    "license: Complete terms in LICENSE.txt",
+    "name: {name}\ndescription: Production guidance for {name} in Vite React projects.\n"
+    "allowed-tools: Bash Read Write\ncompatibility: Requires Python 3.10+\n"
+    "metadata:\n  author: example-org\n  version: \"1.2\"",
+]
+
+
+def legacy_frontmatter(skill_md):
+    """The old path: whole-file read, DOTALL regex, PyYAML."""
+    import yaml
+    content = skill_md.read_text()
+    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
+    return yaml.safe_load(match.group(1))
+
+
+def build_corpus(root, count, body_kb):
+    """Write count skills with body_kb kilobytes of body each."""
+    paragraph = "Explain the workflow step by step and link to the references folder. " * 14 + "\n\n"
+    body = paragraph * max(1, body_kb * 1024 // len(paragraph))
+    skills = []
+    for index in range(count):
+        name = f"bench-skill-{index}"
+        skill_dir = root / name
+        skill_dir.mkdir()
+        frontmatter = FRONTMATTERS[index % len(FRONTMATTERS)].format(name=name)
+        (skill_dir / 'SKILL.md').write_text(f"---\n{frontmatter}\n---\n\n# {name}\n\n{body}")
+        skills.append(skill_dir)
+    return skills
+
+
+def time_per_skill(func, skills, repeat):
+    """Best-of-repeat total time for one pass over all skills, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for skill_dir in skills:
+            func(skill_dir)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def time_startup(code, runs):
+    """Median wall time of a fresh interpreter running code, in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quick_validate against the old full-read path.")
+    parser.add_argument('--skills', type=int, default=200, help="Skills in the corpus")
+    parser.add_argument('--body-kb', type=int, default=64, help="Body size of each SKILL.md in KB")
+    parser.add_argument('--repeat', type=int, default=5, help="Passes over the corpus (best is reported)")
+    parser.add_argument('--startup-runs', type=int, default=15, help="Interpreter launches per startup case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        skills = build_corpus(Path(tmp), args.skills, args.body_kb)
+
+        for skill_dir in skills:
+            with open(skill_dir / 'SKILL.md') as f:
+                frontmatter, _ = parse_frontmatter(read_frontmatter(f)[0])
+            if frontmatter != legacy_frontmatter(skill_dir / 'SKILL.md'):
+                print(f"❌ Frontmatter mismatch for {skill_dir.name}")
+                sys.exit(1)
+            if find_problems(skill_dir):
+                print(f"❌ Unexpected problems for {skill_dir.name}: {find_problems(skill_dir)}")
+                sys.exit(1)
+
+        legacy = time_per_skill(lambda d: legacy_frontmatter(d / 'SKILL.md'), skills, args.repeat)
+        current = time_per_skill(find_problems, skills, args.repeat)
+
+    startup_with_yaml = time_startup('import yaml, quick_validate', args.startup_runs)
+    startup = time_startup('import quick_validate', args.startup_runs)
+    lazy = subprocess.run(
+        [sys.executable, '-c', "import sys, quick_validate; print('yaml' in sys.modules)"],
+        cwd=SCRIPTS_DIR, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+    print(f"📊 {args.skills} skills, {args.body_kb} KB body each")
+    print(f"  Per skill, old path:  {legacy / args.skills * 1e6:8.1f} µs")
+    print(f"  Per skill, new path:  {current / args.skills * 1e6:8.1f} µs ({legacy / current:.1f}x faster)")
+    print(f"  Startup with PyYAML:  {startup_with_yaml * 1000:8.1f} ms")
+    print(f"  Startup, lazy import: {startup * 1000:8.1f} ms "
+          f"({(startup_with_yaml - startup) * 1000:.1f} ms saved)")
+    print(f"  PyYAML imported at startup: {lazy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Context Cost Profiler - Measures how much agent context a skill uses
+
+Usage:
+    python context_cost.py <path/to/skill-or-skills-root> [--format text|json]
+        [--budget KEY=VALUE ...] [--no-default-budgets] [--cache cache-file] [--no-cache]
+
+Examples:
+    python context_cost.py .agents/skills/my-skill
+    python context_cost.py .agents/skills --budget body_tokens=4000 --budget reference_lines=1000
+
+Skills load in three levels: the metadata (name and description) is always in
+context, the SKILL.md body is loaded when the skill triggers, and files in
+references/ are loaded as needed. Each level is reported in lines, words,
+bytes and approximate tokens.
+
+Budgets are KEY=VALUE pairs where KEY is <section>_<unit>:
+    section: metadata, body, reference (each file) or references (all files)
+    unit:    lines, words, bytes or tokens
+The defaults follow the skill-creator guidance (metadata_words=100,
+body_lines=500, body_words=5000). Any skill over budget makes the exit code
+non-zero.
+
+Measurements are cached by file SHA-256 in $XDG_CACHE_HOME/skill-creator, so
+rerunning over a whole skills tree only re-measures files that changed. The
+cache keeps only the measurements used by the latest run.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import re
+import sys
+from collections import ChainMap
+from pathlib import Path
+from batch_validate import default_cache_path, load_cache, save_cache
+from quick_validate import parse_frontmatter, read_frontmatter
+from skill_files import find_skill_dirs, iter_skill_files
+
+
+# Bump when measure() or approx_tokens() change, so cached sizes are discarded
+PROFILER_VERSION = 1
+
+SECTIONS = ('metadata', 'body', 'reference', 'references')
+UNITS = ('lines', 'words', 'bytes', 'tokens')
+
+DEFAULT_BUDGETS = {
+    'metadata_words': 100,
+    'body_lines': 500,
+    'body_words': 5000,
+}
+
+# Letter runs, digit runs, punctuation runs and whitespace runs, roughly the
+# pieces a BPE tokenizer splits text into before merging
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|[^\w\s]+|_+|\s+")
+
+
+def approx_tokens(text):
+    """
+    Approximate the token count of text without a tokenizer model.
+
+    Common English words are one token and long words a few more; digits go
+    three to a token and punctuation about two characters to a token. Single
+    spaces merge into the following word, other whitespace runs cost one.
+    Non-ASCII text is counted by UTF-8 length, about one token per CJK
+    character. Good enough for budgeting, not for billing.
+    """
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        first = piece[0]
+        if first.isspace():
+            if piece != ' ':
+                tokens += 1
+        elif not piece.isascii():
+            tokens += math.ceil(len(piece.encode('utf-8')) / 3)
+        elif first.isalpha():
+            tokens += 1 + (len(piece) - 1) // 8
+        elif first.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def measure(text):
+    """Size of text in every unit."""
+    return {
+        'lines': text.count('\n') + (1 if text and not text.endswith('\n') else 0),
+        'words': len(text.split()),
+        'bytes': len(text.encode('utf-8')),
+        'tokens': approx_tokens(text),
+    }
+
+
+def measure_skill_md(text):
+    """
+    Split SKILL.md into its always-loaded metadata and its body, and measure both.
+
+    Only name and description count as metadata, since they are all an agent
+    sees before the skill triggers.
+    """
+    stream = io.StringIO(text)
+    frontmatter_text, error = read_frontmatter(stream)
+    if error:
+        return {'metadata': measure(''), 'body': measure(text)}
+    body = stream.read()
+
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if error:
+        metadata = frontmatter_text
+    else:
+        metadata = '\n'.join(
+            f"{key}: {frontmatter[key]}" for key in ('name', 'description') if key in frontmatter
+        )
+    return {'metadata': measure(metadata), 'body': measure(body)}
+
+
+def _cached_measure(cache, kind, data, func):
+    """Measure file contents once per (kind, hash) and remember the result."""
+    key = f"{PROFILER_VERSION}:{kind}:{hashlib.sha256(data).hexdigest()}"
+    # Stored again on hits too, so a ChainMap cache collects the keys in use
+    cache[key] = cache[key] if key in cache else func(data.decode('utf-8', errors='replace'))
+    return cache[key]
+
+
+def profile_skill(skill_dir, cache):
+    """
+    Measure one skill.
+
+    Args:
+        skill_dir: Skill folder containing SKILL.md
+        cache: Dict of cached measurements, updated in place
+
+    Returns:
+        Profile dict with metadata, body, per-file references and their total
+    """
+    skill_dir = Path(skill_dir)
+    skill_md = _cached_measure(cache, 'skill', (skill_dir / 'SKILL.md').read_bytes(), measure_skill_md)
+
+    references = []
+    for relpath, path, _ in sorted(iter_skill_files(skill_dir)):
+        if relpath.startswith('references/'):
+            sizes = _cached_measure(cache, 'text', Path(path).read_bytes(), measure)
+            references.append({'path': relpath, **sizes})
+
+    total = {unit: sum(reference[unit] for reference in references) for unit in UNITS}
+    return {
+        'skill': skill_dir.name,
+        'path': str(skill_dir),
+        'metadata': skill_md['metadata'],
+        'body': skill_md['body'],
+        'references': references,
+        'references_total': total,
+    }
+
+
+def check_budgets(profile, budgets):
+    """Return a message for every budget the profile exceeds."""
+    problems = []
+    for key, limit in sorted(budgets.items()):
+        section, unit = key.split('_', 1)
+        if section == 'reference':
+            measured = [(reference['path'], reference[unit]) for reference in profile['references']]
+        elif section == 'references':
+            measured = [('references/', profile['references_total'][unit])]
+        else:
+            measured = [(section, profile[section][unit])]
+        for label, value in measured:
+            if value > limit:
+                problems.append(f"{label} has {value} {unit}, budget is {limit} ({key})")
+    return problems
+
+
+def parse_budget(text):
+    """Parse a KEY=VALUE budget, e.g. 'body_tokens=4000'."""
+    key, sep, value = text.partition('=')
+    key = key.strip()
+    section, _, unit = key.partition('_')
+    if not sep or section not in SECTIONS or unit not in UNITS:
+        raise argparse.ArgumentTypeError(
+            f"invalid budget {text!r}; expected <section>_<unit>=N with section in "
+            f"{', '.join(SECTIONS)} and unit in {', '.join(UNITS)}"
+        )
+    try:
+        return key, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid budget value in {text!r}")
+
+
+def profile_all(root, budgets, cache_path=None, use_cache=True):
+    """
+    Profile one skill, or every skill under a root folder.
+
+    Args:
+        root: Skill folder, or a folder to search for skill folders
+        budgets: Dict of budget key to limit
+        cache_path: Measurement cache file (defaults to the XDG cache)
+        use_cache: Read cached measurements; fresh ones are always written back
+
+    Returns:
+        List of profiles, each with a 'problems' list of exceeded budgets
+    """
+    root = Path(root).resolve()
+    cache_path = Path(cache_path) if cache_path else default_cache_path('context-cache.json')
+    previous = load_cache(cache_path) if use_cache else {}
+    # Measurements used in this run land in cache.maps[0]; only those are saved,
+    # so entries for files that changed or went away don't pile up
+    cache = ChainMap({}, previous)
+
+    skill_dirs = [root] if (root / 'SKILL.md').is_file() else find_skill_dirs(root)
+    profiles = []
+    for skill_dir in skill_dirs:
+        profile = profile_skill(skill_dir, cache)
+        profile['problems'] = check_budgets(profile, budgets)
+        profiles.append(profile)
+
+    used = cache.maps[0]
+    if used.keys() != previous.keys():
+        try:
+            save_cache(cache_path, used)
+        except OSError as e:
+            print(f"⚠️  Could not write context cost cache {cache_path}: {e}", file=sys.stderr)
+    return profiles
+
+
+def format_profile(profile):
+    """Render one profile as a small text table."""
+    def row(label, sizes):
+        return (
+            f"  {label:<44} {sizes['lines']:>7} {sizes['words']:>8} "
+            f"{sizes['bytes']:>9} {sizes['tokens']:>8}"
+        )
+
+    triggered = profile['metadata']['tokens'] + profile['body']['tokens']
+    lines = [
+        f"📏 {profile['skill']} (~{profile['metadata']['tokens']} tokens always loaded, "
+        f"~{triggered} when triggered)",
+        f"  {'Section':<44} {'Lines':>7} {'Words':>8} {'Bytes':>9} {'~Tokens':>8}",
+        row('metadata (name + description)', profile['metadata']),
+        row('body (SKILL.md)', profile['body']),
+    ]
+    for reference in profile['references']:
+        lines.append(row(reference['path'], reference))
+    if profile['references']:
+        lines.append(row(f"references total ({len(profile['references'])} files)", profile['references_total']))
+    for problem in profile['problems']:
+        lines.append(f"  ❌ {problem}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report how much agent context each skill uses.")
+    parser.add_argument('path', help="Skill folder, or a folder containing skill folders")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="Report format")
+    parser.add_argument('--budget', action='append', type=parse_budget, default=[], metavar='KEY=VALUE',
+                        help="Fail when a size exceeds this budget (repeatable)")
+    parser.add_argument('--no-default-budgets', action='store_true', help="Only apply budgets given with --budget")
+    parser.add_argument('--cache', help="Measurement cache file")
+    parser.add_argument('--no-cache', action='store_true', help="Re-measure every file")
+    args = parser.parse_args()
+
+    budgets = {} if args.no_default_budgets else dict(DEFAULT_BUDGETS)
+    budgets.update(args.budget)
+
+    profiles = profile_all(args.path, budgets, cache_path=args.cache, use_cache=not args.no_cache)
+    if args.format == 'json':
+        print(json.dumps({'budgets': budgets, 'skills': profiles}, indent=2))
+    else:
+        print('\n\n'.join(format_profile(profile) for profile in profiles))
+
+    over = sum(1 for profile in profiles if profile['problems'])
+    if args.format == 'text':
+        print(f"\n{'❌' if over else '✅'} {len(profiles) - over}/{len(profiles)} skills within budget")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,48 @@
 Skill Initializer - Creates a new skill from template
 
 Usage:
-    init_skill.py <skill-name> --path <path>
+    init_skill.py <skill-name> --path <path> [--resources scripts,references,assets]
+    init_skill.py --manifest <skills.json|skills.yaml> [--path <path>] [--resources ...] [--jobs N]
 
 Examples:
     init_skill.py my-new-skill --path skills/public
     init_skill.py my-api-helper --path skills/private
     init_skill.py custom-skill --path /custom/location
+    init_skill.py lean-skill --path skills/public --resources references
+    init_skill.py --manifest onboarding.yaml --path skills/public
+
+A manifest lists many skills to create in one all-or-nothing run:
+
+    path: skills/public            # optional, relative to the manifest
+    resources: [scripts, references]   # optional default for every skill
+    skills:
+      - first-skill
+      - name: second-skill
+        description: What the skill does and when to use it
+        resources: [assets]
+        path: skills/private       # optional, per skill
+
+Every skill is rendered in memory, written to a staging directory next to
+its destination and renamed into place. Nothing is created unless every
+skill in the manifest is valid and staged, and a failed rename rolls back the
+skills already moved, so a run never leaves partial skill folders behind.
 """
 
+import argparse
+import json
+import os
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from quick_validate import check_frontmatter
 
 
 SKILL_TEMPLATE = """---
 name: {skill_name}
-description: [TODO: Complete and informative explanation of what the skill does and when to use it. Include WHEN to use this skill - specific scenarios, file types, or tasks that trigger it.]
+description: {description}
 ---
 
 # {skill_title}
@@ -102,6 +129,11 @@ Files not intended to be loaded into context, but rather used within the output
 **Any unneeded directories can be deleted.** Not every skill requires all three types of resources.
 """
 
+DEFAULT_DESCRIPTION = (
+    "[TODO: Complete and informative explanation of what the skill does and when to use it. "
+    "Include WHEN to use this skill - specific scenarios, file types, or tasks that trigger it.]"
+)
+
 EXAMPLE_SCRIPT = '''#!/usr/bin/env python3
 """
 Example helper script for {skill_name}
@@ -191,13 +223,92 @@ def title_case_skill_name(skill_name):
     return ' '.join(word.capitalize() for word in skill_name.split('-'))
 
 
-def init_skill(skill_name, path):
+RESOURCE_TYPES = ('scripts', 'references', 'assets')
+
+
+def render_skill(skill_name, resources=RESOURCE_TYPES, description=None):
+    """
+    Render every file of a new skill in memory.
+
+    Args:
+        skill_name: Name of the skill
+        resources: Which example resource directories to include
+        description: Optional description for the frontmatter (a TODO otherwise)
+
+    Returns:
+        List of (relative path, content, mode) tuples, SKILL.md first
+    """
+    skill_title = title_case_skill_name(skill_name)
+    # A JSON string is also a valid YAML double-quoted scalar
+    description = json.dumps(description, ensure_ascii=False) if description else DEFAULT_DESCRIPTION
+    files = [(
+        'SKILL.md',
+        SKILL_TEMPLATE.format(skill_name=skill_name, skill_title=skill_title, description=description),
+        None,
+    )]
+    if 'scripts' in resources:
+        files.append(('scripts/example.py', EXAMPLE_SCRIPT.format(skill_name=skill_name), 0o755))
+    if 'references' in resources:
+        files.append(('references/api_reference.md', EXAMPLE_REFERENCE.format(skill_title=skill_title), None))
+    if 'assets' in resources:
+        files.append(('assets/example_asset.txt', EXAMPLE_ASSET, None))
+    return files
+
+
+def write_rendered(skill_dir, files):
+    """Write rendered files under skill_dir, which must not exist yet."""
+    skill_dir.mkdir()
+    for relpath, content, mode in files:
+        file_path = skill_dir / relpath
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_text(content)
+        if mode is not None:
+            file_path.chmod(mode)
+
+
+def check_new_skill(skill_name, skill_dir, resources, description=None):
+    """Return every reason the skill can't be created (empty if it can)."""
+    frontmatter = {'name': skill_name, 'description': description or 'placeholder'}
+    problems = check_frontmatter(frontmatter)
+    unknown = sorted(set(resources) - set(RESOURCE_TYPES))
+    if unknown:
+        problems.append(
+            f"Unknown resource type(s): {', '.join(unknown)}. Choose from: {', '.join(RESOURCE_TYPES)}"
+        )
+    if skill_dir.exists():
+        problems.append(f"Skill directory already exists: {skill_dir}")
+    return problems
+
+
+def parse_resources(text):
+    """Parse a comma-separated resource list; 'none' or an empty string means none."""
+    if text.strip().lower() == 'none':
+        return ()
+    return tuple(item.strip() for item in text.split(',') if item.strip())
+
+
+def _print_next_steps(resources):
+    print("\nNext steps:")
+    print("1. Edit SKILL.md to complete the TODO items and update the description")
+    if resources:
+        print(f"2. Customize or delete the example files in {', '.join(f'{r}/' for r in resources)}")
+        print("3. Run the validator when ready to check the skill structure")
+    else:
+        print("2. Run the validator when ready to check the skill structure")
+
+
+def init_skill(skill_name, path, resources=RESOURCE_TYPES, description=None):
     """
     Initialize a new skill directory with template SKILL.md.
 
+    The skill is written to a staging directory next to its destination and
+    renamed into place, so a failure never leaves a partial skill behind.
+
     Args:
         skill_name: Name of the skill
         path: Path where the skill directory should be created
+        resources: Which example resource directories to include
+        description: Optional description for the frontmatter
 
     Returns:
         Path to created skill directory, or None if error
@@ -210,88 +321,240 @@ def init_skill(skill_name, path):
         print(f"❌ Error: Skill directory already exists: {skill_dir}")
         return None
 
-    # Create skill directory
-    try:
-        skill_dir.mkdir(parents=True, exist_ok=False)
-        print(f"✅ Created skill directory: {skill_dir}")
-    except Exception as e:
-        print(f"❌ Error creating directory: {e}")
-        return None
+    files = render_skill(skill_name, resources, description)
 
-    # Create SKILL.md from template
-    skill_title = title_case_skill_name(skill_name)
-    skill_content = SKILL_TEMPLATE.format(
-        skill_name=skill_name,
-        skill_title=skill_title
-    )
-
-    skill_md_path = skill_dir / 'SKILL.md'
+    staging_dir = None
     try:
-        skill_md_path.write_text(skill_content)
-        print("✅ Created SKILL.md")
+        skill_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(prefix='.init-skill-', dir=skill_dir.parent))
+        write_rendered(staging_dir / skill_name, files)
+        os.rename(staging_dir / skill_name, skill_dir)
     except Exception as e:
-        print(f"❌ Error creating SKILL.md: {e}")
+        print(f"❌ Error creating skill: {e}")
         return None
+    finally:
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
-    # Create resource directories with example files
-    try:
-        # Create scripts/ directory with example script
-        scripts_dir = skill_dir / 'scripts'
-        scripts_dir.mkdir(exist_ok=True)
-        example_script = scripts_dir / 'example.py'
-        example_script.write_text(EXAMPLE_SCRIPT.format(skill_name=skill_name))
-        example_script.chmod(0o755)
-        print("✅ Created scripts/example.py")
-
-        # Create references/ directory with example reference doc
-        references_dir = skill_dir / 'references'
-        references_dir.mkdir(exist_ok=True)
-        example_reference = references_dir / 'api_reference.md'
-        example_reference.write_text(EXAMPLE_REFERENCE.format(skill_title=skill_title))
-        print("✅ Created references/api_reference.md")
-
-        # Create assets/ directory with example asset placeholder
-        assets_dir = skill_dir / 'assets'
-        assets_dir.mkdir(exist_ok=True)
-        example_asset = assets_dir / 'example_asset.txt'
-        example_asset.write_text(EXAMPLE_ASSET)
-        print("✅ Created assets/example_asset.txt")
-    except Exception as e:
-        print(f"❌ Error creating resource directories: {e}")
-        return None
+    print(f"✅ Created skill directory: {skill_dir}")
+    for relpath, _, _ in files:
+        print(f"✅ Created {relpath}")
 
     # Print next steps
     print(f"\n✅ Skill '{skill_name}' initialized successfully at {skill_dir}")
-    print("\nNext steps:")
-    print("1. Edit SKILL.md to complete the TODO items and update the description")
-    print("2. Customize or delete the example files in scripts/, references/, and assets/")
-    print("3. Run the validator when ready to check the skill structure")
+    _print_next_steps(resources)
 
     return skill_dir
 
 
+def load_skill_manifest(manifest_path, default_path=None, default_resources=RESOURCE_TYPES):
+    """
+    Read a JSON or YAML manifest of skills to create.
+
+    The manifest is either a list of skills or a mapping with a 'skills' list
+    and optional 'path' and 'resources' defaults. Each skill is a name or a
+    mapping with 'name' and optional 'description', 'resources' and 'path'.
+    Paths in the manifest are relative to the manifest's folder.
+
+    Returns:
+        List of dicts with name, skill_dir, resources and description
+
+    Raises:
+        ValueError: If the manifest can't be read or has the wrong shape
+    """
+    manifest_path = Path(manifest_path)
+    text = manifest_path.read_text()
+    if manifest_path.suffix == '.json':
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON in {manifest_path}: {e}")
+    else:
+        import yaml
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {manifest_path}: {e}")
+
+    if isinstance(data, list):
+        data = {'skills': data}
+    if not isinstance(data, dict) or not isinstance(data.get('skills'), list):
+        raise ValueError("Manifest must be a list of skills or a mapping with a 'skills' list")
+
+    base_dir = manifest_path.resolve().parent
+
+    def resolve(path):
+        return base_dir / path if path is not None else None
+
+    root = resolve(data.get('path')) or (Path(default_path) if default_path else None)
+    resources = data.get('resources', default_resources)
+
+    specs = []
+    for index, entry in enumerate(data['skills']):
+        if isinstance(entry, str):
+            entry = {'name': entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get('name'), str):
+            raise ValueError(f"Skill #{index + 1} must be a name or a mapping with a 'name'")
+        parent = resolve(entry.get('path')) or root
+        if parent is None:
+            raise ValueError(f"No path for skill '{entry['name']}'; set 'path' in the manifest or pass --path")
+        entry_resources = entry.get('resources', resources)
+        if isinstance(entry_resources, str):
+            entry_resources = parse_resources(entry_resources)
+        specs.append({
+            'name': entry['name'],
+            'skill_dir': parent.resolve() / entry['name'],
+            'resources': tuple(entry_resources or ()),
+            'description': entry.get('description'),
+        })
+    return specs
+
+
+def init_skills(specs, jobs=None):
+    """
+    Create many skills at once, all or nothing.
+
+    Every skill is checked and rendered before anything is written. Skills are
+    then staged on a thread pool in one staging directory per destination
+    folder, and renamed into place only once all of them are staged. If a
+    rename fails, the skills already moved are moved back.
+
+    Args:
+        specs: Skills as returned by load_skill_manifest()
+        jobs: Number of writer threads (0 or None for one per CPU)
+
+    Returns:
+        List of created skill directories, or None if error
+    """
+    start = time.perf_counter()
+
+    problems = []
+    seen = set()
+    for spec in specs:
+        for problem in check_new_skill(spec['name'], spec['skill_dir'], spec['resources'], spec['description']):
+            problems.append(f"{spec['name']}: {problem}")
+        if spec['skill_dir'] in seen:
+            problems.append(f"{spec['name']}: Listed more than once for {spec['skill_dir']}")
+        seen.add(spec['skill_dir'])
+    if not specs:
+        problems.append("Manifest lists no skills")
+    if problems:
+        print("❌ Error: Nothing was created:")
+        for problem in problems:
+            print(f"   {problem}")
+        return None
+
+    rendered = [render_skill(spec['name'], spec['resources'], spec['description']) for spec in specs]
+    render_seconds = time.perf_counter() - start
+
+    staging_dirs = {}
+    moved = []
+    try:
+        for spec in specs:
+            parent = spec['skill_dir'].parent
+            if parent not in staging_dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                staging_dirs[parent] = Path(tempfile.mkdtemp(prefix='.init-skill-', dir=parent))
+        staged = [staging_dirs[spec['skill_dir'].parent] / spec['name'] for spec in specs]
+
+        stage_start = time.perf_counter()
+        workers = min(jobs or os.cpu_count() or 1, len(specs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write_rendered, staged, rendered))
+        stage_seconds = time.perf_counter() - stage_start
+
+        commit_start = time.perf_counter()
+        for staged_dir, spec in zip(staged, specs):
+            if spec['skill_dir'].exists():
+                raise FileExistsError(f"Skill directory appeared while staging: {spec['skill_dir']}")
+            os.rename(staged_dir, spec['skill_dir'])
+            moved.append((staged_dir, spec['skill_dir']))
+        commit_seconds = time.perf_counter() - commit_start
+    except Exception as e:
+        for staged_dir, skill_dir in reversed(moved):
+            try:
+                os.rename(skill_dir, staged_dir)
+            except OSError as rollback_error:
+                print(f"⚠️  Could not roll back {skill_dir}: {rollback_error}")
+        print(f"❌ Error: Nothing was created: {e}")
+        return None
+    finally:
+        for staging_dir in staging_dirs.values():
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    created = [spec['skill_dir'] for spec in specs]
+    for skill_dir in created:
+        print(f"✅ Created {skill_dir}")
+    total_files = sum(len(files) for files in rendered)
+    print(
+        f"\n✅ Initialized {len(created)} skills ({total_files} files) in "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms: render {render_seconds * 1000:.1f} ms, "
+        f"stage {stage_seconds * 1000:.1f} ms on {workers} thread{'s' if workers != 1 else ''}, commit {commit_seconds * 1000:.1f} ms"
+    )
+    return created
+
+
 def main():
-    if len(sys.argv) < 4 or sys.argv[2] != '--path':
-        print("Usage: init_skill.py <skill-name> --path <path>")
-        print("\nSkill name requirements:")
-        print("  - Kebab-case identifier (e.g., 'my-data-analyzer')")
-        print("  - Lowercase letters, digits, and hyphens only")
-        print("  - Max 64 characters")
-        print("  - Must match directory name exactly")
-        print("\nExamples:")
-        print("  init_skill.py my-new-skill --path skills/public")
-        print("  init_skill.py my-api-helper --path skills/private")
-        print("  init_skill.py custom-skill --path /custom/location")
+    parser = argparse.ArgumentParser(
+        description="Create a new skill from template, or many skills from a manifest.",
+        epilog=(
+            "Skill name requirements:\n"
+            "  - Kebab-case identifier (e.g., 'my-data-analyzer')\n"
+            "  - Lowercase letters, digits, and hyphens only\n"
+            "  - Max 64 characters\n"
+            "  - Must match directory name exactly\n"
+            "\n"
+            "Examples:\n"
+            "  init_skill.py my-new-skill --path skills/public\n"
+            "  init_skill.py my-api-helper --path skills/private\n"
+            "  init_skill.py custom-skill --path /custom/location\n"
+            "  init_skill.py --manifest onboarding.yaml --path skills/public"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('skill_name', nargs='?', help="Name of the skill to create")
+    parser.add_argument('--path', help="Directory to create the skill in (default for --manifest)")
+    parser.add_argument('--manifest', help="JSON or YAML list of skills to create in one all-or-nothing run")
+    parser.add_argument(
+        '--resources',
+        type=parse_resources,
+        default=RESOURCE_TYPES,
+        help="Comma-separated example resources to include: scripts, references, assets, or none "
+             "(default: all three)",
+    )
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Writer threads for --manifest "
+                                                                     "(default: one per CPU)")
+    args = parser.parse_args()
+
+    if args.manifest:
+        if args.skill_name:
+            parser.error("give either a skill name or --manifest, not both")
+        print(f"🚀 Initializing skills from manifest: {args.manifest}")
+        print()
+        try:
+            specs = load_skill_manifest(args.manifest, args.path, args.resources)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        result = init_skills(specs, jobs=args.jobs)
+        sys.exit(0 if result else 1)
+
+    if not args.skill_name or not args.path:
+        parser.print_help()
         sys.exit(1)
 
-    skill_name = sys.argv[1]
-    path = sys.argv[3]
+    unknown = sorted(set(args.resources) - set(RESOURCE_TYPES))
+    if unknown:
+        parser.error(f"unknown resource type(s): {', '.join(unknown)}")
+
+    skill_name = args.skill_name
+    path = args.path
 
     print(f"🚀 Initializing skill: {skill_name}")
     print(f"   Location: {path}")
     print()
 
-    result = init_skill(skill_name, path)
+    result = init_skill(skill_name, path, args.resources)
 
     if result:
         sys.exit(0)
@@ -4,25 +4,598 @@ Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
     python utils/package_skill.py <path/to/skill-folder> [output-directory]
+        [--no-cache] [--jobs N] [--report report.json]
+        [--max-file-size SIZE] [--max-total-size SIZE] [--delta-from previous.skill]
+        [--index [index-file]]
+    python utils/package_skill.py --all <path/to/skills-root> <output-directory> [--jobs N]
+        [--index [index-file]]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py skills/public/my-skill ./dist --no-cache
+    python utils/package_skill.py skills/public/my-skill ./dist --jobs 8
+    python utils/package_skill.py --all .agents/skills ./dist
+
+Archives are deterministic: entries are sorted and carry a fixed timestamp, so
+the same skill contents always produce the same bytes. A manifest with per-file
+SHA-256 hashes is written next to the .skill file (<name>.skill.manifest.json).
+On the next run unchanged skills are skipped entirely, and unchanged files are
+copied from the previous archive without being recompressed.
+
+Files matching the skill's .skillignore (gitignore syntax) are not packaged,
+nor are .git/, __pycache__/, node_modules/, virtualenvs and similar clutter.
+
+Each file is stored or deflated according to a per-file codec policy: formats
+that are already compressed (images, fonts, nested archives) and data that a
+quick trial pass can't shrink are stored as-is, text is deflated at level 9 and
+everything else at level 6. Files are compressed on a thread pool (--jobs) and
+written in sorted order, so the output does not depend on the job count.
+Files of 8 MiB or more are streamed into the archive in 1 MiB chunks, so peak
+memory stays bounded whatever the asset sizes; ZIP64 is used when needed.
+--max-file-size and --max-total-size fail the run before anything is read.
+--delta-from also writes a <name>.skillpatch holding only the entries that
+differ from a previous release (see skill_delta.py). --index reuses the
+validation result and file hashes stored in the skill index (skill_index.py)
+when the skill's files still have their indexed sizes and mtimes; run
+`skill_index.py update` to refresh it.
+
+With --all, every skill folder (a directory containing SKILL.md) under the
+given root is validated and packaged on a process pool, and a JSON summary is
+printed with the status, archive size and elapsed time of each skill. The exit
+code is non-zero if any skill fails.
 """
 
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import stat
+import struct
 import sys
+import time
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from quick_validate import validate_skill
+from skill_files import find_skill_dirs, hash_file, iter_skill_files
+from skill_index import SkillIndex, default_index_path
+
+
+# Every entry gets the earliest timestamp a zip file can hold, so that archive
+# bytes depend only on file names, modes and contents.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+# Bump when choose_codec() changes, so cached entries are recompressed
+CODEC_POLICY_VERSION = 1
+
+# Formats that are already compressed; deflating them again only burns CPU
+STORED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.heic', '.ico',
+    '.woff', '.woff2',
+    '.zip', '.skill', '.jar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub',
+    '.mp3', '.mp4', '.m4a', '.ogg', '.webm', '.mov', '.pdf',
+})
+
+# Text formats compress well enough that the extra effort of level 9 is worth it
+TEXT_EXTENSIONS = frozenset({
+    '.md', '.txt', '.py', '.sh', '.js', '.ts', '.json', '.yaml', '.yml', '.toml',
+    '.html', '.css', '.xml', '.svg', '.csv',
+})
+
+# Files at least this large are streamed into the archive in CHUNK_SIZE pieces
+# on the writer thread instead of being read whole by a pool worker
+STREAM_THRESHOLD = 8 * 1024 * 1024
+# Upper bound on file bytes handed to pool workers but not yet written out
+MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+
+# Trial-compress this much of each file to measure compressibility
+SAMPLE_SIZE = 64 * 1024
+# Store files whose trial pass saves less than this fraction of their size
+MIN_SAVINGS = 0.05
+
+# Indices into zipfile.structFileHeader for the variable-length header fields
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+
+
+def collect_files(skill_path):
+    """
+    List the files to package, sorted by archive name.
+
+    Paths matched by the built-in ignore list or the skill's .skillignore are
+    left out (see skill_files.py).
+
+    Returns:
+        List of (arcname, file_path, stat_result) tuples
+    """
+    files = [
+        (f"{skill_path.name}/{relpath}", file_path, st)
+        for relpath, file_path, st in iter_skill_files(skill_path)
+    ]
+    files.sort(key=lambda item: item[0])
+    return files
+
+
+def file_mode(st):
+    """Normalize permissions to 0o755 or 0o644 so archives don't depend on umask."""
+    return 0o755 if st.st_mode & 0o111 else 0o644
+
+
+def make_zip_info(arcname, mode, file_size, compress_type=zipfile.ZIP_DEFLATED):
+    """Build a ZipInfo whose metadata depends only on name, mode and size."""
+    zinfo = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+    zinfo.create_system = 3  # Unix, so external_attr carries the mode bits
+    zinfo.external_attr = (stat.S_IFREG | mode) << 16
+    zinfo.compress_type = compress_type
+    zinfo.file_size = file_size
+    return zinfo
+
+
+def manifest_path_for(skill_filename):
+    """Return the manifest path stored next to a .skill file."""
+    return skill_filename.with_name(skill_filename.name + MANIFEST_SUFFIX)
+
+
+def load_manifest(manifest_path):
+    """Load a packaging manifest, or None if it is missing or unusable."""
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a sibling temp file, then rename it over the target."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+    os.replace(tmp_path, path)
+
+
+def hash_entries(files, *known_files):
+    """
+    Compute manifest records for the files to package.
+
+    A file whose size and mtime match its record in one of known_files (the
+    previous manifest's files, the skill index's) keeps the recorded hash
+    instead of being read again.
+    """
+    entries = {}
+    for arcname, file_path, st in files:
+        for known in known_files:
+            previous = known.get(arcname)
+            if (
+                previous
+                and previous.get('size') == st.st_size
+                and previous.get('mtime_ns') == st.st_mtime_ns
+            ):
+                digest = previous['sha256']
+                break
+        else:
+            digest = hash_file(file_path)
+        entries[arcname] = {
+            'sha256': digest,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'mode': file_mode(st),
+        }
+    return entries
+
+
+def same_contents(entries, previous_files):
+    """True if both manifests list the same files with the same hashes and modes."""
+    if entries.keys() != previous_files.keys():
+        return False
+    return all(
+        record['sha256'] == previous_files[arcname].get('sha256')
+        and record['mode'] == previous_files[arcname].get('mode')
+        for arcname, record in entries.items()
+    )
+
+
+def archive_matches(skill_filename, manifest):
+    """True if the archive on disk is the one the manifest was written for."""
+    recorded = manifest.get('archive') or {}
+    if not recorded:
+        return False
+    try:
+        st = skill_filename.stat()
+    except OSError:
+        return False
+    return st.st_size == recorded.get('size') and st.st_mtime_ns == recorded.get('mtime_ns')
+
+
+def choose_codec(arcname, data):
+    """
+    Pick the compression method and level for one file.
+
+    Returns:
+        (compress_type, level) where level is None for stored entries
+    """
+    extension = os.path.splitext(arcname)[1].lower()
+    if not data or extension in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED, None
+
+    # A fast trial pass over the head of the file tells us whether deflate pays off
+    sample = data[:SAMPLE_SIZE]
+    trial_size = len(zlib.compress(sample, 1))
+    if trial_size > len(sample) * (1 - MIN_SAVINGS):
+        return zipfile.ZIP_STORED, None
+    if extension in TEXT_EXTENSIONS or trial_size <= len(sample) // 2:
+        return zipfile.ZIP_DEFLATED, 9
+    return zipfile.ZIP_DEFLATED, 6
+
+
+def codec_label(compress_type, level):
+    """Human-readable codec name used in reports and manifests."""
+    if compress_type == zipfile.ZIP_STORED:
+        return 'stored'
+    return f'deflate-{level}'
+
+
+def compress_file(arcname, file_path):
+    """
+    Read and compress one file. Runs on a worker thread; zlib releases the GIL.
+
+    Returns:
+        Dict with the payload, its CRC and sizes, the codec used and the time taken
+    """
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    compress_type, level = choose_codec(arcname, data)
+    payload = data
+    if compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        if len(payload) >= len(data):
+            compress_type, level, payload = zipfile.ZIP_STORED, None, data
+    return {
+        'payload': payload,
+        'crc': zlib.crc32(data),
+        'size': len(data),
+        'compress_type': compress_type,
+        'codec': codec_label(compress_type, level),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _begin_entry(zipf, zinfo):
+    """
+    Write an entry's local header at the end of the archive.
+
+    zipfile has no public API for appending precompressed data, so this and
+    _finish_entry() do what ZipFile.open(..., 'w') does internally. The bytes
+    written are identical to what zipfile would produce for the same payload.
+
+    Returns:
+        Whether the entry uses ZIP64 extensions
+    """
+    zinfo.flag_bits = 0
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    zipf.fp.seek(zipf.start_dir)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf._didModify = True
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    return zip64
+
+
+def _finish_entry(zipf, zinfo):
+    """Register an entry written after _begin_entry() so it lands in the central directory."""
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+
+
+def append_raw_entry(zipf, zinfo, chunks):
+    """
+    Append an entry whose compressed bytes are already known.
+
+    zinfo must carry compress_type, CRC, compress_size and file_size.
+    """
+    _begin_entry(zipf, zinfo)
+    for chunk in chunks:
+        zipf.fp.write(chunk)
+    _finish_entry(zipf, zinfo)
+
+
+def _stream_payload(zipf, zinfo, src, head, compress_type, level):
+    """Write one entry from an open file, compressing it chunk by chunk."""
+    zinfo.compress_type = compress_type
+    zinfo.CRC = 0
+    zinfo.compress_size = 0
+    zip64 = _begin_entry(zipf, zinfo)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if level is not None else None
+
+    crc = 0
+    file_size = 0
+    compress_size = 0
+    chunk = head
+    while chunk:
+        crc = zlib.crc32(chunk, crc)
+        file_size += len(chunk)
+        out = compressor.compress(chunk) if compressor else chunk
+        zipf.fp.write(out)
+        compress_size += len(out)
+        chunk = src.read(CHUNK_SIZE)
+    if compressor:
+        out = compressor.flush()
+        zipf.fp.write(out)
+        compress_size += len(out)
+
+    # Rewrite the header now that the CRC and sizes are known
+    end = zipf.fp.tell()
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = compress_size
+    zipf.fp.seek(zinfo.header_offset)
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    zipf.fp.seek(end)
+
+
+def stream_entry(zipf, zinfo, arcname, file_path):
+    """
+    Compress a large file straight into the archive with bounded memory.
+
+    Only CHUNK_SIZE bytes of the file are held at a time. The codec is chosen
+    from the head of the file, and the result is byte-identical to
+    compress_file() followed by append_raw_entry().
+
+    Returns:
+        Dict with the codec used, sizes and the time taken
+    """
+    start = time.perf_counter()
+    with open(file_path, 'rb') as src:
+        head = src.read(SAMPLE_SIZE)
+        compress_type, level = choose_codec(arcname, head)
+        _stream_payload(zipf, zinfo, src, head, compress_type, level)
+        if compress_type == zipfile.ZIP_DEFLATED and zinfo.compress_size >= zinfo.file_size:
+            # Deflate didn't pay off after all: rewrite the entry as stored
+            zipf.fp.seek(zinfo.header_offset)
+            zipf.fp.truncate()
+            zipf.start_dir = zinfo.header_offset
+            src.seek(0)
+            compress_type, level = zipfile.ZIP_STORED, None
+            _stream_payload(zipf, zinfo, src, src.read(SAMPLE_SIZE), compress_type, level)
+    _finish_entry(zipf, zinfo)
+    return {
+        'codec': codec_label(compress_type, level),
+        'size': zinfo.file_size,
+        'compressed_size': zinfo.compress_size,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def read_raw_entry(src_zip, src_info):
+    """Yield an entry's compressed bytes from an open archive, in fixed-size chunks."""
+    src_zip.fp.seek(src_info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, src_zip.fp.read(zipfile.sizeFileHeader))
+    src_zip.fp.seek(header[_FH_FILENAME_LENGTH] + header[_FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+
+    remaining = src_info.compress_size
+    while remaining:
+        chunk = src_zip.fp.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry in previous archive: {src_info.filename}")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def copy_raw_entry(src_zip, src_info, dst_zip, zinfo):
+    """Copy an entry from another archive without recompressing it."""
+    zinfo.compress_type = src_info.compress_type
+    zinfo.CRC = src_info.CRC
+    zinfo.compress_size = src_info.compress_size
+    zinfo.file_size = src_info.file_size
+    append_raw_entry(dst_zip, zinfo, read_raw_entry(src_zip, src_info))
+
+
+def format_size(num_bytes):
+    """Format a byte count for the packaging report."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num_bytes) < 1024 or unit == 'GB':
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
 
 
-def package_skill(skill_path, output_dir=None):
+def open_previous_archive(skill_filename, manifest):
+    """Open the previous archive for raw copies, if it is still the one the manifest describes."""
+    if not manifest or not archive_matches(skill_filename, manifest):
+        return None
+    try:
+        return zipfile.ZipFile(skill_filename, 'r')
+    except (OSError, zipfile.BadZipFile):
+        return None
+
+
+def _plan_entries(files, entries, previous_files, previous_zip):
+    """
+    Decide how each entry gets into the archive.
+
+    Returns:
+        List of (arcname, file_path, how, src_info) with how one of
+        'reuse' (raw copy from the previous archive), 'stream' or 'pool'
+    """
+    plan = []
+    for arcname, file_path, st in files:
+        record = entries[arcname]
+        previous = previous_files.get(arcname)
+        src_info = None
+        if previous_zip and previous and previous.get('sha256') == record['sha256'] and previous.get('codec'):
+            src_info = previous_zip.NameToInfo.get(arcname)
+        if src_info is not None:
+            record['codec'] = previous['codec']
+            plan.append((arcname, file_path, 'reuse', src_info))
+        elif st.st_size >= STREAM_THRESHOLD:
+            plan.append((arcname, file_path, 'stream', None))
+        else:
+            plan.append((arcname, file_path, 'pool', None))
+    return plan
+
+
+def write_entries(zipf, pool, files, entries, previous_files, previous_zip):
+    """
+    Write all entries to the archive in sorted order.
+
+    Small files are read and compressed on the pool a few steps ahead of the
+    writer, but never more than MAX_IN_FLIGHT_BYTES at a time. Large files are
+    streamed by the writer itself. Either way the job count never changes the
+    output bytes.
+
+    Returns:
+        List of per-entry report dicts
+    """
+    plan = _plan_entries(files, entries, previous_files, previous_zip)
+    pooled = [index for index, item in enumerate(plan) if item[2] == 'pool']
+    submitted = {}
+    in_flight_bytes = 0
+    cursor = 0
+
+    report = []
+    for index, (arcname, file_path, how, src_info) in enumerate(plan):
+        # Keep the pool busy with upcoming small files, within the memory bound
+        while cursor < len(pooled):
+            ahead = pooled[cursor]
+            ahead_size = entries[plan[ahead][0]]['size']
+            if submitted and in_flight_bytes + ahead_size > MAX_IN_FLIGHT_BYTES:
+                break
+            submitted[ahead] = (pool.submit(compress_file, plan[ahead][0], plan[ahead][1]), ahead_size)
+            in_flight_bytes += ahead_size
+            cursor += 1
+
+        record = entries[arcname]
+        zinfo = make_zip_info(arcname, record['mode'], record['size'])
+        if how == 'reuse':
+            copy_raw_entry(previous_zip, src_info, zipf, zinfo)
+            result = {
+                'codec': record['codec'],
+                'size': src_info.file_size,
+                'compressed_size': src_info.compress_size,
+                'seconds': 0.0,
+            }
+        elif how == 'stream':
+            result = stream_entry(zipf, zinfo, arcname, file_path)
+        else:
+            future, size = submitted.pop(index)
+            in_flight_bytes -= size
+            result = future.result()
+            zinfo.compress_type = result['compress_type']
+            zinfo.CRC = result['crc']
+            zinfo.compress_size = len(result['payload'])
+            zinfo.file_size = result['size']
+            append_raw_entry(zipf, zinfo, (result.pop('payload'),))
+            result['compressed_size'] = zinfo.compress_size
+
+        record['codec'] = result['codec']
+        entry_report = {
+            'name': arcname,
+            'codec': result['codec'],
+            'size': result['size'],
+            'compressed_size': result['compressed_size'],
+            'saved': result['size'] - result['compressed_size'],
+            'seconds': result['seconds'],
+            'reused': how == 'reuse',
+            'streamed': how == 'stream',
+        }
+        report.append(entry_report)
+        print(
+            f"  {'Reused' if entry_report['reused'] else 'Added'}: {arcname} "
+            f"[{entry_report['codec']}] {format_size(entry_report['size'])} -> "
+            f"{format_size(entry_report['compressed_size'])}, "
+            f"saved {format_size(entry_report['saved'])} "
+            f"in {entry_report['seconds'] * 1000:.1f} ms"
+        )
+    return report
+
+
+def check_size_budgets(files, max_file_size=None, max_total_size=None):
+    """
+    Check file sizes against the packaging budgets before anything is read.
+
+    Returns:
+        Error message, or None if the skill fits
+    """
+    if max_file_size is not None:
+        too_big = [(arcname, st.st_size) for arcname, _, st in files if st.st_size > max_file_size]
+        if too_big:
+            listed = ', '.join(f"{arcname} ({format_size(size)})" for arcname, size in too_big[:5])
+            more = f" and {len(too_big) - 5} more" if len(too_big) > 5 else ""
+            return (
+                f"{len(too_big)} file(s) exceed the per-file budget of "
+                f"{format_size(max_file_size)}: {listed}{more}"
+            )
+    if max_total_size is not None:
+        total = sum(st.st_size for _, _, st in files)
+        if total > max_total_size:
+            return (
+                f"Skill contents total {format_size(total)}, over the archive budget of "
+                f"{format_size(max_total_size)}"
+            )
+    return None
+
+
+def parse_size(text):
+    """Parse a size such as 1048576, 512K, 50M, 2G or 50MB into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*', text, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** ' KMGT'.index(unit.upper() or ' '))
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be measured."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def resolve_jobs(jobs):
+    """Turn a --jobs value into a worker count; 0 or None means one per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def package_skill(
+    skill_path,
+    output_dir=None,
+    use_cache=True,
+    jobs=1,
+    report_path=None,
+    max_file_size=None,
+    max_total_size=None,
+    index_path=None,
+):
     """
     Package a skill folder into a .skill file.
 
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        use_cache: Reuse the manifest and previous archive next to the output
+            to skip unchanged skills and avoid recompressing unchanged files
+        jobs: Number of compression threads (0 or None for one per CPU)
+        report_path: Optional path for a JSON report of per-entry sizes and timings
+        max_file_size: Optional per-file size budget in bytes
+        max_total_size: Optional budget in bytes for the total uncompressed size
+        index_path: Optional skill index whose stored hashes and validation
+            result are used instead of reading the files and validating again,
+            if the skill's files are unchanged
 
     Returns:
         Path to the created .skill file, or None if error
@@ -44,15 +617,6 @@ def package_skill(skill_path, output_dir=None):
         print(f"❌ Error: SKILL.md not found in {skill_path}")
         return None
 
-    # Run validation before packaging
-    print("🔍 Validating skill...")
-    valid, message = validate_skill(skill_path)
-    if not valid:
-        print(f"❌ Validation failed: {message}")
-        print("   Please fix the validation errors before packaging.")
-        return None
-    print(f"✅ {message}\n")
-
     # Determine output location
     skill_name = skill_path.name
     if output_dir:
@@ -62,43 +626,340 @@ def package_skill(skill_path, output_dir=None):
         output_path = Path.cwd()
 
     skill_filename = output_path / f"{skill_name}.skill"
+    manifest_path = manifest_path_for(skill_filename)
+    manifest = load_manifest(manifest_path) if use_cache else None
+    if manifest and manifest.get('codec_policy') != CODEC_POLICY_VERSION:
+        # Hashes are still valid, but entries must be recompressed under the new policy
+        manifest['archive'] = None
+    previous_files = manifest.get('files', {}) if manifest else {}
 
-    # Create the .skill file (zip format)
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
-
-        print(f"\n✅ Successfully packaged skill to: {skill_filename}")
+        files = collect_files(skill_path)
+    except OSError as e:
+        print(f"❌ Error reading skill files: {e}")
+        return None
+
+    # Budgets are checked from the stat results alone, before any file is read
+    budget_error = check_size_budgets(files, max_file_size, max_total_size)
+    if budget_error:
+        print(f"❌ Size budget exceeded: {budget_error}")
+        return None
+
+    # The skill index can vouch for hashes and the validation result of unchanged files
+    indexed_files, problems = {}, None
+    if index_path is not None:
+        with SkillIndex(index_path) as index:
+            indexed_files = {
+                f"{skill_name}/{relpath}": record for relpath, record in index.stored_files(skill_path).items()
+            }
+            problems = index.stored_problems(
+                skill_path, [(arcname.split('/', 1)[1], st) for arcname, _, st in files]
+            )
+
+    try:
+        entries = hash_entries(files, previous_files, indexed_files)
+    except OSError as e:
+        print(f"❌ Error reading skill files: {e}")
+        return None
+
+    # Fast path: same files, same hashes, and the archive is still ours
+    if manifest and same_contents(entries, previous_files) and archive_matches(skill_filename, manifest):
+        if any(record['mtime_ns'] != previous_files[arcname].get('mtime_ns') for arcname, record in entries.items()):
+            # Same contents under new mtimes: record them so the next run doesn't hash these files again
+            for arcname, record in entries.items():
+                record['codec'] = previous_files[arcname].get('codec')
+            try:
+                write_json_atomic(manifest_path, {**manifest, 'files': entries})
+            except OSError:
+                pass  # Costs a rehash next time, nothing more
+        print(f"✅ Up to date, nothing changed: {skill_filename}")
         return skill_filename
 
+    # Run validation before packaging, unless the index already has the result
+    if problems is not None:
+        valid, message = (False, problems[0]) if problems else (True, "Skill is valid (skill index)")
+    else:
+        print("🔍 Validating skill...")
+        valid, message = validate_skill(skill_path)
+    if not valid:
+        print(f"❌ Validation failed: {message}")
+        print("   Please fix the validation errors before packaging.")
+        return None
+    print(f"✅ {message}\n")
+
+    # Create the .skill file (zip format) next to the target, then swap it in
+    tmp_filename = skill_filename.with_name(skill_filename.name + '.tmp')
+    previous_zip = open_previous_archive(skill_filename, manifest)
+    start = time.perf_counter()
+    try:
+        with zipfile.ZipFile(tmp_filename, 'w') as zipf, \
+                ThreadPoolExecutor(max_workers=resolve_jobs(jobs)) as pool:
+            report = write_entries(zipf, pool, files, entries, previous_files, previous_zip)
     except Exception as e:
         print(f"❌ Error creating .skill file: {e}")
+        tmp_filename.unlink(missing_ok=True)
+        return None
+    finally:
+        if previous_zip:
+            previous_zip.close()
+    elapsed = time.perf_counter() - start
+
+    try:
+        os.replace(tmp_filename, skill_filename)
+        archive_stat = skill_filename.stat()
+        write_json_atomic(manifest_path, {
+            'version': MANIFEST_VERSION,
+            'skill': skill_name,
+            'archive': {
+                'sha256': hash_file(skill_filename),
+                'size': archive_stat.st_size,
+                'mtime_ns': archive_stat.st_mtime_ns,
+            },
+            'codec_policy': CODEC_POLICY_VERSION,
+            'files': entries,
+        })
+    except OSError as e:
+        print(f"❌ Error writing .skill file: {e}")
         return None
 
+    total_size = sum(entry['size'] for entry in report)
+    total_saved = sum(entry['saved'] for entry in report)
+    total_seconds = sum(entry['seconds'] for entry in report)
+    throughput = total_size / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+    peak_rss = peak_rss_bytes()
+    zip64 = archive_stat.st_size > zipfile.ZIP64_LIMIT or len(report) >= zipfile.ZIP_FILECOUNT_LIMIT
+    print(
+        f"\n   {len(report)} entries, {format_size(total_size)} in, "
+        f"saved {format_size(total_saved)}, {total_seconds * 1000:.1f} ms compressing"
+    )
+    print(
+        f"   {throughput:.1f} MB/s"
+        + (f", peak RSS {format_size(peak_rss)}" if peak_rss is not None else "")
+        + (", ZIP64" if zip64 else "")
+    )
+
+    if report_path:
+        try:
+            write_json_atomic(Path(report_path), {
+                'skill': skill_name,
+                'archive': str(skill_filename),
+                'entries': report,
+                'total_size': total_size,
+                'total_compressed_size': sum(entry['compressed_size'] for entry in report),
+                'total_saved': total_saved,
+                'total_seconds': total_seconds,
+                'elapsed_seconds': elapsed,
+                'throughput_mb_s': throughput,
+                'peak_rss_bytes': peak_rss,
+                'zip64': zip64,
+            })
+        except OSError as e:
+            print(f"❌ Error writing report: {e}")
+            return None
+    print(f"\n✅ Successfully packaged skill to: {skill_filename}")
+    return skill_filename
+
+
+def _package_one(skill_dir, output_dir, use_cache, budgets, index_path=None):
+    """Package one skill inside a pool worker and describe the outcome."""
+    skill_filename = Path(output_dir) / f"{skill_dir.name}.skill"
+    try:
+        before = skill_filename.stat().st_mtime_ns
+    except OSError:
+        before = None
+
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            result = package_skill(skill_dir, output_dir, use_cache=use_cache, jobs=1, index_path=index_path,
+                                   **budgets)
+    except Exception as e:
+        result = None
+        log.write(f"❌ Error: {e}\n")
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'skill': skill_dir.name,
+        'path': str(skill_dir),
+        'seconds': round(elapsed, 4),
+    }
+    if result is None:
+        errors = [line.strip() for line in log.getvalue().splitlines() if line.startswith('❌')]
+        summary['status'] = 'failed'
+        summary['error'] = errors[-1].lstrip('❌ ') if errors else 'Packaging failed'
+        return summary
+
+    summary['archive'] = str(result)
+    summary['size'] = result.stat().st_size
+    summary['status'] = 'unchanged' if result.stat().st_mtime_ns == before else 'packaged'
+    return summary
+
+
+def package_all(skills_root, output_dir, jobs=None, use_cache=True, max_file_size=None, max_total_size=None,
+                index_path=None):
+    """
+    Validate and package every skill under a root folder on a process pool.
+
+    Args:
+        skills_root: Folder to search for skill folders
+        output_dir: Output directory for the .skill files
+        jobs: Number of worker processes (0 or None for one per CPU)
+        use_cache, max_file_size, max_total_size: Passed through to package_skill()
+        index_path: Skill index whose stored validation results the workers
+            reuse for unchanged skills (see package_skill())
+
+    Returns:
+        Summary dict with one record per skill and overall counts
+    """
+    skills_root = Path(skills_root).resolve()
+    output_path = Path(output_dir).resolve()
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    if index_path is not None:
+        # Create the schema here, so workers only ever read the index
+        SkillIndex(index_path).close()
+    skill_dirs = find_skill_dirs(skills_root)
+
+    # Archives are named after the folder, so two folders with the same name would collide
+    by_name = {}
+    for skill_dir in skill_dirs:
+        by_name.setdefault(skill_dir.name, []).append(skill_dir)
+
+    results = []
+    unique_dirs = []
+    for name, dirs in by_name.items():
+        if len(dirs) == 1:
+            unique_dirs.append(dirs[0])
+            continue
+        for skill_dir in dirs:
+            results.append({
+                'skill': name,
+                'path': str(skill_dir),
+                'status': 'failed',
+                'error': f"Duplicate skill folder name '{name}' under {skills_root}",
+                'seconds': 0.0,
+            })
+
+    budgets = {'max_file_size': max_file_size, 'max_total_size': max_total_size}
+    if unique_dirs:
+        workers = min(resolve_jobs(jobs), len(unique_dirs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_package_one, skill_dir, output_path, use_cache, budgets, index_path)
+                for skill_dir in unique_dirs
+            ]
+            results.extend(future.result() for future in futures)
+
+    results.sort(key=lambda result: (result['skill'], result['path']))
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    return {
+        'root': str(skills_root),
+        'output_dir': str(output_path),
+        'seconds': round(time.perf_counter() - start, 4),
+        'counts': counts,
+        'skills': results,
+    }
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
-        print("\nExample:")
-        print("  python utils/package_skill.py skills/public/my-skill")
-        print("  python utils/package_skill.py skills/public/my-skill ./dist")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Package a skill folder into a distributable .skill file.",
+        epilog=(
+            "Examples:\n"
+            "  python utils/package_skill.py skills/public/my-skill\n"
+            "  python utils/package_skill.py skills/public/my-skill ./dist"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('skill_path', help="Path to the skill folder (or the skills root with --all)")
+    parser.add_argument('output_dir', nargs='?', help="Output directory (defaults to current directory)")
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Ignore the previous manifest and archive and rebuild from scratch",
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help=(
+            "Compression threads (default: 1; 0 uses one per CPU). "
+            "With --all, worker processes (default: one per CPU)"
+        ),
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help="Package every skill folder under skill_path and print a JSON summary",
+    )
+    parser.add_argument('--report', help="Write a JSON report of per-entry sizes and timings")
+    parser.add_argument(
+        '--delta-from',
+        metavar='PREVIOUS_SKILL',
+        help="Also write a .skillpatch against this previous .skill file (see skill_delta.py)",
+    )
+    parser.add_argument(
+        '--index',
+        nargs='?',
+        const=default_index_path(),
+        metavar='INDEX_FILE',
+        help="Reuse the skill index's validation results for unchanged skills",
+    )
+    parser.add_argument(
+        '--max-file-size',
+        type=parse_size,
+        help="Fail before packaging if any file is larger than this (e.g. 50M)",
+    )
+    parser.add_argument(
+        '--max-total-size',
+        type=parse_size,
+        help="Fail before packaging if the files add up to more than this (e.g. 200M)",
+    )
+    args = parser.parse_args()
 
-    skill_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    if args.all:
+        summary = package_all(
+            args.skill_path,
+            args.output_dir or Path.cwd(),
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            max_file_size=args.max_file_size,
+            max_total_size=args.max_total_size,
+            index_path=args.index,
+        )
+        print(json.dumps(summary, indent=2))
+        sys.exit(1 if summary['counts'].get('failed') else 0)
 
-    print(f"📦 Packaging skill: {skill_path}")
-    if output_dir:
-        print(f"   Output directory: {output_dir}")
+    skill_filename = Path(args.output_dir or Path.cwd()).resolve() / f"{Path(args.skill_path).resolve().name}.skill"
+    if args.delta_from and Path(args.delta_from).resolve() == skill_filename:
+        print("❌ Error: --delta-from must not be the archive being written; keep a copy of the previous release")
+        sys.exit(1)
+
+    print(f"📦 Packaging skill: {args.skill_path}")
+    if args.output_dir:
+        print(f"   Output directory: {args.output_dir}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    result = package_skill(
+        args.skill_path,
+        args.output_dir,
+        use_cache=not args.no_cache,
+        jobs=1 if args.jobs is None else args.jobs,
+        report_path=args.report,
+        max_file_size=args.max_file_size,
+        max_total_size=args.max_total_size,
+        index_path=args.index,
+    )
+
+    if result and args.delta_from:
+        from skill_delta import create_delta
+        print()
+        result = create_delta(args.delta_from, result)
 
     if result:
         sys.exit(0)
@@ -1,103 +1,407 @@
 #!/usr/bin/env python3
 """
 Quick validation script for skills - minimal version
+
+Usage:
+    python quick_validate.py <skill_directory | skill-name.skill> [--index [index-file]]
+
+Only the frontmatter at the top of SKILL.md is read. The flat YAML that skills
+use is parsed directly; PyYAML is imported only for frontmatter outside that
+subset. Packaged .skill archives are checked in place, without extracting.
+With --index, a skill folder whose files still have the sizes and mtimes
+recorded in the skill index (skill_index.py) gets its stored result instead.
 """
 
 import sys
 import os
 import re
-import yaml
+import stat
 from pathlib import Path
 
-def validate_skill(skill_path):
-    """Basic validation of a skill"""
-    skill_path = Path(skill_path)
+# Bump whenever a check is added or changed, so cached results are discarded
+VALIDATOR_VERSION = 1
 
-    # Check SKILL.md exists
-    skill_md = skill_path / 'SKILL.md'
-    if not skill_md.exists():
-        return False, "SKILL.md not found"
+# Define allowed properties
+ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata', 'compatibility'}
 
-    # Read and validate frontmatter
-    content = skill_md.read_text()
-    if not content.startswith('---'):
-        return False, "No YAML frontmatter found"
 
-    # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
-        return False, "Invalid frontmatter format"
+# Limits for .skill archives, checked against the sizes in the zip directory
+MAX_ARCHIVE_ENTRIES = 10_000
+MAX_ARCHIVE_UNCOMPRESSED_SIZE = 512 * 1024 * 1024
 
-    frontmatter_text = match.group(1)
+# Keys the fast frontmatter parser accepts; anything else goes to PyYAML
+_KEY_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_-]*')
 
-    # Parse YAML frontmatter
-    try:
-        frontmatter = yaml.safe_load(frontmatter_text)
-        if not isinstance(frontmatter, dict):
-            return False, "Frontmatter must be a YAML dictionary"
-    except yaml.YAMLError as e:
-        return False, f"Invalid YAML in frontmatter: {e}"
+# Plain scalars that YAML would resolve to something other than a string
+# (bools, nulls, numbers, dates, merge keys) are left to PyYAML.
+_NON_STRING_WORDS = {
+    'y', 'yes', 'n', 'no', 'true', 'false', 'on', 'off', 'null', '~',
+}
+_PLAIN_INDICATORS = set('-?:,[]{}#&*!|>\'"%@`=<~')
+
+
+def read_frontmatter(stream):
+    """
+    Read the frontmatter block from the top of a SKILL.md text stream.
+
+    Reading stops at the closing '---', so the body is never loaded. The rules
+    are the same as matching r'^---\n(.*?)\n---' against the whole file.
+
+    Args:
+        stream: Text file object positioned at the start of SKILL.md
+
+    Returns:
+        (frontmatter_text, error) with exactly one of them set
+    """
+    first = stream.readline()
+    if not first.startswith('---'):
+        return None, "No YAML frontmatter found"
+    if first != '---\n':
+        return None, "Invalid frontmatter format"
+
+    lines = []
+    for line in stream:
+        if line.startswith('---') and lines:
+            # Every collected line ended with a newline; the last one belongs
+            # to the closing delimiter
+            return ''.join(lines)[:-1], None
+        lines.append(line)
+    return None, "Invalid frontmatter format"
+
+
+def _parse_scalar(value):
+    """Parse a simple scalar value, or return None if PyYAML is needed."""
+    if not value:
+        return None
+    if value[0] == "'":
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != "'" or "'" in inner.replace("''", ''):
+            return None
+        return inner.replace("''", "'")
+    if value[0] == '"':
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != '"' or '"' in inner or '\\' in inner:
+            return None
+        return inner
+    if (
+        value[0] in _PLAIN_INDICATORS
+        or value[0].isdigit()
+        or value[0] in '+.'
+        or value.lower() in _NON_STRING_WORDS
+        or value.endswith(':')
+        or ': ' in value
+        or ' #' in value
+    ):
+        return None
+    return value
+
+
+def _split_key(line):
+    """Split 'key: value' into (key, value), or return None if not that shape."""
+    key, sep, value = line.partition(':')
+    if not sep or not _KEY_RE.fullmatch(key) or (value and value[0] != ' '):
+        return None
+    if key.lower() in _NON_STRING_WORDS:
+        return None
+    return key, value.strip()
 
-    # Define allowed properties
-    ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata', 'compatibility'}
+
+def parse_simple_frontmatter(frontmatter_text):
+    """
+    Parse the flat frontmatter subset that skills use, without PyYAML.
+
+    Handles top-level 'key: value' lines with plain or simply quoted string
+    values, plus one level of nested 'key: value' lines under a bare 'key:'
+    (as used by metadata). Anything else, including values YAML would read as
+    bools, numbers or nulls, multi-line scalars, lists, comments, anchors and
+    duplicate keys, is rejected so the caller can fall back to PyYAML.
+
+    Returns:
+        The parsed dict, or None if the text is outside the supported subset
+    """
+    if '\t' in frontmatter_text:
+        return None
+
+    result = {}
+    nested = None
+    nested_indent = None
+    for line in frontmatter_text.split('\n'):
+        if not line.strip():
+            continue
+        if line[0] == ' ':
+            if nested is None:
+                return None
+            indent = len(line) - len(line.lstrip(' '))
+            if nested_indent is None:
+                nested_indent = indent
+            if indent != nested_indent:
+                return None
+            pair = _split_key(line[indent:])
+            if pair is None or pair[0] in nested:
+                return None
+            value = _parse_scalar(pair[1])
+            if value is None:
+                return None
+            nested[pair[0]] = value
+            continue
+
+        pair = _split_key(line)
+        if pair is None or pair[0] in result:
+            return None
+        key, raw = pair
+        if raw:
+            value = _parse_scalar(raw)
+            if value is None:
+                return None
+            result[key] = value
+            nested = None
+        else:
+            nested = {}
+            nested_indent = None
+            result[key] = nested
+
+    # A bare 'key:' with nothing under it is null in YAML
+    for key, value in result.items():
+        if value == {}:
+            result[key] = None
+    return result or None
+
+
+def parse_frontmatter(frontmatter_text):
+    """
+    Parse frontmatter text into a dict.
+
+    Returns:
+        (frontmatter, error) with exactly one of them set
+    """
+    frontmatter = parse_simple_frontmatter(frontmatter_text)
+    if frontmatter is None:
+        import yaml
+        try:
+            frontmatter = yaml.safe_load(frontmatter_text)
+        except yaml.YAMLError as e:
+            return None, f"Invalid YAML in frontmatter: {e}"
+    if not isinstance(frontmatter, dict):
+        return None, "Frontmatter must be a YAML dictionary"
+    return frontmatter, None
+
+
+def check_frontmatter(frontmatter):
+    """Check parsed frontmatter and return every problem found"""
+    problems = []
 
     # Check for unexpected properties (excluding nested keys under metadata)
     unexpected_keys = set(frontmatter.keys()) - ALLOWED_PROPERTIES
     if unexpected_keys:
-        return False, (
+        problems.append(
             f"Unexpected key(s) in SKILL.md frontmatter: {', '.join(sorted(unexpected_keys))}. "
             f"Allowed properties are: {', '.join(sorted(ALLOWED_PROPERTIES))}"
         )
 
     # Check required fields
     if 'name' not in frontmatter:
-        return False, "Missing 'name' in frontmatter"
+        problems.append("Missing 'name' in frontmatter")
     if 'description' not in frontmatter:
-        return False, "Missing 'description' in frontmatter"
+        problems.append("Missing 'description' in frontmatter")
 
     # Extract name for validation
     name = frontmatter.get('name', '')
     if not isinstance(name, str):
-        return False, f"Name must be a string, got {type(name).__name__}"
+        problems.append(f"Name must be a string, got {type(name).__name__}")
+        name = ''
     name = name.strip()
     if name:
         # Check naming convention (kebab-case: lowercase with hyphens)
         if not re.match(r'^[a-z0-9-]+$', name):
-            return False, f"Name '{name}' should be kebab-case (lowercase letters, digits, and hyphens only)"
+            problems.append(f"Name '{name}' should be kebab-case (lowercase letters, digits, and hyphens only)")
         if name.startswith('-') or name.endswith('-') or '--' in name:
-            return False, f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens"
+            problems.append(f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens")
         # Check name length (max 64 characters per spec)
         if len(name) > 64:
-            return False, f"Name is too long ({len(name)} characters). Maximum is 64 characters."
+            problems.append(f"Name is too long ({len(name)} characters). Maximum is 64 characters.")
 
     # Extract and validate description
     description = frontmatter.get('description', '')
     if not isinstance(description, str):
-        return False, f"Description must be a string, got {type(description).__name__}"
+        problems.append(f"Description must be a string, got {type(description).__name__}")
+        description = ''
     description = description.strip()
     if description:
         # Check for angle brackets
         if '<' in description or '>' in description:
-            return False, "Description cannot contain angle brackets (< or >)"
+            problems.append("Description cannot contain angle brackets (< or >)")
         # Check description length (max 1024 characters per spec)
         if len(description) > 1024:
-            return False, f"Description is too long ({len(description)} characters). Maximum is 1024 characters."
+            problems.append(f"Description is too long ({len(description)} characters). Maximum is 1024 characters.")
 
     # Validate compatibility field if present (optional)
     compatibility = frontmatter.get('compatibility', '')
     if compatibility:
         if not isinstance(compatibility, str):
-            return False, f"Compatibility must be a string, got {type(compatibility).__name__}"
-        if len(compatibility) > 500:
-            return False, f"Compatibility is too long ({len(compatibility)} characters). Maximum is 500 characters."
+            problems.append(f"Compatibility must be a string, got {type(compatibility).__name__}")
+        elif len(compatibility) > 500:
+            problems.append(f"Compatibility is too long ({len(compatibility)} characters). Maximum is 500 characters.")
+
+    return problems
+
+
+def find_problems(skill_path):
+    """Run every check on a skill and return all problems found (empty if valid)"""
+    skill_path = Path(skill_path)
+    if skill_path.is_file():
+        return find_archive_problems(skill_path)
+
+    # Read only the frontmatter from SKILL.md
+    try:
+        with open(skill_path / 'SKILL.md') as f:
+            frontmatter_text, error = read_frontmatter(f)
+    except (FileNotFoundError, IsADirectoryError):
+        return ["SKILL.md not found"]
+    if error:
+        return [error]
+
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if error:
+        return [error]
+
+    return check_frontmatter(frontmatter)
+
+
+def _unsafe_entry_reason(name):
+    """Explain why a zip entry name could escape the extraction folder, or None."""
+    if name.startswith('/') or re.match(r'^[A-Za-z]:', name):
+        return "absolute path"
+    if '\\' in name:
+        return "backslash in path"
+    if '\0' in name:
+        return "NUL byte in path"
+    if '..' in name.split('/'):
+        return "path traversal"
+    return None
+
+
+def find_archive_problems(archive_path, max_entries=MAX_ARCHIVE_ENTRIES,
+                          max_uncompressed_size=MAX_ARCHIVE_UNCOMPRESSED_SIZE):
+    """
+    Check a packaged .skill archive without extracting it.
+
+    The entry listing is read from the zip directory and SKILL.md is streamed
+    straight out of the archive, so nothing is written to disk.
+
+    Args:
+        archive_path: Path to the .skill file
+        max_entries: Maximum number of entries in the archive
+        max_uncompressed_size: Maximum total uncompressed size in bytes
+
+    Returns:
+        List of problems found (empty if valid)
+    """
+    import io
+    import zipfile
+
+    try:
+        zf = zipfile.ZipFile(archive_path)
+    except (zipfile.BadZipFile, OSError) as e:
+        return [f"Not a valid .skill archive: {e}"]
+
+    with zf:
+        infos = zf.infolist()
+        problems = []
+
+        if len(infos) > max_entries:
+            problems.append(f"Archive has too many entries ({len(infos)}). Maximum is {max_entries}.")
+        total_size = sum(info.file_size for info in infos)
+        if total_size > max_uncompressed_size:
+            problems.append(
+                f"Archive is too large uncompressed ({total_size} bytes). "
+                f"Maximum is {max_uncompressed_size} bytes."
+            )
+
+        seen = set()
+        top_level = set()
+        for info in infos:
+            name = info.filename
+            reason = _unsafe_entry_reason(name)
+            if reason:
+                problems.append(f"Unsafe entry '{name}': {reason}")
+                continue
+            if name in seen:
+                problems.append(f"Duplicate entry '{name}'")
+            seen.add(name)
+            if stat.S_ISLNK(info.external_attr >> 16):
+                problems.append(f"Unsafe entry '{name}': symbolic link")
+            top, sep, _ = name.partition('/')
+            if not sep:
+                problems.append(f"Entry '{name}' is not inside the skill folder")
+            else:
+                top_level.add(top)
+        if problems:
+            return problems
+
+        if len(top_level) != 1:
+            found = ', '.join(sorted(top_level)) or 'none'
+            return [f"Archive must contain a single top-level skill folder, found: {found}"]
+        folder = top_level.pop()
+
+        # Read only the frontmatter from SKILL.md
+        try:
+            info = zf.getinfo(f"{folder}/SKILL.md")
+        except KeyError:
+            return ["SKILL.md not found"]
+        try:
+            with zf.open(info) as raw:
+                frontmatter_text, error = read_frontmatter(io.TextIOWrapper(raw, encoding='utf-8'))
+        except (zipfile.BadZipFile, UnicodeDecodeError, OSError, RuntimeError) as e:
+            return [f"Cannot read SKILL.md from archive: {e}"]
+        if error:
+            return [error]
+
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if error:
+        return [error]
+
+    problems = check_frontmatter(frontmatter)
+    name = frontmatter.get('name')
+    if isinstance(name, str) and name.strip() and name.strip() != folder:
+        problems.append(f"Top-level folder '{folder}' does not match skill name '{name.strip()}'")
+    return problems
+
+
+def indexed_problems(skill_path, index_path):
+    """The skill index's stored problems for a skill folder whose files are unchanged, else None."""
+    from skill_files import iter_skill_files
+    from skill_index import SkillIndex
+
+    if not Path(skill_path).is_dir():
+        return None
+    try:
+        files = [(relpath, st) for relpath, _, st in iter_skill_files(skill_path)]
+    except OSError:
+        return None
+    with SkillIndex(index_path) as index:
+        return index.stored_problems(skill_path, files)
+
 
+def validate_skill(skill_path, index_path=None):
+    """Basic validation of a skill, reusing the skill index's result if given and still current"""
+    problems = indexed_problems(skill_path, index_path) if index_path is not None else None
+    if problems is None:
+        problems = find_problems(skill_path)
+    if problems:
+        return False, problems[0]
     return True, "Skill is valid!"
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python quick_validate.py <skill_directory>")
+    args = sys.argv[1:]
+    index_path = None
+    if len(args) in (2, 3) and args[1] == '--index':
+        from skill_index import default_index_path
+        index_path = args[2] if len(args) == 3 else default_index_path()
+        args = args[:1]
+    if len(args) != 1:
+        print("Usage: python quick_validate.py <skill_directory | skill-name.skill> [--index [index-file]]")
         sys.exit(1)
     
-    valid, message = validate_skill(sys.argv[1])
+    valid, message = validate_skill(args[0], index_path=index_path)
     print(message)
     sys.exit(0 if valid else 1)
\ No newline at end of file
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Skill Delta - Small patch archives between two versions of a .skill file
+
+Usage:
+    python skill_delta.py create <old.skill> <new.skill> [patch-file]
+    python skill_delta.py apply <old.skill> <patch-file> [new.skill]
+
+Examples:
+    python skill_delta.py create dist/v1/my-skill.skill dist/my-skill.skill
+    python skill_delta.py apply my-skill.skill my-skill.skillpatch my-skill-new.skill
+
+A patch (.skillpatch) is a zip file holding only the entries that were added
+or changed in the new archive, copied without recompression, plus a
+DELTA.json manifest listing every entry of the new archive in order, the
+removed entries, and SHA-256 hashes of the old archive, the new archive and
+every entry's compressed bytes.
+
+Applying a patch rebuilds the new archive from the old one and the patch,
+checking each entry against its hash as it is written, and replaces the
+output only if the result hashes to the new archive, so it is byte-identical.
+Creating a patch performs the same rebuild as a check and fails if the new
+archive can't be reproduced exactly.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from package_skill import ZIP_DATE_TIME, append_raw_entry, format_size, read_raw_entry
+from skill_files import hash_file
+
+
+DELTA_VERSION = 1
+DELTA_MANIFEST = 'DELTA.json'
+PATCH_SUFFIX = '.skillpatch'
+
+
+def _signature(info):
+    """Everything about an entry that ends up in the archive bytes, apart from its offset."""
+    return (
+        info.filename, info.date_time, info.compress_type, info.comment, info.extra,
+        info.create_system, info.create_version, info.extract_version, info.reserved,
+        info.flag_bits, info.volume, info.internal_attr, info.external_attr,
+        info.CRC, info.compress_size, info.file_size,
+    )
+
+
+def clone_zip_info(info):
+    """Copy an entry's metadata so it can be written to another archive unchanged."""
+    clone = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    for field in (
+        'compress_type', 'comment', 'extra', 'create_system', 'create_version',
+        'extract_version', 'reserved', 'flag_bits', 'volume', 'internal_attr',
+        'external_attr', 'CRC', 'compress_size', 'file_size',
+    ):
+        setattr(clone, field, getattr(info, field))
+    return clone
+
+
+def _raw_sha256(zf, info):
+    """SHA-256 of an entry's compressed bytes, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in read_raw_entry(zf, info):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hashing(chunks, digest):
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def create_delta(old_path, new_path, patch_path=None):
+    """
+    Write a patch that turns old_path into new_path.
+
+    An entry is reused from the old archive when its name, metadata and
+    compressed bytes are all unchanged; everything else goes into the patch.
+
+    Args:
+        old_path: Previous .skill file
+        new_path: New .skill file
+        patch_path: Output path (defaults to <new>.skillpatch next to new_path)
+
+    Returns:
+        Path to the patch file, or None if error
+    """
+    old_path = Path(old_path).resolve()
+    new_path = Path(new_path).resolve()
+    patch_path = Path(patch_path) if patch_path else new_path.with_suffix(PATCH_SUFFIX)
+
+    try:
+        old_zip = zipfile.ZipFile(old_path)
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"❌ Error: Cannot open {old_path}: {e}")
+        return None
+    try:
+        new_zip = zipfile.ZipFile(new_path)
+    except (OSError, zipfile.BadZipFile) as e:
+        old_zip.close()
+        print(f"❌ Error: Cannot open {new_path}: {e}")
+        return None
+
+    tmp_path = patch_path.with_name(patch_path.name + '.tmp')
+    try:
+        with old_zip, new_zip, zipfile.ZipFile(tmp_path, 'w') as patch:
+            old_infos = {info.filename: info for info in old_zip.infolist()}
+            new_names = {info.filename for info in new_zip.infolist()}
+            entries = []
+            added, changed = [], []
+            patch_size = 0
+            for info in new_zip.infolist():
+                sha256 = _raw_sha256(new_zip, info)
+                old = old_infos.get(info.filename)
+                reuse = (
+                    old is not None
+                    and _signature(old) == _signature(info)
+                    and _raw_sha256(old_zip, old) == sha256
+                )
+                if not reuse:
+                    (changed if old is not None else added).append(info.filename)
+                    append_raw_entry(patch, clone_zip_info(info), read_raw_entry(new_zip, info))
+                    patch_size += info.compress_size
+                entries.append({
+                    'name': info.filename,
+                    'source': 'old' if reuse else 'patch',
+                    'sha256': sha256,
+                })
+
+            delta = {
+                'version': DELTA_VERSION,
+                'old': {'name': old_path.name, 'sha256': hash_file(old_path), 'size': old_path.stat().st_size},
+                'new': {'name': new_path.name, 'sha256': hash_file(new_path), 'size': new_path.stat().st_size},
+                'comment': new_zip.comment.hex(),
+                'entries': entries,
+                'added': added,
+                'changed': changed,
+                'removed': sorted(name for name in old_infos if name not in new_names),
+            }
+            manifest = zipfile.ZipInfo(DELTA_MANIFEST, date_time=ZIP_DATE_TIME)
+            manifest.compress_type = zipfile.ZIP_DEFLATED
+            patch.writestr(manifest, json.dumps(delta, indent=2, sort_keys=True) + '\n')
+    except Exception as e:
+        print(f"❌ Error creating patch: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return None
+
+    # Prove the patch reproduces the new archive before publishing it, rebuilding
+    # into a temporary file, so large archives aren't held in memory
+    try:
+        with tempfile.TemporaryFile() as check:
+            rebuild(old_path, tmp_path, check)
+    except ValueError as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"❌ Error: {new_path.name} can't be rebuilt byte-for-byte from a patch ({e})")
+        print("   Distribute the full archive instead.")
+        return None
+    except (OSError, zipfile.BadZipFile) as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"❌ Error checking patch: {e}")
+        return None
+    os.replace(tmp_path, patch_path)
+
+    print(
+        f"✅ Patch written to {patch_path}: {len(added)} added, {len(changed)} changed, "
+        f"{len(delta['removed'])} removed, {len(entries) - len(added) - len(changed)} reused"
+    )
+    print(
+        f"   {format_size(patch_path.stat().st_size)} instead of {format_size(delta['new']['size'])} "
+        f"({format_size(patch_size)} of entry data)"
+    )
+    if patch_path.stat().st_size >= delta['new']['size']:
+        print("⚠️  The patch is not smaller than the full archive; consider distributing that instead.")
+    return patch_path
+
+
+def rebuild(old_path, patch_path, out):
+    """
+    Write the archive described by a patch to the binary file object out.
+
+    Raises:
+        ValueError: If the old archive or an entry doesn't match the patch's
+            hashes, or the result doesn't hash to the expected archive
+    """
+    with zipfile.ZipFile(patch_path) as patch:
+        try:
+            delta = json.loads(patch.read(DELTA_MANIFEST))
+        except KeyError:
+            raise ValueError(f"{DELTA_MANIFEST} not found in patch")
+        if delta.get('version') != DELTA_VERSION:
+            raise ValueError(f"Unsupported patch version {delta.get('version')}")
+        if hash_file(old_path) != delta['old']['sha256']:
+            raise ValueError(f"{Path(old_path).name} is not the archive this patch was made from "
+                             f"({delta['old']['name']})")
+
+        with zipfile.ZipFile(old_path) as old_zip, zipfile.ZipFile(out, 'w') as zipf:
+            for entry in delta['entries']:
+                source = old_zip if entry['source'] == 'old' else patch
+                try:
+                    info = source.getinfo(entry['name'])
+                except KeyError:
+                    raise ValueError(f"Entry missing from {entry['source']} archive: {entry['name']}")
+                digest = hashlib.sha256()
+                append_raw_entry(zipf, clone_zip_info(info), _hashing(read_raw_entry(source, info), digest))
+                if digest.hexdigest() != entry['sha256']:
+                    raise ValueError(f"Hash mismatch for entry {entry['name']}")
+            zipf.comment = bytes.fromhex(delta['comment'])
+
+    out.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: out.read(1024 * 1024), b''):
+        digest.update(chunk)
+    if digest.hexdigest() != delta['new']['sha256']:
+        raise ValueError("Rebuilt archive does not match the expected SHA-256")
+    return delta
+
+
+def apply_delta(old_path, patch_path, output_path=None):
+    """
+    Rebuild the new archive from the old one and a patch.
+
+    The result is written to a temp file and renamed into place only once its
+    SHA-256 matches the patch manifest.
+
+    Args:
+        old_path: The .skill file the patch was created from
+        patch_path: The .skillpatch file
+        output_path: Where to write the new archive (defaults to the name
+            recorded in the patch, next to the patch file)
+
+    Returns:
+        Path to the rebuilt .skill file, or None if error
+    """
+    patch_path = Path(patch_path)
+    try:
+        with zipfile.ZipFile(patch_path) as patch:
+            new_name = json.loads(patch.read(DELTA_MANIFEST))['new']['name']
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"❌ Error: Not a valid patch file {patch_path}: {e}")
+        return None
+
+    output_path = Path(output_path) if output_path else patch_path.with_name(new_name)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w+b') as out:
+            delta = rebuild(old_path, patch_path, out)
+        os.replace(tmp_path, output_path)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"❌ Error applying patch: {e}")
+        return None
+
+    print(f"✅ Rebuilt {output_path} (SHA-256 {delta['new']['sha256'][:12]}… verified)")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and apply patches between .skill versions.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = commands.add_parser('create', help="Write a patch from an old to a new .skill file")
+    create_parser.add_argument('old', help="Previous .skill file")
+    create_parser.add_argument('new', help="New .skill file")
+    create_parser.add_argument('patch', nargs='?', help="Patch file (default: <new>.skillpatch)")
+
+    apply_parser = commands.add_parser('apply', help="Rebuild a .skill file from the old one and a patch")
+    apply_parser.add_argument('old', help=".skill file the patch was created from")
+    apply_parser.add_argument('patch', help="Patch file")
+    apply_parser.add_argument('output', nargs='?', help="Output .skill file (default: name from the patch)")
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        result = create_delta(args.old, args.new, args.patch)
+    else:
+        result = apply_delta(args.old, args.patch, args.output)
+    sys.exit(0 if result else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Skill file discovery - walks skill folders with .skillignore support
+
+A skill folder may contain a .skillignore file in gitignore syntax listing
+files and directories to leave out of the package. Build artifacts such as
+.git/, __pycache__/, node_modules/ and virtualenvs are ignored unless a
+"!pattern" line re-includes them, and ignored directories are pruned before
+they are descended into.
+
+Usage:
+    python skill_files.py <path/to/skill-folder>
+
+Lists the files that would be packaged, one per line.
+"""
+
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+
+IGNORE_FILENAME = '.skillignore'
+
+# Applied before the skill's own .skillignore, so a skill can re-include any of
+# these with a "!pattern" line.
+DEFAULT_IGNORE_PATTERNS = (
+    '.git/',
+    '.hg/',
+    '.svn/',
+    '__pycache__/',
+    'node_modules/',
+    '.venv/',
+    'venv/',
+    '.tox/',
+    '.nox/',
+    '.mypy_cache/',
+    '.pytest_cache/',
+    '.ruff_cache/',
+    '*.py[cod]',
+    '*.egg-info/',
+    '.DS_Store',
+    'Thumbs.db',
+    IGNORE_FILENAME,
+)
+
+# A directory holding this file is a virtualenv, whatever it is called, and is
+# ignored unless a "!pattern" line re-includes it
+VENV_MARKER = 'pyvenv.cfg'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _translate_glob(pattern):
+    """Translate one gitignore glob (without anchoring) into a regex fragment."""
+    parts = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                j = i + 2
+                if at_start and pattern.startswith('/', j):
+                    # "**/" matches zero or more leading directories
+                    parts.append('(?:.*/)?')
+                    i = j + 1
+                    continue
+                if at_start and j == n:
+                    # trailing "/**" matches everything inside
+                    parts.append('.*')
+                    i = j
+                    continue
+                # any other run of asterisks behaves like a single "*"
+                while i < n and pattern[i] == '*':
+                    i += 1
+                parts.append('[^/]*')
+                continue
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+def _parse_line(line):
+    """
+    Parse one .skillignore line.
+
+    Returns:
+        (regex, negate, dir_only) or None for blank lines and comments
+    """
+    line = line.rstrip('\n').rstrip('\r')
+    # Trailing spaces are ignored unless escaped with a backslash
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+    if not line or line.startswith('#'):
+        return None
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    elif line.startswith('\\#') or line.startswith('\\!'):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the skill root
+    if '/' in line:
+        regex = _translate_glob(line.lstrip('/'))
+    else:
+        regex = '(?:.*/)?' + _translate_glob(line)
+    return regex, negate, dir_only
+
+
+class IgnoreMatcher:
+    """
+    Compiled set of gitignore-style rules.
+
+    All rules are folded into a single regex per path kind (file or directory)
+    with the rules in reverse order, so one match() call finds the last rule
+    that applies, which is the one that decides the outcome.
+    """
+
+    def __init__(self, lines):
+        self.rules = [rule for rule in map(_parse_line, lines) if rule is not None]
+        self._dir_regex = self._compile(self.rules)
+        self._file_regex = self._compile([rule for rule in self.rules if not rule[2]])
+
+    def _compile(self, rules):
+        if not rules:
+            return None
+        alternatives = [
+            f'(?P<{"n" if negate else "i"}{index}>{regex})'
+            for index, (regex, negate, _) in reversed(list(enumerate(rules)))
+        ]
+        return re.compile('^(?:' + '|'.join(alternatives) + ')$', re.DOTALL)
+
+    def ignored(self, relpath, is_dir=False):
+        """True if the path, relative to the skill root with '/' separators, is ignored."""
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+        match = regex.match(relpath)
+        return bool(match) and match.lastgroup.startswith('i')
+
+    def reincluded(self, relpath, is_dir=False):
+        """True if the rule that decides the path is a "!pattern" line."""
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+        match = regex.match(relpath)
+        return bool(match) and match.lastgroup.startswith('n')
+
+
+def load_ignore_matcher(skill_path):
+    """Build the matcher for a skill: built-in defaults plus its .skillignore, if any."""
+    lines = list(DEFAULT_IGNORE_PATTERNS)
+    try:
+        with open(Path(skill_path) / IGNORE_FILENAME, encoding='utf-8') as f:
+            lines.extend(f)
+    except FileNotFoundError:
+        pass
+    return IgnoreMatcher(lines)
+
+
+def iter_skill_files(skill_path, matcher=None):
+    """
+    Walk a skill folder with os.scandir, skipping ignored paths.
+
+    Ignored directories and virtualenvs are pruned without being listed. A
+    virtualenv (a directory holding pyvenv.cfg) is kept if a "!pattern" line
+    re-includes that directory.
+    Symlinked directories are not followed. Each file's stat result comes from
+    its directory entry, so callers don't need to stat files again.
+
+    Yields:
+        (relpath, path, stat_result) with relpath relative to skill_path using '/'
+    """
+    root = os.fspath(skill_path)
+    if matcher is None:
+        matcher = load_ignore_matcher(root)
+
+    stack = [(root, '')]
+    while stack:
+        dirpath, prefix = stack.pop()
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        if (prefix and any(entry.name == VENV_MARKER for entry in entries)
+                and not matcher.reincluded(prefix[:-1], is_dir=True)):
+            continue
+
+        for entry in entries:
+            relpath = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not matcher.ignored(relpath, is_dir=True):
+                    stack.append((entry.path, relpath + '/'))
+            elif entry.is_file():
+                if not matcher.ignored(relpath):
+                    yield relpath, entry.path, entry.stat()
+
+
+def hash_file(file_path):
+    """Return the SHA-256 hex digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_skill_dirs(root):
+    """
+    Find skill folders under root: directories that contain a SKILL.md file.
+
+    The search prunes the default ignored directories and does not descend into
+    a skill folder once it is found, so example skills nested inside another
+    skill's assets are not picked up.
+    """
+    matcher = IgnoreMatcher(DEFAULT_IGNORE_PATTERNS)
+    skill_dirs = []
+    stack = [(os.fspath(root), '')]
+    while stack:
+        dirpath, prefix = stack.pop()
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        if any(entry.name == 'SKILL.md' and entry.is_file() for entry in entries):
+            skill_dirs.append(Path(dirpath))
+            continue
+        for entry in entries:
+            relpath = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False) and not matcher.ignored(relpath, is_dir=True):
+                stack.append((entry.path, relpath + '/'))
+    return sorted(skill_dirs)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python skill_files.py <path/to/skill-folder>")
+        sys.exit(1)
+
+    for relpath, _, _ in sorted(iter_skill_files(sys.argv[1])):
+        print(relpath)
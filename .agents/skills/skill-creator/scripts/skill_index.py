@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Skill Index - Persistent SQLite index of skills for instant lookup and search
+
+Usage:
+    python skill_index.py update <path/to/skills-root> [--index index.sqlite]
+    python skill_index.py search <keyword> [<keyword> ...] [--root path] [--json]
+    python skill_index.py show <skill-name> [--json]
+    python skill_index.py duplicates [--root path]
+
+Examples:
+    python skill_index.py update .agents/skills
+    python skill_index.py search postgres auth
+    python skill_index.py duplicates --root .agents/skills
+
+The index records, for every skill folder found under a root, its name and
+description, its file list with sizes and SHA-256 hashes, and the result of
+the quick_validate checks. Updates are incremental: a file is only re-hashed
+when its size or mtime changed, and a skill is only re-parsed and revalidated
+when its contents or the validator changed. Queries read the index without
+touching the skill folders.
+
+The default index lives in $XDG_CACHE_HOME/skill-creator/index.sqlite.
+package_skill.py, quick_validate.py and batch_validate.py take --index to
+reuse its stored validation results for skills whose files still have their
+indexed sizes and mtimes, instead of revalidating every skill; the packager
+also takes the indexed hashes of those files instead of reading them again.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from quick_validate import VALIDATOR_VERSION, find_problems, parse_frontmatter, read_frontmatter
+from skill_files import find_skill_dirs, hash_file, iter_skill_files
+
+
+# Bump when the schema changes; an index with another version is rebuilt
+INDEX_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE skills (
+    path TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    skill_md_sha256 TEXT,
+    file_count INTEGER NOT NULL,
+    total_size INTEGER NOT NULL,
+    validator_version INTEGER NOT NULL,
+    problems TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX skills_name ON skills (name);
+CREATE TABLE files (
+    skill_path TEXT NOT NULL REFERENCES skills (path) ON DELETE CASCADE,
+    relpath TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (skill_path, relpath)
+);
+"""
+
+
+def default_index_path():
+    """Index file location, following the XDG base directory convention."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'skill-creator' / 'index.sqlite'
+
+
+def _read_metadata(skill_dir):
+    """Return (name, description) from SKILL.md, or None for anything unreadable."""
+    try:
+        with open(skill_dir / 'SKILL.md') as f:
+            frontmatter_text, error = read_frontmatter(f)
+    except OSError:
+        return None, None
+    if error:
+        return None, None
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if error:
+        return None, None
+    name = frontmatter.get('name')
+    description = frontmatter.get('description')
+    return (
+        name.strip() if isinstance(name, str) else None,
+        description.strip() if isinstance(description, str) else None,
+    )
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _under(path, root):
+    """True if path is root or lies inside it."""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class SkillIndex:
+    """
+    SQLite-backed index of skill folders.
+
+    Use as a context manager, or call close() when done. Paths are stored
+    resolved, so one index can hold skills from several roots.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else default_index_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != INDEX_VERSION:
+            with self.conn:
+                self.conn.execute('DROP TABLE IF EXISTS files')
+                self.conn.execute('DROP TABLE IF EXISTS skills')
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(f'PRAGMA user_version = {INDEX_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def update(self, root):
+        """
+        Bring the index up to date with the skills under root.
+
+        Files whose size and mtime are unchanged keep their stored hash. Skills
+        whose files and validator version are unchanged are not touched.
+        Skills that were indexed under root but no longer exist are removed.
+
+        Returns:
+            Dict of 'added', 'updated', 'removed' and 'unchanged' skill paths
+        """
+        root = str(Path(root).resolve())
+        changes = {'added': [], 'updated': [], 'removed': [], 'unchanged': []}
+        seen = set()
+
+        with self.conn:
+            for skill_dir in find_skill_dirs(root):
+                path = str(skill_dir)
+                seen.add(path)
+                row = self.conn.execute(
+                    'SELECT validator_version FROM skills WHERE path = ?', (path,)
+                ).fetchone()
+                known = {
+                    file_row['relpath']: file_row
+                    for file_row in self.conn.execute(
+                        'SELECT relpath, size, mtime_ns, sha256 FROM files WHERE skill_path = ?', (path,)
+                    )
+                }
+
+                files = []
+                touched = []
+                changed = False
+                for relpath, file_path, st in iter_skill_files(skill_dir):
+                    old = known.get(relpath)
+                    if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+                        sha256 = old['sha256']
+                    else:
+                        sha256 = hash_file(file_path)
+                        if old is None or old['sha256'] != sha256:
+                            changed = True
+                        else:
+                            touched.append((st.st_mtime_ns, path, relpath))
+                    files.append((path, relpath, st.st_size, st.st_mtime_ns, sha256))
+                changed = changed or len(files) != len(known)
+
+                if row is not None and not changed and row['validator_version'] == VALIDATOR_VERSION:
+                    # Same contents with a new mtime: store it so the next
+                    # update can skip hashing these files again
+                    self.conn.executemany(
+                        'UPDATE files SET mtime_ns = ? WHERE skill_path = ? AND relpath = ?', touched
+                    )
+                    changes['unchanged'].append(path)
+                    continue
+
+                name, description = _read_metadata(skill_dir)
+                skill_md_sha256 = next((f[4] for f in files if f[1] == 'SKILL.md'), None)
+                self.conn.execute('DELETE FROM skills WHERE path = ?', (path,))
+                self.conn.execute(
+                    'INSERT INTO skills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        path, name, description, skill_md_sha256, len(files),
+                        sum(f[2] for f in files), VALIDATOR_VERSION,
+                        json.dumps(find_problems(skill_dir)), time.time(),
+                    ),
+                )
+                self.conn.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?)', files)
+                changes['added' if row is None else 'updated'].append(path)
+
+            for (path,) in self.conn.execute('SELECT path FROM skills').fetchall():
+                if _under(path, root) and path not in seen:
+                    self.conn.execute('DELETE FROM skills WHERE path = ?', (path,))
+                    changes['removed'].append(path)
+
+        return changes
+
+    def stored_problems(self, skill_dir, files):
+        """
+        The stored validation result of a skill, if it still applies.
+
+        Args:
+            skill_dir: Skill folder
+            files: (relpath, stat_result) pairs of the skill's files to check,
+                e.g. from iter_skill_files()
+
+        Returns:
+            The stored problems (empty if valid) when the skill was indexed
+            with the current validator and every given file has its indexed
+            size and mtime, else None
+        """
+        path = str(Path(skill_dir).resolve())
+        row = self.conn.execute(
+            'SELECT validator_version, problems FROM skills WHERE path = ?', (path,)
+        ).fetchone()
+        if row is None or row['validator_version'] != VALIDATOR_VERSION:
+            return None
+        known = {
+            file_row['relpath']: (file_row['size'], file_row['mtime_ns'])
+            for file_row in self.conn.execute(
+                'SELECT relpath, size, mtime_ns FROM files WHERE skill_path = ?', (path,)
+            )
+        }
+        for relpath, st in files:
+            if known.get(relpath) != (st.st_size, st.st_mtime_ns):
+                return None
+        return json.loads(row['problems'])
+
+    def stored_files(self, skill_dir):
+        """
+        The indexed files of a skill.
+
+        Returns:
+            Dict of relpath -> {'size', 'mtime_ns', 'sha256'} (empty if the
+            skill is not indexed); callers compare size and mtime before
+            trusting a hash
+        """
+        path = str(Path(skill_dir).resolve())
+        return {
+            file_row['relpath']: {
+                'size': file_row['size'], 'mtime_ns': file_row['mtime_ns'], 'sha256': file_row['sha256'],
+            }
+            for file_row in self.conn.execute(
+                'SELECT relpath, size, mtime_ns, sha256 FROM files WHERE skill_path = ?', (path,)
+            )
+        }
+
+    def _skill_dict(self, row, with_files=False):
+        skill = {
+            'path': row['path'],
+            'name': row['name'],
+            'description': row['description'],
+            'skill_md_sha256': row['skill_md_sha256'],
+            'file_count': row['file_count'],
+            'total_size': row['total_size'],
+            'problems': json.loads(row['problems']),
+            'indexed_at': row['indexed_at'],
+        }
+        skill['valid'] = not skill['problems']
+        if with_files:
+            skill['files'] = [
+                dict(file_row)
+                for file_row in self.conn.execute(
+                    'SELECT relpath, size, sha256 FROM files WHERE skill_path = ? ORDER BY relpath',
+                    (row['path'],),
+                )
+            ]
+        return skill
+
+    def skills(self, root=None):
+        """All indexed skills, optionally only those under root, sorted by path."""
+        rows = self.conn.execute('SELECT * FROM skills ORDER BY path').fetchall()
+        if root is not None:
+            root = str(Path(root).resolve())
+            rows = [row for row in rows if _under(row['path'], root)]
+        return [self._skill_dict(row) for row in rows]
+
+    def get(self, name):
+        """Skills with the given name, including their file lists."""
+        rows = self.conn.execute('SELECT * FROM skills WHERE name = ? ORDER BY path', (name,)).fetchall()
+        return [self._skill_dict(row, with_files=True) for row in rows]
+
+    def search(self, keywords, root=None):
+        """
+        Find skills whose name or description contains every keyword.
+
+        Matching is case-insensitive. Skills matching a keyword in their name
+        rank before those that only match in the description.
+        """
+        if not keywords:
+            return self.skills(root)
+        where = []
+        params = []
+        name_hits = []
+        for keyword in keywords:
+            pattern = f"%{_escape_like(keyword)}%"
+            where.append("(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+            name_hits.append("(name LIKE ? ESCAPE '\\')")
+        rank = ' + '.join(name_hits)
+        rows = self.conn.execute(
+            f"SELECT * FROM skills WHERE {' AND '.join(where)} ORDER BY ({rank}) DESC, name, path",
+            params + [f"%{_escape_like(keyword)}%" for keyword in keywords],
+        ).fetchall()
+        if root is not None:
+            root = str(Path(root).resolve())
+            rows = [row for row in rows if _under(row['path'], root)]
+        return [self._skill_dict(row) for row in rows]
+
+    def duplicates(self, root=None):
+        """Map each skill name used by more than one folder to those folders."""
+        by_name = {}
+        for skill in self.skills(root):
+            if skill['name']:
+                by_name.setdefault(skill['name'], []).append(skill['path'])
+        return {name: paths for name, paths in sorted(by_name.items()) if len(paths) > 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index skills for instant lookup and search.")
+    parser.add_argument('--index', help="Index file (default: $XDG_CACHE_HOME/skill-creator/index.sqlite)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = commands.add_parser('update', help="Index every skill under a root folder")
+    update_parser.add_argument('skills_root', help="Folder containing skill folders")
+
+    search_parser = commands.add_parser('search', help="Keyword search over names and descriptions")
+    search_parser.add_argument('keywords', nargs='+', help="Keywords that must all match")
+    search_parser.add_argument('--root', help="Only skills under this folder")
+    search_parser.add_argument('--json', action='store_true', help="Print JSON")
+
+    show_parser = commands.add_parser('show', help="Show indexed details of a skill")
+    show_parser.add_argument('name', help="Skill name")
+    show_parser.add_argument('--json', action='store_true', help="Print JSON")
+
+    duplicates_parser = commands.add_parser('duplicates', help="List skill names used by more than one folder")
+    duplicates_parser.add_argument('--root', help="Only skills under this folder")
+    args = parser.parse_args()
+
+    with SkillIndex(args.index) as index:
+        if args.command == 'update':
+            start = time.perf_counter()
+            changes = index.update(args.skills_root)
+            print(
+                f"✅ Indexed {args.skills_root} in {time.perf_counter() - start:.3f}s: "
+                + ', '.join(f"{len(paths)} {kind}" for kind, paths in changes.items())
+            )
+            for kind in ('added', 'updated', 'removed'):
+                for path in changes[kind]:
+                    print(f"  {kind.capitalize()}: {path}")
+
+        elif args.command == 'search':
+            results = index.search(args.keywords, root=args.root)
+            if args.json:
+                print(json.dumps(results, indent=2))
+            elif not results:
+                print(f"🔍 No skills match: {' '.join(args.keywords)}")
+                sys.exit(1)
+            else:
+                for skill in results:
+                    print(f"{'✅' if skill['valid'] else '❌'} {skill['name'] or '(unnamed)'}  {skill['path']}")
+                    if skill['description']:
+                        print(f"   {skill['description']}")
+
+        elif args.command == 'show':
+            results = index.get(args.name)
+            if not results:
+                print(f"❌ Error: No indexed skill named '{args.name}'")
+                sys.exit(1)
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                for skill in results:
+                    print(f"📄 {skill['name']}  {skill['path']}")
+                    print(f"   {skill['description']}")
+                    print(f"   {skill['file_count']} files, {skill['total_size']} bytes")
+                    for problem in skill['problems']:
+                        print(f"   ❌ {problem}")
+                    for file_row in skill['files']:
+                        print(f"   {file_row['sha256'][:12]}  {file_row['size']:>9}  {file_row['relpath']}")
+
+        elif args.command == 'duplicates':
+            duplicates = index.duplicates(root=args.root)
+            if not duplicates:
+                print("✅ No duplicate skill names")
+            for name, paths in duplicates.items():
+                print(f"❌ '{name}' is used by {len(paths)} skills:")
+                for path in paths:
+                    print(f"   {path}")
+            sys.exit(1 if duplicates else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Forbidden-assumption scanner driven by fixtures/prompt-enhancement-evals.json.
+
+Every case in the fixture lists phrases an enhanced prompt must not assume
+(forbiddenAssumptions). All phrases of all cases are compiled into one
+Aho-Corasick automaton, so a response is scanned in a single pass with
+amortized constant work per character, however many phrases the fixture
+grows to.
+
+Matching is case-insensitive and whitespace-insensitive (any run of
+whitespace matches a single space), and a match must start and end on word
+boundaries.
+"""
+
+import json
+import re
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "prompt-enhancement-evals.json"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse whitespace runs to single spaces."""
+    return _WHITESPACE_RE.sub(" ", text.casefold()).strip()
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over normalized phrases.
+
+    Args:
+        phrases: Phrases to find; find() reports them by index.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = [normalize(phrase) for phrase in phrases]
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, phrase in enumerate(self.phrases):
+            if not phrase:
+                continue
+            state = 0
+            for char in phrase:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(index)
+
+        # Breadth-first failure links; each state's outputs include those of its longest proper suffix
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                suffix = fail[state]
+                while suffix and char not in goto[suffix]:
+                    suffix = fail[suffix]
+                fail[child] = goto[suffix].get(char, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (start, end, phrase index) for every whole-word match in normalized text.
+
+        The caller normalizes text (see normalize()) so offsets refer to the same string.
+        """
+        goto, fail, outputs, phrases = self._goto, self._fail, self._outputs, self.phrases
+        state = 0
+        for position, char in enumerate(text):
+            # Each failure step shortens the current match, so the total is bounded by len(text)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                end = position + 1
+                for index in outputs[state]:
+                    start = end - len(phrases[index])
+                    if _boundary(text, start - 1, start) and _boundary(text, end - 1, end):
+                        yield start, end, index
+
+
+def _boundary(text: str, left: int, right: int) -> bool:
+    """Whether the gap between text[left] and text[right] is a word boundary."""
+    before = text[left] if left >= 0 else " "
+    after = text[right] if right < len(text) else " "
+    return not (before.isalnum() and after.isalnum())
+
+
+class AssumptionScanner:
+    """
+    Finds the forbidden assumptions of fixture cases in responses.
+
+    Args:
+        cases: Fixture cases, each with 'id' and 'forbiddenAssumptions'.
+    """
+
+    def __init__(self, cases: Iterable[Dict[str, Any]]):
+        phrase_index: Dict[str, int] = {}
+        self.phrase_cases: List[List[str]] = []
+        self.case_phrases: Dict[str, List[str]] = {}
+        for case in cases:
+            self.case_phrases[case["id"]] = []
+            for phrase in case.get("forbiddenAssumptions") or ():
+                key = normalize(phrase)
+                if not key:
+                    continue
+                if key not in phrase_index:
+                    phrase_index[key] = len(phrase_index)
+                    self.phrase_cases.append([])
+                self.phrase_cases[phrase_index[key]].append(case["id"])
+                self.case_phrases[case["id"]].append(key)
+        self.automaton = PhraseAutomaton(phrase_index)
+
+    @classmethod
+    def from_fixture(cls, path: Path = FIXTURE_PATH) -> "AssumptionScanner":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str, case_id: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        (case id, phrase) pairs whose phrase appears in text.
+
+        Args:
+            text: The response to scan.
+            case_id: Only report this case's phrases; all cases when None.
+        """
+        matched = sorted({index for _, _, index in self.automaton.find(normalize(text))})
+        pairs = []
+        for index in matched:
+            for matched_case in self.phrase_cases[index]:
+                if case_id is None or matched_case == case_id:
+                    pairs.append((matched_case, self.automaton.phrases[index]))
+        return pairs
+
+
+_default_scanner: Optional[AssumptionScanner] = None
+
+
+def default_scanner() -> AssumptionScanner:
+    """The scanner for the bundled fixture, built once per process."""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = AssumptionScanner.from_fixture()
+    return _default_scanner
@@ -0,0 +1,173 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Offline throughput benchmark for the Pitseleh eval harness.
+
+Runs test_Pitseleh.py with --async-engine against stub_server.py for every
+combination of dataset size and concurrency ceiling, and reports:
+
+- rows/s over the engine run and end to end (including pytest startup,
+  collection and the test phase)
+- p50/p95/p99 per-row latency (agent call plus judge call)
+- harness CPU time (user + system of the pytest process), so regressions in
+  the harness itself show up even though the stub's latency dominates wall time
+
+Each run uses a fresh copy of the suite in a temporary folder with a
+generated dataset, and the response cache is disabled.
+
+Usage:
+    python bench_harness.py [--sizes 100,1000] [--concurrency 4,16] [--latency lognormal:0.05,0.5]
+        [--save baseline.json] [--baseline baseline.json --tolerance 0.2]
+
+Exits with 1 when --baseline is given and a run is slower, or uses more CPU
+per row, than the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from stub_server import StubConfig, StubServer
+
+SUITE_DIR = Path(__file__).resolve().parent
+
+# Values that pass the plugin's marker validation; all traffic goes to the stub
+BENCH_ENV = {
+    "FOUNDRY_PROJECT_ENDPOINT": "https://bench.services.ai.azure.com/api/projects/bench",
+    "AZURE_OPENAI_ENDPOINT": "https://bench.openai.azure.com",
+    "AZURE_OPENAI_DEPLOYMENT_NAME": "bench",
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def prepare_suite(folder: Path, size: int):
+    """Copy the suite into folder with a generated dataset of size rows."""
+    for path in SUITE_DIR.iterdir():
+        if path.suffix == ".py" or path.name == "pytest.ini":
+            shutil.copy(path, folder / path.name)
+    shutil.copytree(SUITE_DIR / "fixtures", folder / "fixtures")
+    with open(folder / "data.jsonl", "w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(json.dumps({"id": f"row{i}", "query": f"Improve this prompt, variant {i}"}) + "\n")
+
+
+def run_once(size: int, concurrency: int, stub_config: StubConfig):
+    """Run the suite once and return its measurements."""
+    with tempfile.TemporaryDirectory(prefix="pitseleh-bench-") as tmp, StubServer(stub_config) as stub:
+        folder = Path(tmp)
+        prepare_suite(folder, size)
+        report = folder / "engine-report.json"
+        command = [
+            sys.executable, "-m", "pytest", "test_Pitseleh.py", "-q",
+            "--async-engine", "--stub-url", stub.url,
+            "--agent-concurrency", str(concurrency), "--judge-concurrency", str(concurrency),
+            "--engine-report", str(report),
+        ]
+
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        process = subprocess.run(command, cwd=folder, env={**os.environ, **BENCH_ENV},
+                                 capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        if not report.exists():
+            raise RuntimeError(f"pytest did not run the engine (exit {process.returncode}):\n"
+                               f"{process.stdout[-2000:]}{process.stderr[-2000:]}")
+        engine = json.loads(report.read_text(encoding="utf-8"))
+        totals = [latency["total"] for latency in engine["row_latencies"]]
+        cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        return {
+            "size": size,
+            "concurrency": concurrency,
+            "exit_code": process.returncode,
+            "row_errors": engine["row_errors"],
+            "engine_seconds": engine["seconds"],
+            "engine_rows_per_s": size / max(engine["seconds"], 1e-9),
+            "wall_seconds": wall,
+            "wall_rows_per_s": size / max(wall, 1e-9),
+            "p50": percentile(totals, 0.50),
+            "p95": percentile(totals, 0.95),
+            "p99": percentile(totals, 0.99),
+            "cpu_seconds": cpu,
+            "cpu_ms_per_row": cpu / size * 1000,
+            "stub": dict(stub.config.stats),
+        }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a saved baseline."""
+    previous = {(run["size"], run["concurrency"]): run for run in baseline["runs"]}
+    regressions = []
+    for run in results:
+        old = previous.get((run["size"], run["concurrency"]))
+        if old is None:
+            continue
+        label = f"size={run['size']} concurrency={run['concurrency']}"
+        if run["engine_rows_per_s"] < old["engine_rows_per_s"] * (1 - tolerance):
+            regressions.append(f"{label}: {run['engine_rows_per_s']:.1f} rows/s, "
+                               f"baseline {old['engine_rows_per_s']:.1f}")
+        if run["cpu_ms_per_row"] > old["cpu_ms_per_row"] * (1 + tolerance):
+            regressions.append(f"{label}: {run['cpu_ms_per_row']:.2f} CPU ms/row, "
+                               f"baseline {old['cpu_ms_per_row']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the eval harness against the local stub server.")
+    parser.add_argument("--sizes", default="100,1000", help="Comma-separated dataset sizes")
+    parser.add_argument("--concurrency", default="4,16", help="Comma-separated agent/judge concurrency ceilings")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="Stub latency distribution for both services")
+    parser.add_argument("--agent-latency", default=None)
+    parser.add_argument("--judge-latency", default=None)
+    parser.add_argument("--capacity", type=int, default=0, help="Stub concurrent capacity before 429s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file as a baseline")
+    parser.add_argument("--baseline", default=None, help="Compare against a baseline written with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>6} {'conc':>5} {'rows/s':>8} {'e2e/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'cpu s':>7} {'cpu ms/row':>10} {'errors':>6}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        for concurrency in [int(value) for value in args.concurrency.split(",")]:
+            stub_config = StubConfig(args.latency, args.capacity, args.throttle_rate, args.retry_after,
+                                     args.seed, error_rate=args.error_rate, agent_latency=args.agent_latency,
+                                     judge_latency=args.judge_latency)
+            run = run_once(size, concurrency, stub_config)
+            results.append(run)
+            print(f"{size:>6} {concurrency:>5} {run['engine_rows_per_s']:>8.1f} {run['wall_rows_per_s']:>8.1f} "
+                  f"{run['p50']:>7.3f} {run['p95']:>7.3f} {run['p99']:>7.3f} "
+                  f"{run['cpu_seconds']:>7.2f} {run['cpu_ms_per_row']:>10.2f} {run['row_errors']:>6}",
+                  flush=True)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({"args": vars(args), "runs": results}, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
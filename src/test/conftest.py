@@ -0,0 +1,682 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Local pytest hooks for the Pitseleh agent eval suite.
+
+These sit on top of the pytest-agent-evals plugin:
+
+- Agent response cache (--response-cache): Foundry agent responses are kept
+  across sessions in a SQLite cache (see response_cache.py), and hit/miss
+  counts are reported at the end of the session.
+- Row batching: the first test of a dataset row runs every evaluator
+  declared for that row in one batch (see evaluator_batch.py); the row's
+  other tests reuse the results. Tests whose evaluators were skipped by a
+  failing gate evaluator (see evaluators.py) are reported as skipped. Each row's tests form one xdist group, so
+  run with --dist loadgroup (set in pytest.ini) to keep them on one worker.
+- Async engine (--async-engine): instead of xdist workers, eval_engine.py
+  runs every row from one event loop with adaptive concurrency before the
+  tests execute, and the tests assert on its results. --stub-url points it
+  at stub_server.py instead of Azure.
+- Dataset loading: dataset files are indexed once by byte offset (see
+  dataset_loader.py) and rows are read on demand. --shard, --ids and
+  --sample/--seed choose which rows run.
+- Results store: every session appends its row-level scores, latencies and
+  token usage to a SQLite history (see results_store.py), which the
+  results_store.py CLI aggregates and diffs across runs.
+- Tracing (--trace-file FILE, --trace-summary): timing spans and token counts
+  per phase and row (see tracing.py), written as a Chrome trace and
+  summarized as histograms at the end of the session.
+- Early stopping (--early-stop): each evaluator's running pass rate is tested
+  sequentially against --early-stop-target (see sequential.py). Once it is
+  settled, rows that have not reached the evaluator skip it, and tests whose
+  row has nothing left to evaluate are skipped before the agent runs.
+- Incremental runs (--incremental): (row, evaluator) pairs whose input
+  fingerprints (see incremental.py) match a stored pass/fail result reuse
+  it instead of running again. --full forces a complete run.
+- Fast start (--fast-start): small runs skip the xdist workers and run in
+  this process; it is on by default when --ids or --sample select at most
+  FAST_START_ROWS rows. The response cache opens on first use, and the
+  Foundry agent runs of a process share the session's credential (and its
+  token cache) and one pydantic validator for stored responses.
+
+The options, per-process state, xdist hand-off and terminal summary of the
+response cache, results store, tracing, incremental runs and early stopping
+live with those modules (their add_options(), configure(), worker_output(),
+merge_worker_output(), finish() and summary_lines()); the hooks here wire
+them together. The async engine's glue stays here, so eval_engine.py (and
+httpx) is only imported for --async-engine runs.
+"""
+
+import asyncio
+import json
+import linecache
+import time
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from dataset_loader import load_case, load_index, parse_ids, parse_shard, select
+from evaluator_batch import evaluator_spec, judge_model_config, run_evaluators
+from plugin_compat import evaluator_messages
+from response_cache import REUSED_RESPONSE_TYPE, CachedAgentRunner, response_from_json, reused_response, session_cache
+from results_store import agent_identity
+import incremental
+import plugin_compat
+import response_cache
+import results_store
+import sequential
+import tracing
+from tracing import span
+
+# Selections of at most this many rows per dataset run in-process: starting
+# xdist workers, each importing the Azure SDKs again, costs more than the rows.
+FAST_START_ROWS = 4
+
+# Modules whose per-process state xdist workers hand to the controller
+SESSION_MODULES = (response_cache, results_store, tracing, sequential, incremental)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("pitseleh", "Pitseleh agent evals")
+    response_cache.add_options(group)
+    group.addoption(
+        "--async-engine",
+        action="store_true",
+        help="Run all rows from one asyncio event loop with adaptive concurrency instead of xdist workers.",
+    )
+    group.addoption(
+        "--fast-start",
+        action="store_true",
+        help=f"Run in this process instead of starting xdist workers (default when --ids or --sample "
+             f"select at most {FAST_START_ROWS} rows and -n is not given).",
+    )
+    group.addoption(
+        "--agent-concurrency",
+        type=int,
+        default=16,
+        help="Most concurrent agent requests the async engine may grow to (default: 16).",
+    )
+    group.addoption(
+        "--judge-concurrency",
+        type=int,
+        default=16,
+        help="Most concurrent judge requests the async engine may grow to (default: 16).",
+    )
+    group.addoption(
+        "--stub-url",
+        default=None,
+        help="Send the async engine's agent and judge traffic to this stub_server.py instead of Azure.",
+    )
+    group.addoption(
+        "--engine-report",
+        default=None,
+        help="Write the async engine's throughput, endpoint stats and per-row latencies to this JSON file.",
+    )
+    group.addoption(
+        "--shard",
+        default=None,
+        help="Run only shard K of N (e.g. 1/4) of every dataset file, assigned by a stable hash of the row id.",
+    )
+    group.addoption(
+        "--ids",
+        default=None,
+        help="Run only these dataset row ids: comma-separated, or @file with one id per line.",
+    )
+    group.addoption(
+        "--sample",
+        type=int,
+        default=None,
+        help="Run a random sample of N rows from every dataset file (after --ids and --shard).",
+    )
+    group.addoption(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for --sample (default: 0).",
+    )
+    results_store.add_options(group)
+    tracing.add_options(group)
+    incremental.add_options(group)
+    sequential.add_options(group)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    problem = plugin_compat.check()
+    if problem:
+        raise pytest.UsageError(problem)
+    try:
+        config._dataset_shard = parse_shard(config.getoption("--shard"))
+        config._dataset_ids = parse_ids(config.getoption("--ids"))
+        sequential.configure(config)
+        incremental.configure(config)
+    except (OSError, ValueError) as e:
+        raise pytest.UsageError(str(e))
+
+    # The async engine replaces xdist workers, and small selections are not worth starting them
+    if config.getoption("--async-engine") or _fast_start(config):
+        if hasattr(config.option, "numprocesses"):
+            config.option.numprocesses = None
+        if hasattr(config.option, "dist"):
+            config.option.dist = "no"
+
+    config._engine_results = {}
+    config._engine_stats = None
+    config._credential = None
+    response_cache.configure(config)
+    results_store.configure(config)
+    tracing.configure(config)
+
+
+def _fast_start(config) -> bool:
+    if config.getoption("--fast-start"):
+        return True
+    # -n on the command line (not from pytest.ini) is the user's choice
+    if any(arg.startswith(("-n", "--numprocesses")) for arg in config.invocation_params.args):
+        return False
+    ids, sample = config._dataset_ids, config.getoption("--sample")
+    return (ids is not None and len(ids) <= FAST_START_ROWS) or (sample is not None and sample <= FAST_START_ROWS)
+
+
+def pytest_sessionstart(session):
+    response_cache.session_start(session.config)
+
+
+def _session_credential(config):
+    """
+    The process's Azure credential, created on first use.
+
+    Agent runs, evaluators and the async engine share it, and with it one
+    token cache, instead of each building a DefaultAzureCredential.
+    """
+    if config._credential is None:
+        from azure.identity import DefaultAzureCredential
+        config._credential = DefaultAzureCredential()
+    return config._credential
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_generate_tests(metafunc):
+    """Hand the plugin offset pointers to the selected rows of a dataset file instead of letting it scan the file."""
+    marker = metafunc.definition.get_closest_marker("dataset")
+    source = (marker.args[0] if marker.args else marker.kwargs.get("source")) if marker else None
+    if not isinstance(source, str):
+        return
+    path = metafunc.definition.path.parent / source
+    if not path.exists():
+        return
+
+    config = metafunc.config
+    cache_dir = Path(config.cache.mkdir("pitseleh")) / "datasets" if hasattr(config, "cache") else None
+    index = load_index(path, cache_dir)
+    positions = select(index, ids=config._dataset_ids, shard=config._dataset_shard,
+                       sample=config.getoption("--sample"), seed=config.getoption("--seed"))
+    # The plugin parametrizes from the closest dataset marker; a list source is used as is
+    metafunc.definition.add_marker(pytest.mark.dataset(index.pointers(positions)), append=False)
+
+
+@pytest.fixture
+def _dataset_case(request):
+    """The test's dataset row; indexed rows are read by byte offset."""
+    if not hasattr(request, "param"):
+        return {}
+    try:
+        return _load_case(request.param)
+    except ValueError as e:
+        pytest.fail(str(e))
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_collection(session):
+    with span("collection"):
+        return (yield)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # pytest's own per-test work (fixtures, reporting) around the spans of the test itself
+    with span("test", row=getattr(item, "_row_key", None)):
+        return (yield)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Group each dataset row's tests for xdist and run them back to back."""
+    position = {}
+    # Looking marks up on pytest.mark is slow; resolve once for datasets with many rows
+    xdist_group = pytest.mark.xdist_group
+    for index, item in enumerate(items):
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None and "_dataset_case" in callspec.params and item.get_closest_marker("evaluator"):
+            item._row_key = f"{item.parent.nodeid}::{callspec.id}"
+            item.add_marker(xdist_group(f"{item.parent.name}-{callspec.id}"))
+        position.setdefault(getattr(item, "_row_key", id(item)), index)
+    items.sort(key=lambda item: position[getattr(item, "_row_key", id(item))])
+
+
+def pytest_collection_finish(session):
+    """Record which evaluators each selected row needs and how many tests share it."""
+    config = session.config
+    config._row_evaluators = {}
+    config._row_pending = {}
+    config._row_results = {}
+    for item in session.items:
+        key = getattr(item, "_row_key", None)
+        if key is None:
+            continue
+        specs = config._row_evaluators.setdefault(key, {})
+        for mark in item.iter_markers("evaluator"):
+            spec = evaluator_spec(mark)
+            specs.setdefault(spec["name"], spec)
+        config._row_pending[key] = config._row_pending.get(key, 0) + 1
+    if config._incremental:
+        inputs = {}
+        for item in session.items:
+            key = getattr(item, "_row_key", None)
+            if key is not None and key not in inputs:
+                case = _load_case(item.callspec.params["_dataset_case"])
+                inputs[key] = _pair_inputs(config, key, item, case, list(config._row_evaluators[key].values()))
+        incremental.find_reusable(config, inputs)
+
+
+def _pair_inputs(config, key, item, case, specs):
+    """Input fingerprints of a row's (row, evaluator) pairs (see incremental.py)."""
+    return incremental.row_pair_inputs(config, key, item, case, specs,
+                                       engine=_engine_row(config, item.get_closest_marker("agent")))
+
+
+def _row_plan(request, key, specs):
+    """The evaluators of a row batch to run now, the reused results (--incremental) and the early-stopped ones."""
+    config = request.config
+    specs, reused = incremental.split(specs, config._reused.get(getattr(request.node, "_row_key", None), {}))
+    stopped = {}
+    if config._early_stop is not None and specs:
+        specs, stopped = config._early_stop.active(specs, key)
+    return specs, reused, stopped
+
+
+def _batches_rows(config):
+    """Whole-row batches only pay off when all of a row's tests run in this process."""
+    # xdist resets 'dist' to "no" on workers and keeps the mode as option.loadgroup
+    return not hasattr(config, "workerinput") or getattr(config.option, "loadgroup", False)
+
+
+def _load_case(param):
+    """The dataset row behind a _dataset_case parameter."""
+    if "_offset" in param:
+        return load_case(param)
+    case = dict(param)
+    if "_dataset_file" in param and "_line_index" in param:
+        line = linecache.getline(param["_dataset_file"], param["_line_index"])
+        case = json.loads(line) if line.strip() else {}
+        case.update(param)
+    return case
+
+
+def _engine_row(config, agent_marker) -> bool:
+    """Whether the async engine runs the rows of this agent (Foundry agents under --async-engine)."""
+    return bool(config.getoption("--async-engine") and agent_marker
+                and agent_marker.kwargs.get("type") == "foundry_agent")
+
+
+def _engine_jobs(session):
+    """One job per dataset row, grouped by the agent project and judge they use; reused pairs are left out."""
+    groups = {}
+    seen = set()
+    for item in session.items:
+        key = getattr(item, "_row_key", None)
+        agent_marker = item.get_closest_marker("agent")
+        if key is None or key in seen or not _engine_row(session.config, agent_marker):
+            continue
+        seen.add(key)
+        specs, reused = incremental.split(list(session.config._row_evaluators[key].values()),
+                                          session.config._reused.get(key, {}))
+        judge_marker = item.get_closest_marker("judge_model")
+        judge = dict(judge_marker.kwargs) if judge_marker else None
+        agent = agent_identity(agent_marker)
+        group = json.dumps([agent, judge], sort_keys=True, default=str)
+        groups.setdefault(group, {"agent": agent, "judge": judge, "jobs": []})["jobs"].append({
+            "key": key,
+            "case": _load_case(item.callspec.params["_dataset_case"]),
+            "agent": agent,
+            "judge_model": judge.get("model") if judge else None,
+            "specs": specs,
+            "reused": sorted(reused),
+        })
+    return list(groups.values())
+
+
+async def _run_engines(config, groups):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from eval_engine import build_engine
+    from response_cache import agent_fingerprint
+
+    # Built-in evaluators call the SDK from worker threads; make room for every engine's judge ceiling
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config.getoption("--judge-concurrency") * len(groups) + 4))
+
+    async def run_group(group):
+        agent = group["agent"]
+        fingerprint = config.getoption("--agent-fingerprint")
+        stub_url = config.getoption("--stub-url")
+        if config._response_cache_path and not fingerprint:
+            if stub_url:
+                fingerprint = f"stub:{stub_url}"
+            else:
+                from pytest_agent_evals.foundry_agent import FoundryAgentRunner
+                runner = FoundryAgentRunner(agent["name"], agent["project_endpoint"], agent["version"])
+                runner.credential = _session_credential(config)
+                fingerprint = await agent_fingerprint(runner)
+        engine = build_engine(
+            agent["project_endpoint"],
+            group["judge"],
+            agent_concurrency=config.getoption("--agent-concurrency"),
+            judge_concurrency=config.getoption("--judge-concurrency"),
+            stub_url=stub_url,
+            response_cache=session_cache(config),
+            agent_fingerprint=fingerprint or "",
+            early_stop=config._early_stop,
+            credential=lambda: _session_credential(config),
+        )
+        try:
+            results = await engine.run(group["jobs"])
+        finally:
+            await engine.close()
+        return results, engine.stats()
+
+    stats = {"rows": 0, "endpoints": []}
+    for results, endpoint_stats in await asyncio.gather(*(run_group(group) for group in groups)):
+        config._engine_results.update(results)
+        stats["rows"] += len(results)
+        stats["endpoints"].append(endpoint_stats)
+    return stats
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if config.getoption("--async-engine") and not config.option.collectonly and session.items:
+        groups = _engine_jobs(session)
+        if groups:
+            start = time.perf_counter()
+            with span("engine", rows=sum(len(group["jobs"]) for group in groups)):
+                config._engine_stats = asyncio.run(_run_engines(config, groups))
+            config._engine_stats["seconds"] = time.perf_counter() - start
+            # Rows the agent failed on never reach evaluator_results; record them here
+            for group in groups:
+                for job in group["jobs"]:
+                    row = config._engine_results.get(job["key"])
+                    if row is not None and row["error"]:
+                        results_store.record_row(config, job["case"], group["agent"], group["judge"],
+                                                 {"total_seconds": row["latency"].get("total"),
+                                                  "error": row["error"]}, None, None)
+            report = config.getoption("--engine-report")
+            if report:
+                rows = config._engine_results.values()
+                Path(report).write_text(json.dumps({
+                    **config._engine_stats,
+                    "row_latencies": [row["latency"] for row in rows],
+                    "row_errors": sum(1 for row in rows if row["error"]),
+                }, indent=2), encoding="utf-8")
+    return (yield)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    response_cache.finish(config)
+    # xdist workers hand their counters and results to the controller (see pytest_testnodedown)
+    if hasattr(config, "workeroutput"):
+        for module in SESSION_MODULES:
+            module.worker_output(config, config.workeroutput)
+        return
+    sequential.finish(config)
+    tracing.finish(config)
+    results_store.finish(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    output = getattr(node, "workeroutput", {})
+    for module in SESSION_MODULES:
+        module.merge_worker_output(node.config, output)
+
+
+def pytest_unconfigure(config):
+    response_cache.close(config)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    sections = [
+        ("Trace", tracing.summary_lines(config)),
+        ("Early Stopping", sequential.summary_lines(config)),
+        ("Incremental Run", incremental.summary_lines(config)),
+        ("Results Store", results_store.summary_lines(config)),
+        ("Async Engine", _engine_summary_lines(config)),
+        ("Agent Response Cache", response_cache.summary_lines(config)),
+    ]
+    for title, lines in sections:
+        if lines:
+            terminalreporter.section(title, sep="=")
+            for line in lines:
+                terminalreporter.write_line(line)
+
+
+def _engine_summary_lines(config):
+    engine_stats = config._engine_stats
+    if not engine_stats:
+        return []
+    lines = [f"{engine_stats['rows']} rows in {engine_stats['seconds']:.1f}s "
+             f"({engine_stats['rows'] / max(engine_stats['seconds'], 1e-9):.1f} rows/s)"]
+    for endpoints in engine_stats["endpoints"]:
+        for name, stats in endpoints.items():
+            lines.append(
+                f"{name:<6} {stats['requests']} requests, {stats['throttled']} throttled, "
+                f"{stats['errors']} errors, {stats['slow']} slow, {stats['decreases']} limit decreases; "
+                f"limit {stats['limit']:.1f} (peak {stats['peak_limit']:.1f}), "
+                f"peak in flight {stats['peak_in_flight']}"
+            )
+    return lines
+
+
+@pytest.fixture
+def _agent_runner(_agent_runner, request):
+    """
+    Serve Foundry agent runs from the async engine's results or the persistent response cache.
+
+    Runs that do reach Foundry use the session's credential.
+    """
+    config = request.config
+    row = config._engine_results.get(getattr(request.node, "_row_key", None))
+    if row is not None and (row["response"] is not None or row["error"]):
+        return EngineAgentRunner(row)
+    batch_key, specs = _row_specs(request)
+    if config._early_stop is not None and specs and (row is not None or batch_key not in config._row_results):
+        running, reused, stopped = _row_plan(request, batch_key, specs)
+        # Every evaluator of the row was settled; the async engine skipped the agent for the same reason
+        if not running and not reused:
+            pytest.skip(next(iter(stopped.values()))["reason"])
+    if row is not None:
+        # The engine skipped the agent: every evaluator result of the row was reused (or settled)
+        return EngineAgentRunner(row)
+    if hasattr(_agent_runner, "credential"):
+        # The plugin builds a credential per test; share the process's, and its token cache
+        _agent_runner.credential = _session_credential(config)
+    cache = session_cache(config)
+    key = getattr(request.node, "_row_key", request.node.nodeid)
+    if cache is None or not hasattr(_agent_runner, "project_endpoint"):
+        return TimedAgentRunner(_agent_runner, key)
+    return TimedAgentRunner(
+        CachedAgentRunner(_agent_runner, cache, fingerprint=config.getoption("--agent-fingerprint")), key)
+
+
+class TimedAgentRunner:
+    """
+    Wraps an agent runner and times its runs, for the results store and the trace.
+
+    The plugin's runner creates the conversation and generates the answer in
+    one call, so the trace has one 'agent' span per run.
+    """
+
+    def __init__(self, runner, row_key):
+        self.runner = runner
+        self.row_key = row_key
+        self.seconds = None
+        self.cached = False
+
+    def __getattr__(self, name):
+        return getattr(self.runner, name)
+
+    async def run(self, query):
+        start = time.perf_counter()
+        with span("agent", "agent", row=self.row_key) as agent:
+            response = await self.runner.run(query)
+            usage = getattr(response.raw, "usage", None)
+            self.cached = getattr(self.runner, "hit", False)
+            agent.set(tool_calls=len(response.tool_calls or ()), cached=self.cached,
+                      input_tokens=getattr(usage, "input_tokens", None), output_tokens=getattr(usage, "output_tokens", None))
+        self.seconds = time.perf_counter() - start
+        return response
+
+
+class EngineAgentRunner:
+    """
+    Agent runner that hands back the response the async engine already produced for a row.
+
+    Rows the engine did not send to the agent get a reused_response() stand-in.
+    """
+
+    def __init__(self, row):
+        self.row = row
+
+    async def run(self, query):
+        if self.row["error"]:
+            raise RuntimeError(self.row["error"])
+        if self.row["response"] is None:
+            return reused_response()
+        with span("agent_response", row=self.row["key"]):
+            return response_from_json(self.row["response"])
+
+
+async def _live_response(request, agent_response, case):
+    """
+    The row's agent response, unless the plugin's file cache
+    (--cache-mode persistence) served a reused_response() stand-in left by an
+    earlier session for a row this session does not reuse; the row's runner
+    is asked for the real one then.
+    """
+    if agent_response.type != REUSED_RESPONSE_TYPE:
+        return agent_response
+    row = request.config._engine_results.get(getattr(request.node, "_row_key", None))
+    if row is not None and row["response"] is None and not row["error"]:
+        return agent_response
+    return await request.getfixturevalue("_agent_runner").run(case["query"])
+
+
+def _record_row(request, record_property, case, agent_response, results):
+    """Record inputs, outputs and results the way the plugin's report expects."""
+    inputs = {"query": case.get("query")}
+    inputs.update({k: v for k, v in case.items() if k != "query" and not k.startswith("_")})
+    outputs = {
+        "response": evaluator_messages(agent_response),
+        "tool_calls": agent_response.tool_calls,
+        "tool_definitions": agent_response.tool_definitions,
+    }
+    record_property("inputs", inputs)
+    record_property("outputs", outputs)
+    record_property("evaluators", results)
+
+    flat_result = {f"inputs.{k}": v for k, v in inputs.items()}
+    flat_result.update({f"outputs.{k}": v for k, v in outputs.items()})
+    flat_result["_case_key"] = f"{case.get('_test_id')}::{inputs['query']}"
+    for name, data in results.items():
+        # The plugin's summary counts any result but 'fail' as a pass; leave gated-out evaluators out
+        if data["result"] == "skipped":
+            continue
+        for field in ("score", "result", "reason", "threshold", "raw"):
+            if data.get(field) is not None:
+                flat_result[f"outputs.{name}.{field}"] = data[field]
+    request.node._eval_data = flat_result
+
+
+def _row_specs(request):
+    """The key results are batched under for this test, and the evaluators that batch runs."""
+    config = request.config
+    own = [evaluator_spec(mark) for mark in request.node.iter_markers("evaluator")]
+    key = getattr(request.node, "_row_key", None)
+    if key is None or key not in config._row_evaluators or not _batches_rows(config):
+        return request.node.nodeid, own
+    return key, list(config._row_evaluators[key].values())
+
+
+@pytest_asyncio.fixture
+async def evaluator_results(request, agent_response, _dataset_case, record_property):
+    """
+    Results of this test's evaluators, computed in one batch per dataset row.
+
+    The first test of a row runs the evaluators of all the row's tests; the
+    rest pick their results from that batch.
+    """
+    from pytest_agent_evals import EvaluatorResults
+
+    __tracebackhide__ = True
+    config = request.config
+    own = [evaluator_spec(mark) for mark in request.node.iter_markers("evaluator")]
+    if not own:
+        pytest.fail("MISSING MARKER: Please use @pytest.mark.evaluator('name', ...) to specify which evaluator to run.")
+    agent_response = await _live_response(request, agent_response, _dataset_case)
+
+    key, specs = _row_specs(request)
+    if key == request.node.nodeid:
+        config._row_pending[key] = 1
+
+    inputs = None
+    if not config.getoption("--no-results-db"):
+        inputs = _pair_inputs(config, key, request.node, _dataset_case, specs)
+    engine_row = config._engine_results.get(key)
+    eval_seconds = agent_seconds = None
+    if engine_row is not None:
+        # The engine ran only the pairs that were not reused
+        _, reused = incremental.split(specs, config._reused.get(key, {}))
+        config._row_results[key] = {**reused, **engine_row["evaluators"]}
+    elif key not in config._row_results:
+        specs, reused, stopped = _row_plan(request, key, specs)
+        judge_marker = request.node.get_closest_marker("judge_model")
+        start = time.perf_counter()
+        with span("evaluators", row=key):
+            row_results = await run_evaluators(
+                specs,
+                _dataset_case,
+                agent_response,
+                judge_model_config(judge_marker.kwargs) if judge_marker else None,
+                credential=lambda: _session_credential(config),
+                test_dir=Path(request.node.fspath).parent,
+            ) if specs else {}
+        eval_seconds = time.perf_counter() - start
+        runner = request.getfixturevalue("_agent_runner")
+        agent_seconds = getattr(runner, "seconds", None)
+        if not specs and reused and agent_seconds is not None and not runner.cached:
+            # Every result was reused, yet the plugin called the agent for the test's response
+            config._incremental_counts["agent_calls"] += 1
+        if config._early_stop is not None:
+            config._early_stop.observe(row_results)
+        config._row_results[key] = {**reused, **row_results, **stopped}
+    row_results = config._row_results[key]
+    config._row_pending[key] -= 1
+    if config._row_pending[key] <= 0:
+        del config._row_results[key]
+
+    results = {spec["name"]: row_results[spec["name"]] for spec in own}
+    incremental.count(config, results)
+    _record_row(request, record_property, _dataset_case, agent_response, results)
+    results_store.record_test(config, request.node, _dataset_case, agent_response, results, engine_row,
+                              eval_seconds, agent_seconds, inputs)
+
+    errors = [f"{name}: {data['reason']}" for name, data in results.items() if data["result"] == "error"]
+    if errors:
+        pytest.fail(f"Evaluator execution failed: {'; '.join(errors)}")
+    skipped = [data["reason"] for data in results.values() if data["result"] == "skipped"]
+    if skipped:
+        pytest.skip(skipped[0])
+    return EvaluatorResults(results)
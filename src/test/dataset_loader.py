@@ -0,0 +1,242 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Streaming, indexed loading of JSONL datasets for the Pitseleh eval suite.
+
+pytest-agent-evals parses every line of a dataset once per test function
+and per xdist worker, just to collect row ids. For datasets with hundreds of
+thousands of rows that dominates startup. Here a dataset is scanned once into
+a byte-offset index (row offset and id) that is kept in the pytest cache and
+reused while the file's size and mtime are unchanged. Tests receive small
+pointers, and each row is read on demand by seeking to its offset.
+
+- Compressed datasets (.gz, and .zst with the optional `zstandard` package)
+  are decompressed once into the cache so rows can still be read by offset.
+- Rows can be filtered by id, sharded by a stable hash of their id (so a
+  row stays in the same shard when others are added or removed), and
+  sampled reproducibly.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = 1
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".zstd")
+
+_indexes: Dict[str, "DatasetIndex"] = {}
+_handles: Dict[str, Any] = {}
+
+
+def _open_compressed(path: Path):
+    """Binary reader that decompresses path according to its suffix."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(f"Reading '{path}' requires the 'zstandard' package (pip install zstandard).")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+
+
+def _atomic_write(target: Path, chunks: Iterable[bytes]):
+    """Write chunks to target via a temporary file, so concurrent workers never read a partial file."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def iter_rows(path: Path) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte offset, line) for every non-blank line of an uncompressed JSONL file."""
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+
+class RowPointer(dict):
+    """
+    A _dataset_case parameter pointing at one row.
+
+    The plugin deep-copies list sources for every test function; pointers
+    only hold scalars, so a shallow copy is enough and far cheaper.
+    """
+
+    def __deepcopy__(self, memo):
+        return RowPointer(self)
+
+
+class DatasetIndex:
+    """
+    Byte offsets and ids of the rows of one JSONL dataset.
+
+    Args:
+        source: The dataset as given (possibly compressed).
+        data_path: Uncompressed file the offsets point into.
+        offsets: Byte offset of every valid row, in file order.
+        ids: The row's 'id' (None when absent), parallel to offsets.
+    """
+
+    def __init__(self, source: Path, data_path: Path, offsets: List[int], ids: List[Any]):
+        self.source = source
+        self.data_path = data_path
+        self.offsets = offsets
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls, source: Path, data_path: Path) -> "DatasetIndex":
+        offsets, ids = [], []
+        for offset, line in iter_rows(data_path):
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Invalid lines are skipped, as the plugin does
+            offsets.append(offset)
+            ids.append(row.get("id") if isinstance(row, dict) else None)
+        return cls(source, data_path, offsets, ids)
+
+    def pointers(self, positions: Iterable[int]) -> List[RowPointer]:
+        """Lightweight _dataset_case parameters for the rows at the given positions."""
+        source, data_path = str(self.source), str(self.data_path)
+        pointers = []
+        for position in positions:
+            pointer = RowPointer(_dataset_source=source, _dataset_path=data_path, _offset=self.offsets[position])
+            if self.ids[position] is not None:
+                pointer["id"] = self.ids[position]
+            pointers.append(pointer)
+        return pointers
+
+
+def load_index(source: Path, cache_dir: Optional[Path] = None) -> DatasetIndex:
+    """
+    Index of a dataset, reused from the cache while the file's size and mtime are unchanged.
+
+    Args:
+        source: JSONL file, optionally .gz/.zst compressed.
+        cache_dir: Where to keep indexes and decompressed copies; without one
+            the index lives in memory and compressed files are decompressed
+            to a temporary folder.
+    """
+    source = Path(source).resolve()
+    stat = source.stat()
+    stamp = f"{source}:{stat.st_size}:{stat.st_mtime_ns}"
+    if stamp in _indexes:
+        return _indexes[stamp]
+
+    folder = Path(cache_dir) if cache_dir else Path(tempfile.gettempdir()) / "pitseleh-datasets"
+    name = hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:24]
+    data_path = source
+    if source.suffix in COMPRESSED_SUFFIXES:
+        data_path = folder / f"{name}.jsonl"
+        if not data_path.exists():
+            with _open_compressed(source) as reader:
+                _atomic_write(data_path, iter(lambda: reader.read(1 << 20), b""))
+
+    index_path = folder / f"{name}.index.json"
+    index = None
+    if cache_dir and index_path.exists():
+        try:
+            stored = json.loads(index_path.read_text(encoding="utf-8"))
+            if stored.get("version") == INDEX_VERSION:
+                index = DatasetIndex(source, data_path, stored["offsets"], stored["ids"])
+        except (OSError, ValueError, KeyError):
+            index = None
+    if index is None:
+        index = DatasetIndex.build(source, data_path)
+        if cache_dir:
+            payload = json.dumps({"version": INDEX_VERSION, "offsets": index.offsets, "ids": index.ids}, default=str)
+            _atomic_write(index_path, [payload.encode("utf-8")])
+
+    _indexes[stamp] = index
+    return index
+
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse 'K/N' (1-based shard K of N)."""
+    if not value:
+        return None
+    try:
+        k, n = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}'; expected K/N, e.g. 1/4")
+    if not 1 <= k <= n:
+        raise ValueError(f"Invalid shard '{value}'; K must be between 1 and N")
+    return k, n
+
+
+def parse_ids(value: Optional[str]) -> Optional[set]:
+    """Comma-separated ids, or @file with one id per line."""
+    if not value:
+        return None
+    if value.startswith("@"):
+        return {line.strip() for line in Path(value[1:]).read_text(encoding="utf-8").splitlines() if line.strip()}
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+def shard_of(row_id: Any, shards: int) -> int:
+    """Stable 1-based shard of a row id."""
+    digest = hashlib.sha256(str(row_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards + 1
+
+
+def select(index: DatasetIndex, ids: Optional[set] = None, shard: Optional[Tuple[int, int]] = None,
+           sample: Optional[int] = None, seed: int = 0) -> List[int]:
+    """
+    Positions of the rows to run, in file order.
+
+    Rows without an id are identified by their position for sharding and
+    can't be selected with ids.
+    """
+    positions = range(len(index))
+    if ids is not None:
+        positions = [p for p in positions if index.ids[p] is not None and str(index.ids[p]) in ids]
+    if shard is not None:
+        k, n = shard
+        positions = [p for p in positions if shard_of(index.ids[p] if index.ids[p] is not None else p, n) == k]
+    positions = list(positions)
+    if sample is not None and sample < len(positions):
+        positions = sorted(random.Random(seed).sample(positions, sample))
+    return positions
+
+
+def read_row(data_path: str, offset: int) -> Dict[str, Any]:
+    """Read the row at a byte offset; file handles stay open for the rest of the process."""
+    handle = _handles.get(data_path)
+    if handle is None:
+        handle = _handles[data_path] = open(data_path, "rb")
+    handle.seek(offset)
+    return json.loads(handle.readline())
+
+
+def load_case(pointer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The dataset row behind a pointer, merged with the pointer's metadata.
+
+    Raises:
+        ValueError: If the row at the offset no longer has the expected id.
+    """
+    case = read_row(pointer["_dataset_path"], pointer["_offset"])
+    if "id" in pointer and str(case.get("id", "")) != str(pointer["id"]):
+        raise ValueError(f"Dataset Mismatch: Expected case id='{pointer['id']}' at offset {pointer['_offset']}, "
+                         f"but found id='{case.get('id', '')}'. The dataset '{pointer['_dataset_source']}' has changed.")
+    case.update(pointer)
+    # The plugin marks list-sourced cases as 'inline'; restore the file for its cache keys and reports
+    case["_dataset"] = pointer["_dataset_source"]
+    return case
@@ -0,0 +1,639 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Asyncio evaluation engine for the Pitseleh eval suite.
+
+Instead of one xdist process per worker, each paying interpreter and SDK
+startup, the engine runs the whole dataset from one event loop before the
+tests execute; the tests then assert on its results. Enable it with
+`pytest --async-engine`.
+
+- The agent (Foundry Responses API) and the judge (Azure OpenAI chat
+  completions) are separate endpoints, each with a pooled HTTP client and
+  its own adaptive concurrency limit.
+- Limits follow AIMD: every success raises the limit by 1/limit (about one
+  slot per round of requests), while a 429/503 or a sustained latency rise
+  (most recent responses several times slower than the average) halves it,
+  at most once per latency window. Retry-After pauses the endpoint for
+  the time the service asked for.
+- Built-in evaluators are the azure-ai-evaluation ones the plugin runs,
+  with its inputs and pass/fail rules, so a test scores the same with or
+  without the engine. The SDK sends their requests with its own client;
+  each call holds a judge limiter slot. Custom prompt evaluators of a row go
+  to the judge in one request that returns a verdict per evaluator, and
+  code evaluators run locally.
+- Rows flow through three stages joined by queues: agent workers, a gate
+  that runs the local evaluators of every row that is ready (batch graders
+  from evaluators.py score them all in one vectorized call), and judge
+  workers. Rows failing a gate evaluator never reach the judge.
+- With --early-stop, each stage first drops the evaluators whose pass rate
+  sequential.py has settled. A row with none left, or whose results were
+  all reused (--incremental), skips its agent call.
+
+stub_server.py serves both endpoints locally and can inject throttling, so
+the engine can be exercised without Azure (`--stub-url`).
+"""
+
+import asyncio
+import collections
+import email.utils
+import json
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from plugin_compat import evaluator_messages
+from tracing import span, tracer
+from evaluator_batch import (
+    MERGED_PROMPT_HEADER, _builtin_inputs, _builtin_instance, _prompt_result, _run_builtin, code_reason, is_gate,
+    judge_model_config, pass_fail, render_prompt, skipped_result,
+)
+
+AGENT_SCOPE = "https://ai.azure.com/.default"
+JUDGE_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+MAX_ATTEMPTS = 6
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Most rows the gate scores in one call
+GATE_BATCH = 512
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease.
+
+    Only a 429/503, or a sustained latency rise, counts as congestion: LLM
+    response times routinely vary by more than latency_factor, so one slow
+    response is not enough. The limit is halved when more than half of the
+    last `slow_window` successes were slower than latency_factor times the
+    average latency (an EWMA); other errors are counted but leave it alone.
+
+    Args:
+        name: Label for stats.
+        initial: Starting limit.
+        minimum: Lowest limit after decreases.
+        maximum: Highest limit (also the HTTP pool size).
+        latency_factor: A success slower than this multiple of the average
+            latency counts as slow.
+        slow_window: Number of recent successes the slow ones are counted over.
+    """
+
+    def __init__(self, name: str, initial: int = 4, minimum: int = 1, maximum: int = 64,
+                 latency_factor: float = 3.0, slow_window: int = 8):
+        self.name = name
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.avg_latency = None
+        self._recent = collections.deque(maxlen=slow_window)
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "slow": 0, "decreases": 0,
+                      "peak_limit": self.limit, "peak_in_flight": 0}
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._cond:
+            while True:
+                pause = self.blocked_until - loop.time()
+                if pause > 0:
+                    # Retry-After in force: wait it out (or until a release), then re-check
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                elif self.in_flight < int(self.limit):
+                    break
+                else:
+                    await self._cond.wait()
+            self.in_flight += 1
+            self.stats["requests"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False,
+                      retry_after: Optional[float] = None, error: bool = False):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.stats["throttled"] += 1
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+                self._decrease(now)
+            elif error:
+                self.stats["errors"] += 1
+            elif latency is not None:
+                if self._observe(latency):
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.stats["peak_limit"] = max(self.stats["peak_limit"], self.limit)
+            self._cond.notify_all()
+
+    def _observe(self, latency: float) -> bool:
+        """Record a success; True when most of the recent window was slow."""
+        # A slow-moving average, so a sustained rise stays visible for a few windows
+        self.avg_latency = latency if self.avg_latency is None else 0.98 * self.avg_latency + 0.02 * latency
+        threshold = self.latency_factor * self.avg_latency
+        self.stats["slow"] += latency > threshold
+        self._recent.append(latency)
+        slow = sum(recent > threshold for recent in self._recent)
+        if len(self._recent) == self._recent.maxlen and slow * 2 > len(self._recent):
+            self._recent.clear()
+            return True
+        return False
+
+    def _decrease(self, now: float):
+        # One decrease per latency window: a burst of 429s from the same round halves the limit once
+        window = self.avg_latency or 0.1
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        self.stats["decreases"] += 1
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delay seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class BearerToken:
+    """
+    Entra ID token for one scope, refreshed shortly before it expires.
+
+    Args:
+        scope: Token scope.
+        credential: Callable returning the process's shared Azure credential.
+    """
+
+    def __init__(self, scope: str, credential: Callable[[], Any]):
+        self.scope = scope
+        self.credential = credential
+        self._token = None
+
+    async def header(self) -> Dict[str, str]:
+        if self._token is None or self._token.expires_on - 300 < time.time():
+            self._token = await asyncio.to_thread(self.credential().get_token, self.scope)
+        return {"Authorization": f"Bearer {self._token.token}"}
+
+
+class StaticAuth:
+    """API key header, or no authentication at all (stub server)."""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        self.headers = headers or {}
+
+    async def header(self) -> Dict[str, str]:
+        return self.headers
+
+
+class Endpoint:
+    """A pooled HTTP client and adaptive limiter for one service."""
+
+    def __init__(self, base_url: str, auth, limiter: AdaptiveLimiter, timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.auth = auth
+        self.limiter = limiter
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=limiter.maximum, max_keepalive_connections=limiter.maximum),
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON, retrying throttled and transient failures."""
+        last_error = None
+        service = self.limiter.name
+        for attempt in range(MAX_ATTEMPTS):
+            headers = await self.auth.header()
+            with span(f"{service}.wait", "queue"):
+                await self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                with span(f"{service}.request", service, attempt=attempt) as request:
+                    response = await self.client.post(self.base_url + path, json=body, headers=headers)
+                    request.set(status=response.status_code)
+            except httpx.TransportError as e:
+                await self.limiter.release(error=True)
+                last_error = e
+            else:
+                if response.status_code in RETRYABLE_STATUS:
+                    retry_after = retry_after_seconds(response.headers.get("retry-after"))
+                    throttled = response.status_code in (429, 503)
+                    await self.limiter.release(throttled=throttled, retry_after=retry_after, error=not throttled)
+                    last_error = RuntimeError(f"HTTP {response.status_code} from {self.base_url + path}")
+                    if retry_after is not None:
+                        continue
+                else:
+                    await self.limiter.release(latency=time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        raise RuntimeError(f"HTTP {response.status_code} from {self.base_url + path}: {response.text[:500]}")
+                    return response.json()
+            with span(f"{service}.backoff", "queue"):
+                await asyncio.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+        raise RuntimeError(f"Giving up after {MAX_ATTEMPTS} attempts: {last_error}")
+
+
+def parse_agent_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a Responses API payload into AgentResponse.to_json() form."""
+    output_items = data.get("output") or []
+    texts, tool_calls, tool_definitions = [], [], []
+    for item in output_items:
+        kind = item.get("type")
+        if kind == "message":
+            texts.extend(part.get("text", "") for part in item.get("content") or [] if part.get("type") == "output_text")
+        elif kind == "mcp_list_tools":
+            tool_definitions.extend(
+                {"name": tool.get("name"), "description": tool.get("description"), "parameters": tool.get("input_schema")}
+                for tool in item.get("tools") or []
+            )
+        elif kind in ("function_call", "mcp_call"):
+            arguments = item.get("arguments")
+            tool_calls.append({
+                "type": "tool_call",
+                "name": item.get("name"),
+                "tool_call_id": item.get("call_id") or item.get("id"),
+                "arguments": json.loads(arguments) if arguments else {},
+            })
+        elif kind == "file_search_call":
+            tool_calls.append({"type": "tool_call", "name": "file_search", "tool_call_id": item.get("id")})
+        elif kind == "code_interpreter_call":
+            tool_calls.append({"type": "tool_call", "name": "code_interpreter", "tool_call_id": item.get("id"),
+                               "arguments": {"input": item.get("code")}})
+    return {
+        "type": "foundry_agent",
+        "output_text": data.get("output_text") or "".join(texts),
+        "tool_calls": tool_calls,
+        "tool_definitions": tool_definitions,
+        "output_items": output_items,
+        "instructions": data.get("instructions"),
+        "usage": data.get("usage"),
+    }
+
+
+def _sample(response: Dict[str, Any]) -> Dict[str, Any]:
+    """The sample dict code graders receive."""
+    return {k: response[k] for k in ("output_text", "output_items", "tool_calls", "tool_definitions")}
+
+
+class Engine:
+    """
+    Runs agent + evaluators for many rows concurrently.
+
+    Args:
+        agent: Endpoint for the Foundry project ({project}/openai/v1).
+        judge: Endpoint for the Azure OpenAI resource ({resource}/openai/v1).
+        response_cache: Optional ResponseCache consulted before calling the agent.
+        agent_fingerprint: Config fingerprint used in response cache keys.
+        early_stop: Optional sequential.EarlyStopping; evaluators it has
+            settled are skipped for rows that have not reached them yet.
+        judge_config: SDK model configuration for built-in evaluators
+            (evaluator_batch.judge_model_config), or None.
+        credential: Callable returning the session's Azure credential.
+    """
+
+    def __init__(self, agent: Endpoint, judge: Optional[Endpoint], response_cache=None,
+                 agent_fingerprint: str = "", early_stop=None, judge_config: Optional[Dict[str, Any]] = None,
+                 credential: Optional[Callable[[], Any]] = None):
+        self.agent = agent
+        self.judge = judge
+        self.response_cache = response_cache
+        self.agent_fingerprint = agent_fingerprint
+        self.early_stop = early_stop
+        self.judge_config = judge_config
+        self.credential = credential
+
+    async def close(self):
+        await self.agent.close()
+        if self.judge is not None:
+            await self.judge.close()
+
+    async def run_agent(self, agent_name: str, project_endpoint: str, query: Any, version: Optional[str] = None):
+        key = None
+        if self.response_cache is not None:
+            from response_cache import cache_key
+            key = cache_key(agent_name, project_endpoint, query, self.agent_fingerprint)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                cached.pop("usage", None)  # No tokens were spent on this run
+                return cached
+
+        agent_ref = {"name": agent_name, "type": "agent_reference"}
+        if version is not None:
+            agent_ref["version"] = version
+        response = parse_agent_response(await self.agent.post("/responses", {"input": query, "agent_reference": agent_ref}))
+        if key is not None:
+            self.response_cache.put(key, agent_name, project_endpoint, self.agent_fingerprint, response)
+        return response
+
+    async def judge_row(self, model: str, specs: List[Dict[str, Any]], case: Dict[str, Any],
+                        response: Dict[str, Any], usage: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Grade all custom prompt evaluators of a row with one request.
+
+        The request's token usage is copied into usage when given.
+        """
+        context = {k: v for k, v in case.items() if k not in ("id", "_dataset", "_test_id")}
+        context.update(response=response["output_text"], tool_calls=response["tool_calls"],
+                       tool_definitions=response["tool_definitions"])
+        context.setdefault("query", case.get("query", ""))
+
+        names = [spec["name"] for spec in specs]
+        sections = [MERGED_PROMPT_HEADER.format(count=len(specs), names=", ".join(names))]
+        for spec in specs:
+            sections.append(f"### Task: {spec['name']}\n\n{render_prompt(spec['kwargs']['prompt'], context)}")
+
+        data = await self.judge.post("/chat/completions", {
+            "model": model,
+            "messages": [{"role": "user", "content": "\n\n".join(sections)}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0,
+        })
+        if usage is not None:
+            usage.update(data.get("usage") or {})
+        content = data["choices"][0]["message"]["content"].strip().removeprefix("```json").removesuffix("```")
+        verdicts = json.loads(content)
+        return {spec["name"]: _prompt_result(spec, verdicts.get(spec["name"])) for spec in specs}
+
+    async def run_builtins(self, specs: List[Dict[str, Any]], case: Dict[str, Any],
+                           response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Run the row's built-in evaluators concurrently, as evaluator_batch.run_evaluators does."""
+        from response_cache import response_from_json
+
+        agent_response = response_from_json(response)
+        messages = evaluator_messages(agent_response)
+        limiter = self.judge.limiter if self.judge is not None else None
+
+        async def run(spec):
+            try:
+                evaluator = _builtin_instance(spec, self.judge_config, self.credential)
+                return await _run_builtin(spec, evaluator, _builtin_inputs(spec, case, agent_response, messages),
+                                          limiter=limiter)
+            except Exception as e:
+                return {"score": 0, "result": "error", "threshold": spec["threshold"], "reason": str(e)}
+
+        return dict(zip([spec["name"] for spec in specs], await asyncio.gather(*(run(spec) for spec in specs))))
+
+    @staticmethod
+    def _judged(spec) -> bool:
+        return spec["kind"] in ("builtin", "prompt")
+
+    def _active(self, job, row) -> List[Dict[str, Any]]:
+        """The row's evaluators still to run; settled ones get their early-stop result."""
+        pending = [spec for spec in job["specs"] if spec["name"] not in row["evaluators"]]
+        if self.early_stop is None:
+            return pending
+        pending, stopped = self.early_stop.active(pending, row["key"])
+        row["evaluators"].update(stopped)
+        return pending
+
+    async def _agent_stage(self, job, row) -> bool:
+        # Nothing left to evaluate: every evaluator of the row was reused or settled
+        if not self._active(job, row) and (job["specs"] or job.get("reused")):
+            return False
+        agent = job["agent"]
+        start = time.perf_counter()
+        with span("agent", row=row["key"]) as stage:
+            try:
+                row["response"] = await self.run_agent(agent["name"], agent["project_endpoint"],
+                                                       job["case"].get("query"), agent.get("version"))
+            except Exception as e:
+                row["error"] = f"Agent execution failed: {e}"
+                return False
+            usage = row["usage"]["agent"] = row["response"].get("usage")
+            stage.set(cached=usage is None, tool_calls=len(row["response"]["tool_calls"]), **(usage or {}))
+        row["latency"]["agent"] = time.perf_counter() - start
+        return True
+
+    async def _gate_stage(self, batch) -> List[tuple]:
+        """
+        Run the local evaluators of a batch of (job, row) pairs.
+
+        Graders with score_batch score every row of the batch in one call.
+        Returns the pairs that still need the judge.
+        """
+        batched, active = {}, {}
+        for job, row in batch:
+            active[id(row)] = self._active(job, row)
+            for spec in active[id(row)]:
+                grader = spec["kwargs"].get("grader")
+                if self._judged(spec):
+                    continue
+                if spec["kind"] == "code" and hasattr(grader, "score_batch"):
+                    batched.setdefault((spec["name"], id(grader)), (spec, []))[1].append((job, row))
+                else:
+                    row["evaluators"][spec["name"]] = await self._run_code(spec, job["case"], row["response"])
+
+        for spec, pairs in batched.values():
+            samples = [_sample(row["response"]) for _, row in pairs]
+            cases = [dict(job["case"]) for job, _ in pairs]
+            try:
+                grader = spec["kwargs"]["grader"]
+                scores = [float(score) for score in await asyncio.to_thread(grader.score_batch, samples, cases)]
+                reasons = await asyncio.to_thread(grader.explain_batch, samples, cases, scores) \
+                    if hasattr(grader, "explain_batch") else [""] * len(scores)
+                outcomes = [{"score": score, "result": pass_fail(spec, score, {}),
+                             "threshold": spec["threshold"], "reason": reason} for score, reason in zip(scores, reasons)]
+            except Exception as e:
+                outcomes = [{"score": 0, "result": "error", "threshold": spec["threshold"],
+                             "reason": f"Code evaluation failed: {e}"} for _ in pairs]
+            for (_, row), outcome in zip(pairs, outcomes):
+                row["evaluators"][spec["name"]] = outcome
+
+        to_judge = []
+        for job, row in batch:
+            judged = [spec for spec in active[id(row)] if self._judged(spec)]
+            failed_gates = [spec["name"] for spec in active[id(row)]
+                            if is_gate(spec) and row["evaluators"][spec["name"]]["result"] != "pass"]
+            if judged and failed_gates:
+                row["evaluators"].update({spec["name"]: skipped_result(spec, failed_gates) for spec in judged})
+            elif judged:
+                to_judge.append((job, row))
+        return to_judge
+
+    async def _judge_stage(self, job, row):
+        # Settled while the row waited for the judge
+        judged = [spec for spec in self._active(job, row) if self._judged(spec)]
+        if not judged:
+            return
+        builtins = [spec for spec in judged if spec["kind"] == "builtin"]
+        prompts = [spec for spec in judged if spec["kind"] == "prompt"]
+        start = time.perf_counter()
+        with span("judge", row=row["key"], evaluators=len(judged)) as stage:
+            usage = row["usage"].setdefault("judge", {})
+
+            async def grade_prompts():
+                if not prompts:
+                    return {}
+                try:
+                    if self.judge is None:
+                        raise RuntimeError("no judge model configured")
+                    return await self.judge_row(job["judge_model"], prompts, job["case"], row["response"],
+                                                usage=usage)
+                except Exception as e:
+                    return {spec["name"]: {"score": 0, "result": "error", "threshold": spec["threshold"],
+                                           "reason": f"Judge request failed: {e}"} for spec in prompts}
+
+            graded = await asyncio.gather(self.run_builtins(builtins, job["case"], row["response"]), grade_prompts())
+            for results in graded:
+                row["evaluators"].update(results)
+            stage.set(input_tokens=usage.get("prompt_tokens"), output_tokens=usage.get("completion_tokens"))
+        row["latency"]["judge"] = time.perf_counter() - start
+
+    @staticmethod
+    def _new_row(job) -> Dict[str, Any]:
+        return {"key": job["key"], "response": None, "evaluators": {}, "error": None, "latency": {}, "usage": {},
+                "_start": time.perf_counter()}
+
+    def _finish(self, row) -> Dict[str, Any]:
+        row["latency"]["total"] = time.perf_counter() - row.pop("_start")
+        if self.early_stop is not None:
+            self.early_stop.observe(row["evaluators"])
+        return row
+
+    async def _run_code(self, spec, case, response) -> Dict[str, Any]:
+        try:
+            grader, sample = spec["kwargs"]["grader"], _sample(response)
+            score = float(await asyncio.to_thread(grader, sample, dict(case)))
+            return {"score": score, "result": pass_fail(spec, score, {}), "threshold": spec["threshold"],
+                    "reason": code_reason(grader, sample, case, score)}
+        except Exception as e:
+            return {"score": 0, "result": "error", "threshold": spec["threshold"], "reason": str(e)}
+
+    async def run(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every job; concurrency is bounded by the endpoint limiters.
+
+        A job holds 'key', 'case', 'agent' (name, project_endpoint, version),
+        'judge_model', 'specs' (evaluator_spec() dicts) and optionally
+        'reused' (names of evaluators whose results come from an earlier run).
+        Each row goes agent -> local evaluators (gates) -> judge (its built-in
+        evaluators, and one request for its custom prompt evaluators).
+        """
+        jobs = iter(jobs)
+        results = {}
+        ready, judging = asyncio.Queue(), asyncio.Queue()
+        # Enough workers to saturate each endpoint at its ceiling; the limiters do the throttling
+        judge_workers = self.judge.limiter.maximum if self.judge else 1
+
+        def finish(row):
+            results[row["key"]] = self._finish(row)
+
+        def enqueue(queue, pair):
+            # Queue waits are harness time; they show up as gaps in the row's lane otherwise
+            pair[1]["_queued"] = time.perf_counter_ns()
+            queue.put_nowait(pair)
+
+        def dequeue(name, pair):
+            tracer.record(name, "queue", pair[1].pop("_queued"), time.perf_counter_ns(), row=pair[1]["key"])
+            return pair
+
+        async def agent_worker():
+            for job in jobs:
+                row = self._new_row(job)
+                if await self._agent_stage(job, row):
+                    enqueue(ready, (job, row))
+                else:
+                    finish(row)
+
+        async def agents():
+            await asyncio.gather(*(agent_worker() for _ in range(self.agent.limiter.maximum)))
+            ready.put_nowait(None)
+
+        async def gate():
+            done = False
+            while not done:
+                batch = [await ready.get()]
+                while not ready.empty() and len(batch) < GATE_BATCH:
+                    batch.append(ready.get_nowait())
+                # The end marker is always last: it is queued after every agent worker finished
+                if batch[-1] is None:
+                    done = True
+                    batch.pop()
+                batch = [dequeue("gate.queue", pair) for pair in batch]
+                with span("gate", rows=len(batch)):
+                    to_judge = await self._gate_stage(batch)
+                judged = {id(row) for _, row in to_judge}
+                for _, row in batch:
+                    if id(row) not in judged:
+                        finish(row)
+                for pair in to_judge:
+                    enqueue(judging, pair)
+            for _ in range(judge_workers):
+                judging.put_nowait(None)
+
+        async def judge_worker():
+            while (pair := await judging.get()) is not None:
+                await self._judge_stage(*dequeue("judge.queue", pair))
+                finish(pair[1])
+
+        await asyncio.gather(agents(), gate(), *(judge_worker() for _ in range(judge_workers)))
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {"agent": dict(self.agent.limiter.stats, limit=self.agent.limiter.limit)}
+        if self.judge is not None:
+            stats["judge"] = dict(self.judge.limiter.stats, limit=self.judge.limiter.limit)
+        return stats
+
+
+def build_engine(project_endpoint: str, judge: Optional[Dict[str, Any]], agent_concurrency: int,
+                 judge_concurrency: int, stub_url: Optional[str] = None, response_cache=None,
+                 agent_fingerprint: str = "", early_stop=None,
+                 credential: Optional[Callable[[], Any]] = None) -> Engine:
+    """
+    Create an Engine for a Foundry project and (optional) Azure OpenAI judge.
+
+    Args:
+        project_endpoint: Foundry project endpoint.
+        judge: The judge_model marker kwargs (endpoint, model, api_key), or None.
+        agent_concurrency: Ceiling for concurrent agent requests.
+        judge_concurrency: Ceiling for concurrent judge requests.
+        stub_url: Send all traffic, unauthenticated, to this stub server instead.
+        response_cache: Optional ResponseCache for agent responses.
+        agent_fingerprint: Config fingerprint for response cache keys.
+        early_stop: Optional sequential.EarlyStopping shared by the engine's rows.
+        credential: Callable returning the session's Azure credential, for
+            Entra ID auth (required unless stub_url is given).
+    """
+    judge_config = None
+    if stub_url:
+        stub_url = stub_url.rstrip("/")
+        agent_base, agent_auth = f"{stub_url}/agent/openai/v1", StaticAuth()
+        judge_base, judge_auth = f"{stub_url}/judge/openai/v1", StaticAuth()
+        if judge:
+            judge_config = judge_model_config({**judge, "type": "azure_openai", "endpoint": f"{stub_url}/judge",
+                                               "api_key": "stub"})
+    else:
+        agent_base, agent_auth = project_endpoint.rstrip("/") + "/openai/v1", BearerToken(AGENT_SCOPE, credential)
+        judge_base = judge_auth = None
+        if judge:
+            judge_base = judge["endpoint"].rstrip("/") + "/openai/v1"
+            judge_auth = StaticAuth({"api-key": judge["api_key"]}) if judge.get("api_key") else BearerToken(JUDGE_SCOPE, credential)
+            judge_config = judge_model_config(judge)
+
+    agent_endpoint = Endpoint(agent_base, agent_auth, AdaptiveLimiter("agent", maximum=agent_concurrency))
+    judge_endpoint = None
+    if judge:
+        judge_endpoint = Endpoint(judge_base, judge_auth, AdaptiveLimiter("judge", maximum=judge_concurrency))
+    return Engine(agent_endpoint, judge_endpoint, response_cache=response_cache, agent_fingerprint=agent_fingerprint,
+                  early_stop=early_stop, judge_config=judge_config, credential=credential)
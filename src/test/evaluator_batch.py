@@ -0,0 +1,381 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Runs every evaluator of a dataset row as one batch.
+
+pytest-agent-evals runs the evaluators of each test item one after another,
+so a class with one evaluator per test method repeats the setup for every
+method and sends its judge calls serially. Here all evaluators declared for a
+row run together against a single agent response:
+
+- Built-in evaluators that share a judge model are dispatched as one
+  concurrent batch. Each owns its prompt, so they can't share a request.
+  Their instances are reused for every row a worker handles.
+- Custom prompt evaluators that share a judge model are merged into one
+  judge request that returns a verdict per evaluator.
+- Custom code evaluators run alongside in worker threads.
+- Gate evaluators (code graders with a true `gate` attribute, such as those
+  in evaluators.py) run first. If one fails, the row's built-in and prompt
+  evaluators are skipped instead of paying for judge calls.
+
+Pass/fail decisions follow the plugin's rules (explicit built-in result,
+then threshold comparison). The plugin keeps those rules, the list of
+evaluators that take the message history, score extraction and prompt
+rendering inline in its evaluator_results fixture, so they are mirrored here;
+unit/test_evaluator_batch.py checks the results against the plugin's own
+fixture on fixed inputs. Prompt evaluators go through the plugin's
+PromptEvaluator.run, merged ones as a single prompt.
+"""
+
+import asyncio
+import inspect
+import json
+import random
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List
+
+from plugin_compat import evaluator_messages
+from tracing import span
+
+# Evaluators that take the system prompt and full message history instead of plain text
+COMPLEX_EVALUATORS = {
+    "tool_call_accuracy",
+    "task_adherence",
+    "intent_resolution",
+    "tool_input_accuracy",
+    "task_completion",
+    "task_navigation_efficiency",
+    "tool_call_success",
+    "tool_output_utilization",
+    "tool_selection",
+}
+
+RATE_LIMIT_RETRIES = 3
+
+MERGED_PROMPT_HEADER = """You are grading {count} independent evaluation tasks about the same agent response.
+Complete each task exactly as its instructions say, judging it on its own.
+Reply with one JSON object and nothing else. Its keys are the task names ({names}), and each value is the JSON object that task asks for, with "result" and "reason" keys.
+"""
+
+_builtin_instances: Dict[tuple, Any] = {}
+
+
+def evaluator_spec(mark) -> Dict[str, Any]:
+    """Name, kind and options of an @evaluator marker."""
+    name = mark.args[0] if mark.args else mark.kwargs.get("name")
+    kwargs = mark.kwargs
+    if kwargs.get("prompt") is not None:
+        kind = "prompt"
+    elif kwargs.get("grader") is not None:
+        kind = "code"
+    else:
+        kind = "builtin"
+    return {"name": name, "kind": kind, "threshold": kwargs.get("threshold"), "kwargs": kwargs}
+
+
+def judge_key(judge_model_config) -> str:
+    """Identity of a judge model configuration, without secrets."""
+    if not judge_model_config:
+        return ""
+    public = {k: v for k, v in dict(judge_model_config).items() if k != "api_key"}
+    return json.dumps(public, sort_keys=True, default=str)
+
+
+def pass_fail(spec, score, raw) -> str:
+    """The plugin's pass/fail rule: explicit built-in result first, then the threshold."""
+    if spec["kind"] == "builtin" and raw.get(f"{spec['name']}_result") is not None:
+        return raw[f"{spec['name']}_result"]
+
+    threshold = spec["threshold"]
+    if isinstance(threshold, bool):
+        bool_score = str(score).lower() == "true" if isinstance(score, str) else bool(score)
+        return "pass" if bool_score == threshold else "fail"
+    if isinstance(threshold, (int, float)):
+        try:
+            return "pass" if float(score) >= threshold else "fail"
+        except (TypeError, ValueError):
+            pass
+    return "pass"
+
+
+def is_gate(spec) -> bool:
+    """Whether a spec is a code evaluator that gates the row's judge-backed evaluators."""
+    return spec["kind"] == "code" and bool(getattr(spec["kwargs"].get("grader"), "gate", False))
+
+
+def skipped_result(spec, failed_gates) -> Dict[str, Any]:
+    return {"score": None, "result": "skipped", "threshold": spec["threshold"],
+            "reason": f"Skipped: gate evaluator(s) {', '.join(failed_gates)} did not pass"}
+
+
+def _error_result(spec, error) -> Dict[str, Any]:
+    return {"score": 0, "result": "error", "reason": str(error), "threshold": spec["threshold"]}
+
+
+def render_prompt(template: str, context: Dict[str, Any]) -> str:
+    """The plugin's {{name}} substitution for custom prompt templates."""
+    for key, value in context.items():
+        replacement = json.dumps(value, indent=2) if isinstance(value, (dict, list)) else str(value)
+        template = template.replace(f"{{{{{key}}}}}", replacement)
+    return template
+
+
+def _builtin_instance(spec, judge_model_config, credential):
+    """Build (once per worker) the SDK evaluator for a built-in spec."""
+    from pytest_agent_evals.plugin import _get_evaluator_registry
+
+    key = (spec["name"], judge_key(judge_model_config), spec["threshold"])
+    if key in _builtin_instances:
+        return _builtin_instances[key]
+
+    registry = _get_evaluator_registry()
+    eval_class = registry.get(spec["name"])
+    if not eval_class:
+        raise ValueError(f"UNKNOWN EVALUATOR: '{spec['name']}' is not registered. Available: {list(registry.keys())}")
+
+    params = inspect.signature(eval_class.__init__).parameters
+    init_kwargs = {}
+    if "model_config" in params:
+        if judge_model_config:
+            init_kwargs["model_config"] = judge_model_config
+        elif params["model_config"].default == inspect.Parameter.empty:
+            raise ValueError(f"MISSING CONFIG: '{spec['name']}' requires 'judge_model', but fixture returned None.")
+    if "credential" in params and judge_model_config and "azure_endpoint" in judge_model_config \
+            and not judge_model_config.get("api_key"):
+        init_kwargs["credential"] = credential()
+    if spec["threshold"] is not None and "threshold" in params:
+        init_kwargs["threshold"] = spec["threshold"]
+
+    try:
+        instance = eval_class(**init_kwargs)
+    except Exception as e:
+        raise RuntimeError(f"Failed to instantiate evaluator '{spec['name']}': {e}")
+    _builtin_instances[key] = instance
+    return instance
+
+
+def _builtin_inputs(spec, case, agent_response, response_messages) -> Dict[str, Any]:
+    """Keyword arguments for a built-in evaluator call, shaped as the plugin does."""
+    run_kwargs = {
+        "query": case.get("query"),
+        "response": agent_response.output_text,
+        "tool_calls": agent_response.tool_calls,
+        "tool_definitions": agent_response.tool_definitions,
+    }
+    if spec["name"] in COMPLEX_EVALUATORS:
+        query = case.get("query")
+        content = [{"type": "text", "text": query}] if isinstance(query, str) else query
+        messages = [{"role": "user", "content": content}]
+        if agent_response.instructions:
+            messages.insert(0, {"role": "system", "content": agent_response.instructions})
+        run_kwargs["query"] = messages
+        run_kwargs["response"] = response_messages
+    for field in ("context", "ground_truth", "retrieval_ground_truth", "retrieved_documents"):
+        if field in case:
+            run_kwargs[field] = case[field]
+    return run_kwargs
+
+
+def judge_model_config(marker_kwargs) -> Dict[str, Any]:
+    """The SDK model configuration the plugin builds from @judge_model marker kwargs."""
+    if marker_kwargs.get("type") == "openai":
+        return {"type": "openai", "model": marker_kwargs.get("model"), "base_url": marker_kwargs.get("endpoint"),
+                "api_key": marker_kwargs.get("api_key")}
+    config = {"type": "azure_openai", "azure_endpoint": marker_kwargs.get("endpoint"),
+              "azure_deployment": marker_kwargs.get("model")}
+    if marker_kwargs.get("api_key"):
+        config["api_key"] = marker_kwargs["api_key"]
+    return config
+
+
+async def _run_builtin(spec, evaluator, run_kwargs, limiter=None) -> Dict[str, Any]:
+    """
+    Call a built-in evaluator in a worker thread, retrying rate limits.
+
+    With a limiter (eval_engine.AdaptiveLimiter), every attempt holds one of
+    its slots and reports its latency or throttling back to it.
+    """
+    from pytest_agent_evals.plugin import is_rate_limit_error
+
+    name = spec["name"]
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        if limiter is not None:
+            with span("judge.wait", "queue"):
+                await limiter.acquire()
+        start = time.perf_counter()
+        try:
+            with span(f"builtin:{name}", "judge", attempt=attempt):
+                raw = await asyncio.to_thread(partial(evaluator, **run_kwargs))
+            if limiter is not None:
+                await limiter.release(latency=time.perf_counter() - start)
+            break
+        except Exception as e:
+            if limiter is not None:
+                await limiter.release(throttled=is_rate_limit_error(e), error=not is_rate_limit_error(e))
+            if is_rate_limit_error(e) and attempt < RATE_LIMIT_RETRIES:
+                with span("judge.backoff", "queue"):
+                    await asyncio.sleep(min(2 ** attempt, 10) + random.uniform(0, 1))
+                continue
+            raise RuntimeError(f"Evaluator '{name}' failed: {e}")
+
+    # As in the plugin, a falsy score (0) reads as missing
+    score = raw.get(name) or -1
+    if score == -1:
+        score = raw.get(f"gpt_{name}", -1)
+    reason = raw.get(f"{name}_reason") or raw.get(f"gpt_{name}_reason")
+    threshold = spec["threshold"] if spec["threshold"] is not None else raw.get(f"{name}_threshold")
+    return {
+        "score": score,
+        "result": pass_fail({**spec, "threshold": threshold}, score, raw),
+        "threshold": threshold,
+        "reason": reason,
+        "raw": raw,
+    }
+
+
+async def _run_code(spec, sample, case) -> Dict[str, Any]:
+    from pytest_agent_evals.plugin import CodeEvaluator
+
+    grader = spec["kwargs"]["grader"]
+    with span(f"code:{spec['name']}", "evaluator"):
+        result = await asyncio.to_thread(CodeEvaluator(func_obj=grader).run, sample, dict(case))
+    return {
+        "score": result["result"],
+        "result": pass_fail(spec, result["result"], result),
+        "threshold": spec["threshold"],
+        "reason": result["reason"] or code_reason(grader, sample, case, result["result"]),
+    }
+
+
+def code_reason(grader, sample, case, score) -> str:
+    """The reason a grader with explain_batch (see evaluators.py) gives for one row's score."""
+    if not hasattr(grader, "explain_batch"):
+        return ""
+    return grader.explain_batch([sample], [dict(case)], [score])[0]
+
+
+def _prompt_template(spec, test_dir) -> tuple:
+    """(template or prompt file path, is_file), resolving the prompt against the test's folder as the plugin does."""
+    prompt = spec["kwargs"]["prompt"]
+    path = test_dir / prompt
+    return (str(path), True) if path.is_file() else (prompt, False)
+
+
+def _prompt_evaluator(prompt, is_file, judge_model_config, credential):
+    from pytest_agent_evals.plugin import PromptEvaluator
+
+    eval_credential = None
+    if judge_model_config and judge_model_config.get("type") == "azure_openai" and not judge_model_config.get("api_key"):
+        eval_credential = credential()
+    return PromptEvaluator(prompt, judge_model_config, credential=eval_credential, is_file=is_file)
+
+
+def _prompt_result(spec, parsed) -> Dict[str, Any]:
+    if not isinstance(parsed, dict) or parsed.get("result") is None:
+        reason = parsed.get("reason") if isinstance(parsed, dict) else None
+        return {"score": None, "result": "error", "threshold": spec["threshold"],
+                "reason": reason or f"Judge returned no verdict for '{spec['name']}': {parsed}"}
+    score = parsed["result"]
+    if isinstance(score, str) and score.lower() in ("true", "false"):
+        score = score.lower() == "true"
+    return {
+        "score": score,
+        "result": pass_fail(spec, score, parsed),
+        "threshold": spec["threshold"],
+        "reason": parsed.get("reason"),
+    }
+
+
+async def _run_prompts(specs, judge_model_config, credential, context, test_dir) -> Dict[str, Dict[str, Any]]:
+    """Send every custom prompt evaluator of one judge model in a single request."""
+    templates = [_prompt_template(spec, test_dir) for spec in specs]
+    if len(specs) == 1:
+        with span("judge.prompt", "judge", evaluators=1):
+            verdict = await _prompt_evaluator(*templates[0], judge_model_config, credential).run(context)
+        return {specs[0]["name"]: _prompt_result(specs[0], verdict)}
+
+    names = [spec["name"] for spec in specs]
+    sections = [MERGED_PROMPT_HEADER.format(count=len(specs), names=", ".join(names))]
+    for spec, (prompt, is_file) in zip(specs, templates):
+        template = Path(prompt).read_text(encoding="utf-8") if is_file else prompt
+        sections.append(f"### Task: {spec['name']}\n\n{render_prompt(template, context)}")
+
+    # Already rendered, so the evaluator gets no context to substitute
+    merged = _prompt_evaluator("\n\n".join(sections), False, judge_model_config, credential)
+    with span("judge.prompt", "judge", evaluators=len(specs)):
+        verdicts = await merged.run({})
+    if not isinstance(verdicts, dict) or not any(name in verdicts for name in names):
+        # The plugin reports an unparsable reply as {"result": None, "reason": ...}
+        reason = isinstance(verdicts, dict) and verdicts.get("reason") or f"Judge returned no verdicts: {verdicts}"
+        return {spec["name"]: {"score": None, "result": "error", "threshold": spec["threshold"],
+                               "reason": f"Merged judge request failed: {reason}"} for spec in specs}
+    return {spec["name"]: _prompt_result(spec, verdicts.get(spec["name"])) for spec in specs}
+
+
+async def run_evaluators(specs: List[Dict[str, Any]], case, agent_response, judge_model_config,
+                         credential, test_dir) -> Dict[str, Dict[str, Any]]:
+    """
+    Run all evaluators of a row against one agent response.
+
+    Args:
+        specs: evaluator_spec() of every evaluator declared for the row.
+        case: The dataset row.
+        agent_response: The row's AgentResponse.
+        judge_model_config: The plugin's judge model configuration (or None).
+        credential: Callable returning the shared Azure credential.
+        test_dir: Folder of the test file, for resolving prompt files.
+
+    Returns:
+        Evaluator name -> {score, result, threshold, reason[, raw]}; failures
+        are reported per evaluator with result 'error'.
+    """
+    response_messages = evaluator_messages(agent_response)
+    sample = {
+        "output_text": agent_response.output_text,
+        "output_items": agent_response.output_items,
+        "tool_calls": agent_response.tool_calls,
+        "tool_definitions": agent_response.tool_definitions,
+    }
+    context = {k: v for k, v in case.items() if k not in ("id", "_dataset", "_test_id")}
+    context.update(response=response_messages, tool_calls=agent_response.tool_calls,
+                   tool_definitions=agent_response.tool_definitions)
+    context.setdefault("query", case.get("query", ""))
+
+    results, groups, jobs = {}, [], []
+    gates = [spec for spec in specs if is_gate(spec)]
+    for spec, outcome in zip(gates, await asyncio.gather(*(_run_code(spec, sample, case) for spec in gates),
+                                                         return_exceptions=True)):
+        results[spec["name"]] = _error_result(spec, outcome) if isinstance(outcome, BaseException) else outcome
+    failed_gates = [spec["name"] for spec in gates if results[spec["name"]]["result"] != "pass"]
+
+    for spec in specs:
+        if spec["name"] in results:
+            continue
+        if failed_gates and spec["kind"] in ("builtin", "prompt"):
+            results[spec["name"]] = skipped_result(spec, failed_gates)
+        elif spec["kind"] == "builtin":
+            try:
+                evaluator = _builtin_instance(spec, judge_model_config, credential)
+            except Exception as e:
+                results[spec["name"]] = _error_result(spec, e)
+                continue
+            groups.append([spec])
+            jobs.append(_run_builtin(spec, evaluator, _builtin_inputs(spec, case, agent_response, response_messages)))
+        elif spec["kind"] == "code":
+            groups.append([spec])
+            jobs.append(_run_code(spec, sample, case))
+    prompt_specs = [spec for spec in specs if spec["kind"] == "prompt" and spec["name"] not in results]
+    if prompt_specs:
+        groups.append(prompt_specs)
+        jobs.append(_run_prompts(prompt_specs, judge_model_config, credential, context, test_dir))
+
+    for group, outcome in zip(groups, await asyncio.gather(*jobs, return_exceptions=True)):
+        if isinstance(outcome, BaseException):
+            results.update({spec["name"]: _error_result(spec, outcome) for spec in group})
+        elif group[0]["kind"] == "prompt":
+            results.update(outcome)
+        else:
+            results[group[0]["name"]] = outcome
+    return {spec["name"]: results[spec["name"]] for spec in specs}
@@ -1,5 +1,230 @@
 # Copyright (c) Microsoft. All rights reserved.
 
-from typing import Any
+"""
+Deterministic code evaluators for the Pitseleh agent evals.
 
+Every evaluator is a plain grader for CustomCodeEvaluatorConfig:
 
+    @evals.evaluator(CustomCodeEvaluatorConfig("placeholders", grader=PlaceholderDensity(), threshold=1.0))
+
+and also implements score_batch, which scores many responses in one NumPy
+pass. Only the async engine's gate stage calls score_batch with many rows
+(see eval_engine.py); on the plugin path each test calls the grader, which
+scores its single row through score_batch.
+
+Scores are floats in [0, 1]. Pass gate=True to make an evaluator a gate: the
+row batch and the async engine run gates before any LLM judge, and a row
+that fails a gate skips its judge-backed evaluators (see evaluator_batch.py).
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from assumption_scanner import AssumptionScanner, default_scanner
+
+# Unfilled template slots: [NAME], {{name}}, <NAME>, TODO/TBD/FIXME/XXX, lorem ipsum
+PLACEHOLDER_RE = re.compile(
+    r"\[[A-Z][A-Z0-9 _-]*\]|\{\{[^{}]*\}\}|<[A-Z][A-Z0-9 _-]*>|\b(?:TODO|TBD|FIXME|XXX)\b|(?i:lorem ipsum)"
+)
+
+# Lines that carry structure: headings, bullets, numbered items, quotes, table rows
+STRUCTURE_RE = re.compile(r"^[ \t]*(?:#{1,6}[ \t]|[-*+•][ \t]|\d+[.)][ \t]|>|\|)", re.MULTILINE)
+
+
+def _texts(samples: Sequence[Dict[str, Any]]) -> list:
+    return [sample.get("output_text") or "" for sample in samples]
+
+
+def _word_counts(texts: Iterable[str]) -> np.ndarray:
+    return np.fromiter((len(text.split()) for text in texts), dtype=np.float64)
+
+
+def _band_score(values: np.ndarray, low: Optional[float], high: Optional[float]) -> np.ndarray:
+    """1 inside [low, high]; below or above, the ratio to the nearest bound."""
+    scores = np.ones_like(values, dtype=np.float64)
+    if low:
+        scores = np.where(values < low, values / low, scores)
+    if high:
+        scores = np.where(values > high, high / np.maximum(values, 1e-9), scores)
+    return np.clip(scores, 0.0, 1.0)
+
+
+class BatchEvaluator:
+    """
+    Base class for vectorized code evaluators.
+
+    Subclasses implement score_batch(samples, items), returning one score
+    per row, and may implement explain_batch to give failing rows a reason.
+    Calling the instance scores a single row, which is what
+    CustomCodeEvaluatorConfig graders do.
+
+    Args:
+        gate: Whether a failure should skip the row's judge-backed evaluators.
+    """
+
+    def __init__(self, gate: bool = False):
+        self.gate = gate
+
+    def score_batch(self, samples: Sequence[Dict[str, Any]], items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        raise NotImplementedError
+
+    def explain_batch(self, samples: Sequence[Dict[str, Any]], items: Sequence[Dict[str, Any]],
+                      scores: Sequence[float]) -> List[str]:
+        """One reason per row (empty by default)."""
+        return ["" for _ in samples]
+
+    def __call__(self, sample: Dict[str, Any], item: Dict[str, Any]) -> float:
+        return float(self.score_batch([sample], [item])[0])
+
+
+class ResponseLength(BatchEvaluator):
+    """Scores the response's word count against [min_words, max_words]."""
+
+    def __init__(self, min_words: Optional[int] = 20, max_words: Optional[int] = 2000, gate: bool = False):
+        super().__init__(gate)
+        self.min_words = min_words
+        self.max_words = max_words
+
+    def score_batch(self, samples, items):
+        return _band_score(_word_counts(_texts(samples)), self.min_words, self.max_words)
+
+
+class LengthRatio(BatchEvaluator):
+    """Scores the response/query word ratio against [min_ratio, max_ratio]; expanded prompts should be longer than their input."""
+
+    def __init__(self, min_ratio: Optional[float] = 1.0, max_ratio: Optional[float] = 50.0, gate: bool = False):
+        super().__init__(gate)
+        self.min_ratio = min_ratio
+        self.max_ratio = max_ratio
+
+    def score_batch(self, samples, items):
+        queries = [item.get("query") if isinstance(item.get("query"), str) else "" for item in items]
+        ratios = _word_counts(_texts(samples)) / np.maximum(_word_counts(queries), 1.0)
+        return _band_score(ratios, self.min_ratio, self.max_ratio)
+
+
+class StructureRatio(BatchEvaluator):
+    """Share of non-blank lines that are headings, list items, quotes or table rows, scaled so min_ratio scores 1."""
+
+    def __init__(self, min_ratio: float = 0.3, gate: bool = False):
+        super().__init__(gate)
+        self.min_ratio = min_ratio
+
+    def score_batch(self, samples, items):
+        texts = _texts(samples)
+        lines = np.fromiter((sum(1 for line in text.splitlines() if line.strip()) for text in texts), dtype=np.float64)
+        structured = np.fromiter((len(STRUCTURE_RE.findall(text)) for text in texts), dtype=np.float64)
+        ratios = structured / np.maximum(lines, 1.0)
+        return np.clip(ratios / self.min_ratio, 0.0, 1.0)
+
+
+class PlaceholderDensity(BatchEvaluator):
+    """
+    1 / (1 + placeholders per 100 words): 1.0 means no unfilled template
+    slots; a threshold of 0.5 tolerates one per 100 words.
+    """
+
+    def score_batch(self, samples, items):
+        texts = _texts(samples)
+        placeholders = np.fromiter((len(PLACEHOLDER_RE.findall(text)) for text in texts), dtype=np.float64)
+        density = placeholders / np.maximum(_word_counts(texts), 1.0) * 100
+        return 1.0 / (1.0 + density)
+
+
+class SectionCoverage(BatchEvaluator):
+    """
+    Fraction of required sections the response mentions (case-insensitive).
+
+    Args:
+        sections: Section names every response must cover.
+        field: Dataset field with extra, row-specific section names.
+    """
+
+    def __init__(self, sections: Sequence[str] = (), field: str = "required_sections", gate: bool = False):
+        super().__init__(gate)
+        self.sections = [section.lower() for section in sections]
+        self.field = field
+
+    def score_batch(self, samples, items):
+        lowered = np.array([text.lower() for text in _texts(samples)], dtype=str)
+        # rows x sections matrix of hits for the shared sections
+        hits = np.zeros((len(lowered), len(self.sections)), dtype=bool)
+        for column, section in enumerate(self.sections):
+            hits[:, column] = np.char.find(lowered, section) >= 0
+        found = hits.sum(axis=1).astype(np.float64)
+        required = np.full(len(lowered), float(len(self.sections)))
+
+        for row, item in enumerate(items):
+            extra = [section.lower() for section in item.get(self.field) or () if section.lower() not in self.sections]
+            found[row] += sum(section in lowered[row] for section in extra)
+            required[row] += len(extra)
+        return np.where(required > 0, found / np.maximum(required, 1.0), 1.0)
+
+
+class ToolCallCount(BatchEvaluator):
+    """1 when the number of tool calls is within [min_calls, max_calls], else 0."""
+
+    def __init__(self, min_calls: int = 0, max_calls: Optional[int] = None, gate: bool = False):
+        super().__init__(gate)
+        self.min_calls = min_calls
+        self.max_calls = max_calls
+
+    def score_batch(self, samples, items):
+        counts = np.fromiter((len(sample.get("tool_calls") or ()) for sample in samples), dtype=np.int64)
+        ok = counts >= self.min_calls
+        if self.max_calls is not None:
+            ok &= counts <= self.max_calls
+        return ok.astype(np.float64)
+
+
+class ForbiddenAssumptions(BatchEvaluator):
+    """
+    1 when the response states none of its case's forbidden assumptions, else 0.
+
+    Rows whose case_field names a case of fixtures/prompt-enhancement-evals.json
+    are checked against that case's phrases. Other rows have no forbidden
+    assumptions to check and score 1 (not applicable): another case's phrase
+    can be a correct statement for them. The reason lists the matched
+    case/phrase pairs.
+
+    Args:
+        scanner: Scanner to use; defaults to the one built from the fixture.
+        case_field: Dataset field holding the fixture case id.
+    """
+
+    def __init__(self, scanner: Optional[AssumptionScanner] = None, case_field: str = "id", gate: bool = False):
+        super().__init__(gate)
+        self._scanner = scanner
+        self.case_field = case_field
+
+    @property
+    def scanner(self) -> AssumptionScanner:
+        if self._scanner is None:
+            self._scanner = default_scanner()
+        return self._scanner
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Parameters and phrases the scores depend on, for --incremental (see incremental.py)."""
+        return {"case_field": self.case_field, "gate": self.gate, "phrases": self.scanner.case_phrases}
+
+    def _matches(self, sample, item):
+        case_id = item.get(self.case_field)
+        if case_id not in self.scanner.case_phrases:
+            return []
+        return self.scanner.scan(sample.get("output_text") or "", case_id)
+
+    def score_batch(self, samples, items):
+        return np.fromiter((0.0 if self._matches(sample, item) else 1.0 for sample, item in zip(samples, items)),
+                           dtype=np.float64, count=len(samples))
+
+    def explain_batch(self, samples, items, scores):
+        reasons = []
+        for sample, item, score in zip(samples, items, scores):
+            if score >= 1.0:
+                reasons.append("")
+                continue
+            pairs = self._matches(sample, item)
+            reasons.append("Forbidden assumptions: " + ", ".join(f"{case_id}: '{phrase}'" for case_id, phrase in pairs))
+        return reasons
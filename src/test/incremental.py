@@ -0,0 +1,240 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Input fingerprints for incremental eval runs (--incremental).
+
+A (dataset row, evaluator) pair is fingerprinted from everything its result
+depends on:
+
+- the row: its dataset, id and fields;
+- the agent: name, project endpoint and version from the agent marker, plus
+  --agent-fingerprint when given (the hash of the agent definition);
+- the judge deployment (endpoint and model) and the scoring path, for
+  judge-backed evaluators: built-ins are scored by the azure-ai-evaluation
+  evaluator on both paths, while custom prompts are rendered differently by
+  the async engine's merged request and the plugin's PromptEvaluator, so a
+  verdict from one path is never reused on the other;
+- the evaluator definition: name, kind and threshold, plus the source and
+  parameters of a code grader (or its fingerprint() when it has one), the
+  text of a prompt evaluator's prompt (file), or the SDK version for
+  built-ins.
+
+The results store keeps the latest pass/fail result per fingerprint, and an
+incremental run reuses it instead of executing the pair again. Errors and
+skipped results are never reused.
+"""
+
+import hashlib
+import inspect
+import json
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from evaluator_batch import is_gate
+import results_store
+
+
+def _hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _judged(spec) -> bool:
+    return spec["kind"] in ("builtin", "prompt")
+
+
+def _source(obj) -> str:
+    """Source of a function or of an object's class, falling back to its qualified name."""
+    target = obj if inspect.isfunction(obj) or inspect.isclass(obj) else type(obj)
+    try:
+        return inspect.getsource(target)
+    except (OSError, TypeError):
+        return getattr(target, "__qualname__", repr(target))
+
+
+def _grader_fingerprint(grader) -> Any:
+    if hasattr(grader, "fingerprint"):
+        parameters = grader.fingerprint()
+    elif inspect.isfunction(grader):
+        parameters = None
+    else:
+        # Public attributes are the grader's parameters; private ones are caches
+        parameters = {k: v for k, v in getattr(grader, "__dict__", {}).items() if not k.startswith("_")}
+    return {"source": _source(grader), "parameters": parameters}
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+# (name, id of the marker kwargs, test dir) -> (marker kwargs, fingerprint); the kwargs are kept so ids stay unique
+_evaluator_fingerprints: Dict[tuple, tuple] = {}
+
+
+def evaluator_fingerprint(spec, test_dir: Path) -> str:
+    """Hash of an evaluator_spec() definition, computed once per marker."""
+    key = (spec["name"], id(spec["kwargs"]), str(test_dir))
+    if key not in _evaluator_fingerprints:
+        _evaluator_fingerprints[key] = (spec["kwargs"], _evaluator_fingerprint(spec, test_dir))
+    return _evaluator_fingerprints[key][1]
+
+
+def _evaluator_fingerprint(spec, test_dir: Path) -> str:
+    definition = {"name": spec["name"], "kind": spec["kind"], "threshold": spec["threshold"]}
+    kwargs = {k: v for k, v in spec["kwargs"].items() if k not in ("name", "grader", "prompt")}
+    if spec["kind"] == "code":
+        definition["grader"] = _grader_fingerprint(spec["kwargs"]["grader"])
+    elif spec["kind"] == "prompt":
+        prompt = spec["kwargs"]["prompt"]
+        path = Path(test_dir) / prompt
+        definition["prompt"] = path.read_text(encoding="utf-8") if path.is_file() else prompt
+    else:
+        definition["sdk"] = _package_version("azure-ai-evaluation")
+    definition["kwargs"] = kwargs
+    return _hash(definition)
+
+
+def row_fingerprint(dataset: str, row_id: str, case: Dict[str, Any]) -> str:
+    """Hash of a dataset row; fields the loader adds (leading underscore) are left out."""
+    return _hash([dataset, row_id, {k: v for k, v in case.items() if not k.startswith("_")}])
+
+
+def scoring_path(spec, engine: bool) -> Optional[str]:
+    """How a judge-backed evaluator is scored on the async engine (engine=True) or the plugin path."""
+    if spec["kind"] == "builtin":
+        return "sdk"
+    if spec["kind"] == "prompt":
+        return "engine" if engine else "plugin"
+    return None
+
+
+def pair_fingerprints(row: str, agent: Any, judge: Optional[Dict[str, Any]], specs: List[Dict[str, Any]],
+                      test_dir: Path, engine: bool = False) -> Dict[str, str]:
+    """
+    Evaluator name -> fingerprint of the (row, evaluator) pair.
+
+    Args:
+        row: row_fingerprint() of the row.
+        agent: Agent identity (and definition hash) the row runs against.
+        judge: judge_model marker kwargs, or None.
+        specs: evaluator_spec() of the row's evaluators.
+        test_dir: Folder of the test file, for prompt files.
+        engine: Whether the row is scored by the async engine.
+    """
+    judge_deployment = None
+    if judge:
+        judge_deployment = {"endpoint": judge.get("endpoint"), "model": judge.get("model")}
+    agent_hash = _hash(agent)
+    return {spec["name"]: _hash([row, agent_hash,
+                                 [judge_deployment, scoring_path(spec, engine)] if _judged(spec) else None,
+                                 evaluator_fingerprint(spec, test_dir)])
+            for spec in specs}
+
+
+def split(specs: List[Dict[str, Any]], reused: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Evaluators to run, and the reused results of the others.
+
+    Gates run again whenever a judge-backed evaluator of the row does, so a
+    failing gate still skips its judge call.
+    """
+    to_run = [spec for spec in specs if spec["name"] not in reused]
+    if any(_judged(spec) for spec in to_run):
+        to_run += [spec for spec in specs if is_gate(spec) and spec not in to_run]
+    names = {spec["name"] for spec in to_run}
+    return to_run, {spec["name"]: reused[spec["name"]] for spec in specs if spec["name"] not in names}
+
+
+# pytest session wiring; conftest.py calls these from its hooks
+
+
+def add_options(group):
+    group.addoption(
+        "--incremental",
+        action="store_true",
+        help="Reuse the stored result of every (row, evaluator) pair whose row, agent, judge deployment and "
+             "evaluator definition are unchanged since it last passed or failed; run only the rest.",
+    )
+    group.addoption(
+        "--full",
+        action="store_true",
+        help="Run every pair even with --incremental (results are still recorded for later incremental runs).",
+    )
+
+
+def configure(config):
+    """
+    Set up config._incremental and the reuse bookkeeping.
+
+    Raises:
+        ValueError: If --incremental is combined with --no-results-db
+    """
+    config._incremental = config.getoption("--incremental") and not config.getoption("--full")
+    if config._incremental and config.getoption("--no-results-db"):
+        raise ValueError("--incremental reuses results from the results store; drop --no-results-db")
+    config._pair_inputs = {}
+    config._reused = {}
+    config._incremental_counts = {"reused": 0, "recomputed": 0, "skipped": 0, "agent_calls": 0}
+
+
+def row_pair_inputs(config, key: str, item, case: Dict[str, Any], specs: List[Dict[str, Any]],
+                    engine: bool) -> Dict[str, str]:
+    """pair_fingerprints() of a row's tests, computed once per row and session."""
+    if key not in config._pair_inputs:
+        dataset, row_id = results_store.row_identity(config, case)
+        judge_marker = item.get_closest_marker("judge_model")
+        agent = [results_store.agent_identity(item.get_closest_marker("agent")),
+                 config.getoption("--agent-fingerprint")]
+        config._pair_inputs[key] = pair_fingerprints(
+            row_fingerprint(dataset, row_id, case), agent,
+            dict(judge_marker.kwargs) if judge_marker else None, specs, item.path.parent, engine=engine)
+    return config._pair_inputs[key]
+
+
+def find_reusable(config, inputs: Dict[str, Dict[str, str]]):
+    """Look up stored results for the row_pair_inputs() of every selected row into config._reused."""
+    path = results_store.db_path(config)
+    if not inputs or not path or not Path(path).exists():
+        return
+    store = results_store.ResultsStore(path)
+    try:
+        found = store.reusable({fingerprint for pairs in inputs.values() for fingerprint in pairs.values()})
+    finally:
+        store.close()
+    for key, pairs in inputs.items():
+        reused = {name: found[fingerprint] for name, fingerprint in pairs.items() if fingerprint in found}
+        if reused:
+            config._reused[key] = reused
+
+
+def count(config, results: Dict[str, Dict[str, Any]]):
+    """Count a test's results as reused, skipped or recomputed."""
+    for data in results.values():
+        counted = "reused" if "reused" in data else "skipped" if data["result"] == "skipped" else "recomputed"
+        config._incremental_counts[counted] += 1
+
+
+def worker_output(config, output: Dict[str, Any]):
+    output["incremental_counts"] = dict(config._incremental_counts)
+
+
+def merge_worker_output(config, output: Dict[str, Any]):
+    for name, value in output.get("incremental_counts", {}).items():
+        config._incremental_counts[name] += value
+
+
+def summary_lines(config) -> List[str]:
+    """The 'Incremental Run' section of the terminal summary."""
+    if not (config.getoption("--incremental") or config.getoption("--full")):
+        return []
+    counts = config._incremental_counts
+    lines = [f"{counts['reused']} (row, evaluator) pairs reused from earlier runs, {counts['recomputed']} recomputed, "
+             f"{counts['skipped']} skipped" + (" (--full)" if config.getoption("--full") else "")]
+    if counts["agent_calls"]:
+        lines.append(f"{counts['agent_calls']} agent calls for rows whose results were all reused "
+                     "(their tests still need a response)")
+    return lines
@@ -0,0 +1,64 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+The pytest-agent-evals internals this suite depends on, checked up front.
+
+The plugin is a pinned beta. Most of the suite goes through its public
+markers and types, but a few pieces have no public hook:
+
+- conftest.py overrides the plugin's `_dataset_case` fixture (rows are
+  parametrized by index, see dataset_loader.py), its `_agent_runner` fixture
+  (async engine results, the response cache and the shared credential) and
+  `evaluator_results` (evaluators run once per row, see evaluator_batch.py);
+- evaluator_batch.py uses the plugin's evaluator registry, its rate-limit
+  check and its code and prompt evaluator classes, so results match the
+  plugin's own.
+
+check() runs at configure time. It fails with one clear error when the
+installed plugin is not a version these overrides were written against, or
+lacks one of them, instead of breaking at collection or mid-run. After
+checking a new plugin release, add its version to TESTED_VERSIONS.
+
+Agent responses are converted for evaluators with the runners' public
+convert_response_for_evaluator (evaluator_messages()).
+"""
+
+from typing import Any, Dict, List, Optional
+
+TESTED_VERSIONS = ("0.0.1b260313",)
+
+# Fixtures conftest.py overrides, and plugin module attributes the suite calls
+OVERRIDDEN_FIXTURES = ("_dataset_case", "_agent_runner", "evaluator_results")
+PLUGIN_ATTRIBUTES = ("_get_evaluator_registry", "is_rate_limit_error", "CodeEvaluator", "PromptEvaluator")
+
+
+def check() -> Optional[str]:
+    """An error message when the installed pytest-agent-evals is not one the suite supports, else None."""
+    try:
+        import pytest_agent_evals
+        from pytest_agent_evals import plugin
+    except ImportError as e:
+        return f"pytest-agent-evals is not installed ({e}); pip install -r requirements.txt"
+
+    version = getattr(pytest_agent_evals, "__version__", "unknown")
+    if version not in TESTED_VERSIONS:
+        return (f"pytest-agent-evals {version} is not a version this suite was tested with "
+                f"({', '.join(TESTED_VERSIONS)}). conftest.py overrides the plugin's "
+                f"{', '.join(OVERRIDDEN_FIXTURES)} fixtures; install a tested version "
+                f"(pip install -r requirements.txt), or check the overrides against {version} "
+                "and add it to TESTED_VERSIONS in plugin_compat.py.")
+    missing = [name for name in OVERRIDDEN_FIXTURES + PLUGIN_ATTRIBUTES if not hasattr(plugin, name)]
+    if missing:
+        return f"pytest-agent-evals {version} lacks {', '.join(missing)}, which this suite relies on."
+    return None
+
+
+def evaluator_messages(response) -> List[Dict[str, Any]]:
+    """An AgentResponse as the message list built-in evaluators take."""
+    if response.type == "foundry_agent":
+        from pytest_agent_evals.foundry_agent import FoundryAgentRunner
+        return FoundryAgentRunner.convert_response_for_evaluator(response)
+    if response.type == "chat_agent":
+        from pytest_agent_evals.chat_agent import ChatAgentRunner
+        return ChatAgentRunner.convert_response_for_evaluator(response)
+    return [{"role": "assistant", "content": [{"type": "text", "text": response.output_text or ""}]}]
@@ -0,0 +1,367 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Persistent agent response cache for the Pitseleh eval suite.
+
+Agent responses are stored in a SQLite file that survives across pytest
+sessions, so judges can be iterated on against frozen agent outputs without
+calling the Foundry agent again. Entries are keyed by:
+
+- agent name
+- project endpoint
+- query
+- a fingerprint of the agent configuration (its Foundry definition:
+  model, instructions and tools), so editing the agent invalidates its entries
+
+Entries older than the TTL are treated as misses and purged, and the least
+recently used entries are evicted once the cache grows past its size limit.
+SQLite handles concurrent access from xdist workers.
+
+The cache is opt-in (--response-cache): a session that reuses stored
+responses does not evaluate the agent as it is now, only as it was when the
+responses were stored.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+DEFAULT_TTL_HOURS = 168.0
+DEFAULT_MAX_MB = 256.0
+
+# AgentResponse.type of reused_response() stand-ins
+REUSED_RESPONSE_TYPE = "reused"
+
+
+def cache_key(agent_name: str, project_endpoint: str, query: Any, fingerprint: str) -> str:
+    """Stable key for one agent response."""
+    raw = json.dumps([agent_name, project_endpoint, query, fingerprint], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of serialized agent responses with TTL and LRU size eviction.
+
+    Args:
+        path: SQLite file to use (created if missing).
+        ttl_hours: Entries older than this are expired. 0 disables expiry.
+        max_mb: Total payload size to keep. 0 disables size eviction.
+    """
+
+    def __init__(self, path: Path, ttl_hours: float = DEFAULT_TTL_HOURS, max_mb: float = DEFAULT_MAX_MB):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "stored": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; every statement is its own short transaction so workers rarely wait
+        self._db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # One transaction, so xdist workers creating a new file at once don't interleave
+            self._db.executescript(f"""
+                BEGIN IMMEDIATE;
+                DROP TABLE IF EXISTS responses;
+                CREATE TABLE responses (
+                    key TEXT PRIMARY KEY,
+                    agent TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    used REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX responses_used ON responses (used);
+                PRAGMA user_version = {SCHEMA_VERSION};
+                COMMIT;
+            """)
+        self.purge_expired()
+
+    def close(self):
+        self._db.close()
+
+    def purge_expired(self) -> int:
+        """Delete every entry older than the TTL."""
+        if not self.ttl_seconds:
+            return 0
+        deleted = self._db.execute(
+            "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self.stats["expired"] += deleted
+        return deleted
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response JSON for key, or None on a miss."""
+        now = time.time()
+        row = self._db.execute("SELECT created, payload FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None and self.ttl_seconds and row[0] < now - self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.stats["expired"] += 1
+            row = None
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+        self.stats["hits"] += 1
+        return json.loads(row[1])
+
+    def put(self, key: str, agent_name: str, project_endpoint: str, fingerprint: str, response: Dict[str, Any]):
+        """Store a response JSON and evict old entries if the cache is over its size limit."""
+        payload = json.dumps(response, default=str)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, agent_name, project_endpoint, fingerprint, now, now, len(payload), payload),
+        )
+        self.stats["stored"] += 1
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        if not self.max_bytes:
+            return 0
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self.stats["evicted"] += evicted
+        return evicted
+
+    def summary(self) -> Dict[str, Any]:
+        """Entry count and total payload size currently on disk."""
+        count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": size}
+
+
+_fingerprints: Dict[tuple, str] = {}
+
+
+async def agent_fingerprint(runner) -> str:
+    """
+    Hash of the Foundry agent definition the runner will use.
+
+    The definition (model, instructions, tools) is fetched once per process
+    and agent, so cached responses are invalidated when the agent changes.
+    """
+    identity = (runner.name, runner.project_endpoint, runner.version)
+    if identity in _fingerprints:
+        return _fingerprints[identity]
+
+    from azure.ai.projects.aio import AIProjectClient
+
+    async with AIProjectClient(endpoint=runner.project_endpoint, credential=runner.credential) as project_client:
+        if runner.version is not None:
+            details = await project_client.agents.get_version(agent_name=runner.name, agent_version=runner.version)
+            definition = details.definition
+        else:
+            agent = await project_client.agents.get(agent_name=runner.name)
+            definition = agent.versions.latest.definition
+
+    raw = json.dumps(definition.as_dict(), sort_keys=True, default=str)
+    _fingerprints[identity] = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return _fingerprints[identity]
+
+
+_output_item_adapter = None
+
+
+def reused_response():
+    """
+    Stand-in response for a row the async engine did not send to the agent,
+    because every evaluator result of the row was reused (--incremental).
+
+    The plugin stores it in its per-test file cache like any response, so
+    under --cache-mode persistence a later session can be handed one back;
+    conftest's evaluator_results checks for REUSED_RESPONSE_TYPE and fetches
+    the real response then.
+    """
+    from pytest_agent_evals import AgentResponse
+
+    return AgentResponse(type=REUSED_RESPONSE_TYPE, output_text="(agent not run: every result of this row was reused)",
+                         tool_calls=[], tool_definitions=[], output_items=[])
+
+
+def response_from_json(data: Dict[str, Any]):
+    """
+    AgentResponse.from_json for Foundry responses, with the output item validator built once per process.
+
+    The plugin builds a pydantic TypeAdapter for the Responses API item union
+    on every call, which costs about 100 ms per response. The async engine's
+    rows and the response cache's hits are deserialized here.
+    """
+    from pytest_agent_evals import AgentResponse
+
+    if data.get("type") != "foundry_agent":
+        return AgentResponse.from_json(data)
+    global _output_item_adapter
+    if _output_item_adapter is None:
+        from openai.types.responses import ResponseOutputItem
+        from pydantic import TypeAdapter
+
+        _output_item_adapter = TypeAdapter(ResponseOutputItem)
+    return AgentResponse(
+        type="foundry_agent",
+        output_text=data.get("output_text", ""),
+        tool_calls=data.get("tool_calls", []),
+        tool_definitions=data.get("tool_definitions", []),
+        output_items=[_output_item_adapter.validate_python(item) if isinstance(item, dict) else item
+                      for item in data.get("output_items", [])],
+        instructions=data.get("instructions"),
+    )
+
+
+def known_fingerprint(agent_name: str, project_endpoint: str, version: Optional[str] = None) -> Optional[str]:
+    """The agent definition hash agent_fingerprint() already fetched in this process, if any."""
+    return _fingerprints.get((agent_name, project_endpoint, version))
+
+
+class CachedAgentRunner:
+    """
+    Wraps a Foundry agent runner and serves repeated queries from a ResponseCache.
+
+    Args:
+        runner: The plugin's FoundryAgentRunner.
+        cache: The session's ResponseCache.
+        fingerprint: Fixed config fingerprint; looked up from Foundry when None.
+    """
+
+    def __init__(self, runner, cache: ResponseCache, fingerprint: Optional[str] = None):
+        self.runner = runner
+        self.cache = cache
+        self.fingerprint = fingerprint
+        self.hit = False
+
+    def __getattr__(self, name):
+        return getattr(self.runner, name)
+
+    async def run(self, query):
+        fingerprint = self.fingerprint or await agent_fingerprint(self.runner)
+        key = cache_key(self.runner.name, self.runner.project_endpoint, query, fingerprint)
+
+        cached = self.cache.get(key)
+        self.hit = cached is not None
+        if cached is not None:
+            return response_from_json(cached)
+
+        response = await self.runner.run(query)
+        self.cache.put(key, self.runner.name, self.runner.project_endpoint, fingerprint, response.to_json())
+        return response
+
+
+# pytest session wiring; conftest.py calls these from its hooks
+
+
+def add_options(group):
+    group.addoption(
+        "--response-cache",
+        action="store_true",
+        help="Reuse agent responses stored by earlier sessions instead of calling the agent for every row "
+             "(useful for iterating on judges).",
+    )
+    group.addoption(
+        "--response-cache-path",
+        default=None,
+        help="SQLite file for cached agent responses; implies --response-cache "
+             "(default: .pytest_cache/d/pitseleh/responses.sqlite).",
+    )
+    group.addoption(
+        "--response-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        help=f"Hours before a cached agent response expires; 0 keeps them forever (default: {DEFAULT_TTL_HOURS:g}).",
+    )
+    group.addoption(
+        "--response-cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help=f"Evict least recently used responses beyond this size; 0 for no limit (default: {DEFAULT_MAX_MB:g}).",
+    )
+    group.addoption(
+        "--agent-fingerprint",
+        default=None,
+        help="Fixed agent config fingerprint for the response cache, instead of hashing the "
+             "agent definition fetched from Foundry (useful for offline judge iteration).",
+    )
+
+
+def configure(config):
+    config._response_cache = None
+    config._response_cache_path = None
+    config._response_cache_stats = {}
+
+
+def session_start(config):
+    """Choose the cache file with --response-cache; config.cache only exists once the session starts."""
+    path = config.getoption("--response-cache-path")
+    if not path and config.getoption("--response-cache") and hasattr(config, "cache"):
+        path = Path(config.cache.mkdir("pitseleh")) / "responses.sqlite"
+    config._response_cache_path = path
+
+
+def session_cache(config) -> Optional[ResponseCache]:
+    """
+    The session's ResponseCache, opened on first use.
+
+    Opening it purges expired entries, which the xdist controller and
+    sessions that never run a row should not pay for.
+    """
+    if config._response_cache is None and config._response_cache_path:
+        config._response_cache = ResponseCache(
+            config._response_cache_path,
+            ttl_hours=config.getoption("--response-cache-ttl"),
+            max_mb=config.getoption("--response-cache-max-mb"),
+        )
+    return config._response_cache
+
+
+def merge_worker_output(config, output: Dict[str, Any]):
+    for name, value in output.get("response_cache_stats", {}).items():
+        config._response_cache_stats[name] = config._response_cache_stats.get(name, 0) + value
+
+
+def finish(config):
+    """Add this process's hit and miss counts to the session's."""
+    if config._response_cache is not None:
+        merge_worker_output(config, {"response_cache_stats": config._response_cache.stats})
+
+
+def worker_output(config, output: Dict[str, Any]):
+    """Hand an xdist worker's counters (after finish()) to the controller."""
+    output["response_cache_stats"] = dict(config._response_cache_stats)
+
+
+def close(config):
+    if getattr(config, "_response_cache", None) is not None:
+        config._response_cache.close()
+
+
+def summary_lines(config) -> List[str]:
+    """The 'Agent Response Cache' section of the terminal summary."""
+    stats = config._response_cache_stats
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    cache = session_cache(config) if lookups else None
+    if cache is None:
+        return []
+    summary = cache.summary()
+    return [
+        f"{stats.get('hits', 0)} hits, {stats.get('misses', 0)} misses "
+        f"({stats.get('hits', 0) / lookups * 100:.1f}% hit rate)",
+        f"{stats.get('stored', 0)} stored, {stats.get('expired', 0)} expired, {stats.get('evicted', 0)} evicted; "
+        f"{summary['entries']} entries, {summary['bytes'] / 1024 / 1024:.1f} MB in {cache.path}",
+    ]
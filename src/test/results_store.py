@@ -0,0 +1,499 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Append-only store of row-level eval results for the Pitseleh eval suite.
+
+Every pytest session adds one run to a SQLite file: per dataset row the
+agent/judge latencies, token usage and config fingerprints, and per row and
+evaluator the score, result, threshold and reason. Per-evaluator pass counts
+are aggregated when a run is written, so trends over thousands of runs read
+one small row per run and evaluator. Results are keyed by run first, so
+diffing two runs is two range scans joined on (evaluator, dataset, row id).
+The latest pass/fail result of every input fingerprint (see incremental.py)
+is kept too, for --incremental runs to reuse.
+
+Usage:
+    python results_store.py [--db PATH] runs [--limit 20]
+    python results_store.py [--db PATH] summary [--run latest | --last 10] [--evaluator NAME]
+    python results_store.py [--db PATH] diff [BASE [HEAD]] [--score-drop 0.5] [--improved] [--fail-on-regression]
+
+Runs are referred to by id, or as latest, latest~1, latest~2, ...
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA_VERSION = 2
+
+DEFAULT_PATH = Path(".pytest_cache") / "d" / "pitseleh" / "results.sqlite"
+
+ROW_FIELDS = ("agent_seconds", "judge_seconds", "total_seconds", "agent_input_tokens", "agent_output_tokens",
+              "judge_input_tokens", "judge_output_tokens", "error")
+
+
+def config_fingerprint(config: Any) -> str:
+    """Short stable hash of an agent or judge configuration."""
+    # Functions (e.g. agent fixtures passed to markers) by name, not by their repr with its address
+    raw = json.dumps(config, sort_keys=True, default=lambda value: getattr(value, "__qualname__", None) or str(value))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _score(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsStore:
+    """
+    SQLite-backed history of eval runs.
+
+    Args:
+        path: SQLite file to use (created if missing).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id INTEGER PRIMARY KEY,
+                    started REAL NOT NULL,
+                    finished REAL NOT NULL,
+                    label TEXT,
+                    argv TEXT,
+                    rows INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS configs (
+                    config_id INTEGER PRIMARY KEY,
+                    agent_fingerprint TEXT NOT NULL,
+                    judge_fingerprint TEXT NOT NULL,
+                    UNIQUE (agent_fingerprint, judge_fingerprint)
+                );
+                CREATE TABLE IF NOT EXISTS rows (
+                    run_id INTEGER NOT NULL,
+                    dataset TEXT NOT NULL,
+                    row_id TEXT NOT NULL,
+                    config_id INTEGER NOT NULL,
+                    agent_seconds REAL,
+                    judge_seconds REAL,
+                    total_seconds REAL,
+                    agent_input_tokens INTEGER,
+                    agent_output_tokens INTEGER,
+                    judge_input_tokens INTEGER,
+                    judge_output_tokens INTEGER,
+                    error TEXT,
+                    PRIMARY KEY (run_id, dataset, row_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS results (
+                    run_id INTEGER NOT NULL,
+                    evaluator TEXT NOT NULL,
+                    dataset TEXT NOT NULL,
+                    row_id TEXT NOT NULL,
+                    score REAL,
+                    result TEXT NOT NULL,
+                    threshold REAL,
+                    reason TEXT,
+                    PRIMARY KEY (run_id, evaluator, dataset, row_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS summary (
+                    run_id INTEGER NOT NULL,
+                    evaluator TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    passed INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    skipped INTEGER NOT NULL,
+                    mean_score REAL,
+                    PRIMARY KEY (run_id, evaluator)
+                ) WITHOUT ROWID;
+            """)
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} has results schema {version}; this version reads {SCHEMA_VERSION}.")
+        if version < 2:
+            self._db.executescript(f"""
+                CREATE TABLE IF NOT EXISTS reuse (
+                    inputs TEXT PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    score REAL,
+                    result TEXT NOT NULL,
+                    threshold REAL,
+                    reason TEXT
+                ) WITHOUT ROWID;
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+
+    def close(self):
+        self._db.close()
+
+    def _config_id(self, agent_fingerprint: str, judge_fingerprint: str) -> int:
+        self._db.execute("INSERT OR IGNORE INTO configs (agent_fingerprint, judge_fingerprint) VALUES (?, ?)",
+                         (agent_fingerprint, judge_fingerprint))
+        return self._db.execute("SELECT config_id FROM configs WHERE agent_fingerprint = ? AND judge_fingerprint = ?",
+                                (agent_fingerprint, judge_fingerprint)).fetchone()[0]
+
+    def add_run(self, rows: Iterable[Dict[str, Any]], results: Iterable[Dict[str, Any]], started: float,
+                label: Optional[str] = None, argv: Optional[List[str]] = None) -> int:
+        """
+        Write one run in a single transaction and return its id.
+
+        Args:
+            rows: One dict per dataset row: 'dataset', 'row_id', 'agent_fingerprint',
+                'judge_fingerprint' and the optional ROW_FIELDS.
+            results: One dict per row and evaluator: 'dataset', 'row_id', 'evaluator',
+                'score', 'result', 'threshold', 'reason', and optionally 'inputs' (the
+                pair's input fingerprint) and 'reused' (the run a reused result came from).
+            started: Session start (epoch seconds).
+            label: Free-form name for the run, such as a commit.
+            argv: The pytest command line.
+        """
+        rows = list(rows)
+        configs = {}
+        with self._db:
+            run_id = self._db.execute(
+                "INSERT INTO runs (started, finished, label, argv, rows) VALUES (?, ?, ?, ?, ?)",
+                (started, time.time(), label, json.dumps(argv) if argv is not None else None, len(rows)),
+            ).lastrowid
+            for row in rows:
+                fingerprints = (row.get("agent_fingerprint") or "", row.get("judge_fingerprint") or "")
+                if fingerprints not in configs:
+                    configs[fingerprints] = self._config_id(*fingerprints)
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, {', '.join('?' for _ in ROW_FIELDS)})",
+                ((run_id, str(row["dataset"]), str(row["row_id"]),
+                  configs[(row.get("agent_fingerprint") or "", row.get("judge_fingerprint") or "")],
+                  *(row.get(field) for field in ROW_FIELDS)) for row in rows),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, result["evaluator"], str(result["dataset"]), str(result["row_id"]),
+                  _score(result.get("score")), result["result"], _score(result.get("threshold")),
+                  result.get("reason")) for result in results),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO reuse VALUES (?, ?, ?, ?, ?, ?)",
+                ((result["inputs"], result.get("reused") or run_id, _score(result.get("score")), result["result"],
+                  _score(result.get("threshold")), result.get("reason"))
+                 for result in results if result.get("inputs") and result["result"] in ("pass", "fail")),
+            )
+            self._db.execute("""
+                INSERT INTO summary
+                SELECT run_id, evaluator, COUNT(*),
+                       SUM(result = 'pass'), SUM(result = 'fail'), SUM(result = 'error'), SUM(result = 'skipped'),
+                       AVG(CASE WHEN result != 'skipped' THEN score END)
+                FROM results WHERE run_id = ? GROUP BY evaluator
+            """, (run_id,))
+        return run_id
+
+    def reusable(self, fingerprints: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest pass/fail result per input fingerprint, for those the store has."""
+        fingerprints = list(fingerprints)
+        names = ("inputs", "reused", "score", "result", "threshold", "reason")
+        found = {}
+        # SQLite caps the number of bound parameters per statement
+        for start in range(0, len(fingerprints), 500):
+            chunk = fingerprints[start:start + 500]
+            cursor = self._db.execute(
+                f"SELECT * FROM reuse WHERE inputs IN ({', '.join('?' for _ in chunk)})", chunk)
+            for row in cursor:
+                found[row[0]] = dict(zip(names[1:], row[1:]))
+        return found
+
+    def resolve(self, ref: Any) -> int:
+        """Run id for an id, 'latest' or 'latest~N'."""
+        text = str(ref)
+        if text.startswith("latest"):
+            back = int(text.partition("~")[2] or 0)
+            row = self._db.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT 1 OFFSET ?", (back,)).fetchone()
+        else:
+            row = self._db.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(text),)).fetchone()
+        if row is None:
+            raise ValueError(f"No run '{ref}' in {self.path}")
+        return row[0]
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The most recent runs, newest first."""
+        cursor = self._db.execute(
+            "SELECT run_id, started, finished, label, rows FROM runs ORDER BY run_id DESC LIMIT ?", (limit,))
+        return [dict(zip(("run_id", "started", "finished", "label", "rows"), row)) for row in cursor]
+
+    def summary(self, run_ids: List[int], evaluator: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per run and evaluator counts and pass rate (skipped rows excluded)."""
+        marks = ", ".join("?" for _ in run_ids)
+        query = f"SELECT * FROM summary WHERE run_id IN ({marks})"
+        params = list(run_ids)
+        if evaluator:
+            query += " AND evaluator = ?"
+            params.append(evaluator)
+        names = ("run_id", "evaluator", "total", "passed", "failed", "errors", "skipped", "mean_score")
+        rows = [dict(zip(names, row)) for row in self._db.execute(query + " ORDER BY evaluator, run_id", params)]
+        for row in rows:
+            graded = row["total"] - row["skipped"]
+            row["pass_rate"] = row["passed"] / graded if graded else None
+        return rows
+
+    def diff(self, base: int, head: int, score_drop: Optional[float] = None,
+             improved: bool = False) -> List[Dict[str, Any]]:
+        """
+        Rows whose result got worse from base to head.
+
+        A regression is a pass that became a fail or error, or (with score_drop)
+        a score that fell by at least score_drop. With improved, the opposite.
+        """
+        worse = "(b.result = 'pass' AND h.result IN ('fail', 'error'))"
+        if score_drop is not None:
+            worse += " OR (b.score - h.score >= :drop)"
+        better = "(h.result = 'pass' AND b.result IN ('fail', 'error'))"
+        if score_drop is not None:
+            better += " OR (h.score - b.score >= :drop)"
+        cursor = self._db.execute(f"""
+            SELECT h.evaluator, h.dataset, h.row_id, b.result, h.result, b.score, h.score, h.reason
+            FROM results AS b JOIN results AS h
+              ON h.run_id = :head AND h.evaluator = b.evaluator AND h.dataset = b.dataset AND h.row_id = b.row_id
+            WHERE b.run_id = :base AND ({better if improved else worse})
+            ORDER BY h.evaluator, h.dataset, h.row_id
+        """, {"base": base, "head": head, "drop": score_drop})
+        names = ("evaluator", "dataset", "row_id", "base_result", "head_result", "base_score", "head_score", "reason")
+        return [dict(zip(names, row)) for row in cursor]
+
+
+# pytest session wiring; conftest.py calls these from its hooks
+
+
+def add_options(group):
+    group.addoption(
+        "--results-db",
+        default=None,
+        help="SQLite file the session's row-level results are appended to "
+             "(default: .pytest_cache/d/pitseleh/results.sqlite).",
+    )
+    group.addoption(
+        "--no-results-db",
+        action="store_true",
+        help="Don't record this session in the results store.",
+    )
+    group.addoption(
+        "--run-label",
+        default=None,
+        help="Name for this run in the results store, such as a commit or branch.",
+    )
+
+
+def configure(config):
+    config._store_rows = {}
+    config._store_results = []
+    config._store_started = time.time()
+    config._store_run = None
+
+
+def db_path(config) -> Optional[Path]:
+    """The session's results store file, or None with --no-results-db."""
+    if config.getoption("--no-results-db"):
+        return None
+    path = config.getoption("--results-db")
+    if not path and hasattr(config, "cache"):
+        path = Path(config.cache.mkdir("pitseleh")) / "results.sqlite"
+    return path
+
+
+def row_identity(config, case: Dict[str, Any]) -> tuple:
+    """(dataset, row id) of a case, with the dataset relative to the rootdir so runs compare across checkouts."""
+    dataset = case.get("_dataset", "default")
+    try:
+        dataset = Path(dataset).resolve().relative_to(config.rootpath).as_posix()
+    except (OSError, ValueError):
+        pass
+    return dataset, str(case.get("id", case.get("_test_id")))
+
+
+def agent_identity(marker) -> Optional[Dict[str, Any]]:
+    """Name, project endpoint and version of the agent an @evals.agent marker selects."""
+    if marker is None:
+        return None
+    return {
+        "name": marker.args[0] if marker.args else marker.kwargs.get("name"),
+        "project_endpoint": marker.kwargs.get("project_endpoint"),
+        "version": marker.kwargs.get("version"),
+    }
+
+
+def record_row(config, case, agent, judge, fields, agent_usage, judge_usage):
+    """Keep a row's latencies, token usage and config fingerprints for the results store."""
+    from response_cache import known_fingerprint
+
+    dataset, row_id = row_identity(config, case)
+    if config.getoption("--no-results-db") or (dataset, row_id) in config._store_rows:
+        return
+    # The agent definition hash when known (--agent-fingerprint or fetched for the response cache)
+    definition = config.getoption("--agent-fingerprint")
+    if not definition and agent:
+        definition = known_fingerprint(agent["name"], agent["project_endpoint"], agent["version"])
+    agent_usage, judge_usage = agent_usage or {}, judge_usage or {}
+    config._store_rows[(dataset, row_id)] = {
+        "dataset": dataset,
+        "row_id": row_id,
+        "agent_fingerprint": config_fingerprint([agent, definition]),
+        "judge_fingerprint": config_fingerprint(judge),
+        **fields,
+        "agent_input_tokens": agent_usage.get("input_tokens"),
+        "agent_output_tokens": agent_usage.get("output_tokens"),
+        "judge_input_tokens": judge_usage.get("prompt_tokens"),
+        "judge_output_tokens": judge_usage.get("completion_tokens"),
+    }
+
+
+def record_test(config, node, case, agent_response, results, engine_row=None, eval_seconds=None,
+                agent_seconds=None, inputs=None):
+    """
+    Keep a test's evaluator results, their input fingerprints and its row for the results store.
+
+    Args:
+        node: The test item, for its agent and judge_model markers.
+        engine_row: The async engine's result for the row, which has its timings and usage.
+        eval_seconds, agent_seconds: Timings of the plugin path otherwise.
+        inputs: Evaluator name -> input fingerprint (see incremental.py).
+    """
+    if config.getoption("--no-results-db"):
+        return
+    dataset, row_id = row_identity(config, case)
+    for name, data in results.items():
+        reason = data.get("reason")
+        config._store_results.append({
+            "dataset": dataset, "row_id": row_id, "evaluator": name, "score": data.get("score"),
+            "result": data["result"], "threshold": data.get("threshold"),
+            "reason": reason if reason is None or isinstance(reason, str) else json.dumps(reason, default=str),
+            "inputs": (inputs or {}).get(name), "reused": data.get("reused"),
+        })
+
+    judge_marker = node.get_closest_marker("judge_model")
+    judge = dict(judge_marker.kwargs) if judge_marker else None
+    agent = agent_identity(node.get_closest_marker("agent"))
+    if engine_row is not None:
+        latency, usage = engine_row["latency"], engine_row["usage"]
+        timing = {"agent_seconds": latency.get("agent"), "judge_seconds": latency.get("judge"),
+                  "total_seconds": latency.get("total")}
+        record_row(config, case, agent, judge, timing, usage.get("agent"), usage.get("judge"))
+        return
+    timing = {"agent_seconds": agent_seconds, "judge_seconds": eval_seconds,
+              "total_seconds": (agent_seconds or 0) + eval_seconds if eval_seconds is not None else None}
+    raw_usage = getattr(agent_response.raw, "usage", None)
+    agent_usage = None
+    if raw_usage is not None:
+        agent_usage = {"input_tokens": raw_usage.input_tokens, "output_tokens": raw_usage.output_tokens}
+    record_row(config, case, agent, judge, timing, agent_usage, None)
+
+
+def worker_output(config, output: Dict[str, Any]):
+    """Hand an xdist worker's rows and results to the controller, which writes the run."""
+    output["results_store"] = {"rows": list(config._store_rows.values()), "results": config._store_results}
+
+
+def merge_worker_output(config, output: Dict[str, Any]):
+    stored = output.get("results_store") or {}
+    for row in stored.get("rows", ()):
+        config._store_rows.setdefault((row["dataset"], row["row_id"]), row)
+    config._store_results.extend(stored.get("results", ()))
+
+
+def finish(config):
+    """Write the session as one run."""
+    path = db_path(config)
+    if not path or not config._store_results:
+        return
+    store = ResultsStore(path)
+    try:
+        run_id = store.add_run(config._store_rows.values(), config._store_results, config._store_started,
+                               label=config.getoption("--run-label"), argv=list(config.invocation_params.args))
+    finally:
+        store.close()
+    config._store_run = (run_id, path)
+
+
+def summary_lines(config) -> List[str]:
+    """The 'Results Store' section of the terminal summary."""
+    if not config._store_run:
+        return []
+    run_id, path = config._store_run
+    return [f"run {run_id}: {len(config._store_rows)} rows, {len(config._store_results)} results in {path} "
+            f"(compare with: python results_store.py --db {path} diff)"]
+
+
+def _format_score(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Pitseleh eval results history.")
+    parser.add_argument("--db", default=str(DEFAULT_PATH), help=f"Results SQLite file (default: {DEFAULT_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    summary_parser = commands.add_parser("summary", help="Pass rate per evaluator")
+    summary_parser.add_argument("--run", default=None, help="Run to summarize (default: latest)")
+    summary_parser.add_argument("--last", type=int, default=None, help="Show the trend over the last N runs")
+    summary_parser.add_argument("--evaluator", default=None)
+
+    diff_parser = commands.add_parser("diff", help="Rows that regressed between two runs")
+    diff_parser.add_argument("base", nargs="?", default="latest~1")
+    diff_parser.add_argument("head", nargs="?", default="latest")
+    diff_parser.add_argument("--score-drop", type=float, default=None,
+                             help="Also report rows whose score fell by at least this much")
+    diff_parser.add_argument("--improved", action="store_true", help="Report rows that improved instead")
+    diff_parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if any row regressed")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        parser.error(f"{args.db} does not exist; run the eval suite first")
+    store = ResultsStore(Path(args.db))
+    try:
+        if args.command == "runs":
+            print(f"{'run':>6}  {'started':<19}  {'seconds':>8}  {'rows':>6}  label")
+            for run in store.runs(args.limit):
+                started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"]))
+                print(f"{run['run_id']:>6}  {started:<19}  {run['finished'] - run['started']:>8.1f}  "
+                      f"{run['rows']:>6}  {run['label'] or ''}")
+
+        elif args.command == "summary":
+            if args.last:
+                run_ids = [run["run_id"] for run in store.runs(args.last)]
+            else:
+                run_ids = [store.resolve(args.run or "latest")]
+            print(f"{'evaluator':<28} {'run':>6} {'pass rate':>9} {'pass':>6} {'fail':>6} {'error':>6} "
+                  f"{'skipped':>7} {'mean':>6}")
+            for row in store.summary(run_ids, args.evaluator):
+                rate = "-" if row["pass_rate"] is None else f"{row['pass_rate'] * 100:.1f}%"
+                print(f"{row['evaluator']:<28} {row['run_id']:>6} {rate:>9} {row['passed']:>6} {row['failed']:>6} "
+                      f"{row['errors']:>6} {row['skipped']:>7} {_format_score(row['mean_score']):>6}")
+
+        elif args.command == "diff":
+            base, head = store.resolve(args.base), store.resolve(args.head)
+            changes = store.diff(base, head, args.score_drop, args.improved)
+            for change in changes:
+                print(f"{change['evaluator']:<28} {change['dataset']}::{change['row_id']}  "
+                      f"{change['base_result']} -> {change['head_result']}  "
+                      f"({_format_score(change['base_score'])} -> {_format_score(change['head_score'])})"
+                      + (f"  {change['reason']}" if change["reason"] else ""))
+            print(f"{len(changes)} {'improved' if args.improved else 'regressed'} rows between run {base} and run {head}")
+            if args.fail_on_regression and changes and not args.improved:
+                sys.exit(1)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
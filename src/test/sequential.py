@@ -0,0 +1,240 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Sequential early stopping for evaluator pass rates (--early-stop).
+
+Every evaluator's results are fed, row by row, to a Wald sequential
+probability ratio test (SPRT) of its pass rate against a target:
+
+    H0: pass rate <= target - margin     (the evaluator fails the run)
+    H1: pass rate >= target + margin     (the evaluator passes the run)
+
+with both error rates at 1 - confidence. Once the log-likelihood ratio
+crosses a boundary the evaluator's outcome is settled, and rows that have
+not reached it yet skip it, so clear passes and clear failures stop paying
+for judge calls long before the end of a large dataset. Rows already in
+flight still complete and are counted.
+
+- Gate evaluators keep running while any judge-backed evaluator of the row
+  is still undecided: their per-row result is what saves judge calls.
+- Errors and skipped results are not evidence about the pass rate and are
+  not counted.
+- A row whose evaluators are all settled skips the agent call too (async
+  engine).
+
+Each pytest process keeps its own statistics: with xdist, every worker
+decides on the rows it runs. The async engine sees every row.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from evaluator_batch import is_gate
+
+DEFAULT_TARGET = 0.9
+DEFAULT_MARGIN = 0.05
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_MIN_ROWS = 10
+
+# Keeps log() finite for targets of 0 or 1
+_EPSILON = 1e-6
+
+
+class SPRT:
+    """
+    Wald's SPRT of a Bernoulli pass rate against target +/- margin.
+
+    Args:
+        target: Pass rate the evaluator should reach.
+        margin: Half-width of the indifference region around target.
+        confidence: 1 - (probability of deciding wrongly), for both outcomes.
+        min_rows: Observations required before deciding.
+    """
+
+    def __init__(self, target: float = DEFAULT_TARGET, margin: float = DEFAULT_MARGIN,
+                 confidence: float = DEFAULT_CONFIDENCE, min_rows: int = DEFAULT_MIN_ROWS):
+        p0 = min(max(target - margin, _EPSILON), 1 - _EPSILON)
+        p1 = min(max(target + margin, _EPSILON), 1 - _EPSILON)
+        if not 0.5 < confidence < 1:
+            raise ValueError(f"confidence must be between 0.5 and 1, got {confidence}")
+        if p1 <= p0:
+            raise ValueError(f"target {target} and margin {margin} leave no room to decide")
+        error = 1 - confidence
+        self.step_pass = math.log(p1 / p0)
+        self.step_fail = math.log((1 - p1) / (1 - p0))
+        self.upper = math.log((1 - error) / error)
+        self.lower = math.log(error / (1 - error))
+        self.min_rows = min_rows
+        self.llr = 0.0
+        self.passes = 0
+        self.total = 0
+        self.decision: Optional[str] = None
+
+    def observe(self, passed: bool) -> Optional[str]:
+        """Add one result; returns 'pass' or 'fail' once the outcome is settled."""
+        if self.decision is not None:
+            return self.decision
+        self.total += 1
+        self.passes += passed
+        self.llr += self.step_pass if passed else self.step_fail
+        if self.total >= self.min_rows:
+            if self.llr >= self.upper:
+                self.decision = "pass"
+            elif self.llr <= self.lower:
+                self.decision = "fail"
+        return self.decision
+
+
+def _judged(spec) -> bool:
+    return spec["kind"] in ("builtin", "prompt")
+
+
+class EarlyStopping:
+    """
+    SPRT per evaluator name, shared by every row of the session.
+
+    Args:
+        target, margin, confidence, min_rows: See SPRT.
+    """
+
+    def __init__(self, target: float = DEFAULT_TARGET, margin: float = DEFAULT_MARGIN,
+                 confidence: float = DEFAULT_CONFIDENCE, min_rows: int = DEFAULT_MIN_ROWS):
+        SPRT(target, margin, confidence, min_rows)  # Validate once, up front
+        self.settings = (target, margin, confidence, min_rows)
+        self.tests: Dict[str, SPRT] = {}
+        self.stopped: Dict[str, Set[str]] = {}
+
+    def decision(self, name: str) -> Optional[str]:
+        test = self.tests.get(name)
+        return test.decision if test else None
+
+    def observe(self, results: Dict[str, Dict[str, Any]]):
+        """Count a row's pass/fail results."""
+        for name, data in results.items():
+            if data.get("result") in ("pass", "fail"):
+                if name not in self.tests:
+                    self.tests[name] = SPRT(*self.settings)
+                self.tests[name].observe(data["result"] == "pass")
+
+    def active(self, specs: List[Dict[str, Any]], row: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Split a row's evaluators into those to run and stopped results for the rest.
+
+        Gates stay active while any judge-backed evaluator is. Asking again
+        for the same row does not count its stopped evaluators twice.
+        """
+        running = [spec for spec in specs if self.decision(spec["name"]) is None]
+        if any(_judged(spec) for spec in running):
+            running += [spec for spec in specs if is_gate(spec) and spec not in running]
+        stopped = {}
+        for spec in specs:
+            if spec not in running:
+                stopped[spec["name"]] = self.stopped_result(spec)
+                self.stopped.setdefault(spec["name"], set()).add(row)
+        return running, stopped
+
+    def stopped_result(self, spec) -> Dict[str, Any]:
+        test = self.tests[spec["name"]]
+        return {"score": None, "result": "skipped", "threshold": spec["threshold"],
+                "reason": f"Early stop: '{spec['name']}' settled as {test.decision} "
+                          f"({test.passes}/{test.total} rows passed)"}
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per evaluator: decision, passes, rows counted and rows not sent (plain data, for xdist)."""
+        return {name: {"decision": test.decision, "passes": test.passes, "total": test.total,
+                       "stopped": len(self.stopped.get(name, ()))}
+                for name, test in self.tests.items()}
+
+
+def format_summary(summaries: List[Dict[str, Dict[str, Any]]]) -> List[str]:
+    """Terminal lines for the summary() of every process (one per xdist worker)."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        for name, data in summary.items():
+            entry = merged.setdefault(name, {"decisions": [], "passes": 0, "total": 0, "stopped": 0})
+            entry["decisions"].append(data["decision"] or "undecided")
+            for field in ("passes", "total", "stopped"):
+                entry[field] += data[field]
+
+    lines = []
+    for name, entry in sorted(merged.items()):
+        decisions = sorted(set(entry["decisions"]))
+        if len(decisions) == 1:
+            decision = decisions[0]
+        else:
+            decision = ", ".join(f"{d} on {entry['decisions'].count(d)} workers" for d in decisions)
+        lines.append(f"{name}: {decision}; {entry['passes']}/{entry['total']} rows passed "
+                     f"({entry['passes'] / max(entry['total'], 1) * 100:.1f}%), {entry['stopped']} rows not sent")
+    return lines
+
+
+# pytest session wiring; conftest.py calls these from its hooks
+
+
+def add_options(group):
+    group.addoption(
+        "--early-stop",
+        action="store_true",
+        help="Stop sending rows to an evaluator once a sequential test (SPRT) has settled whether its pass rate "
+             "is above or below --early-stop-target.",
+    )
+    group.addoption(
+        "--early-stop-target",
+        type=float,
+        default=DEFAULT_TARGET,
+        help=f"Pass rate each evaluator is tested against (default: {DEFAULT_TARGET}).",
+    )
+    group.addoption(
+        "--early-stop-margin",
+        type=float,
+        default=DEFAULT_MARGIN,
+        help="Pass rates within this distance of the target are not told apart; smaller margins need more rows "
+             f"(default: {DEFAULT_MARGIN}).",
+    )
+    group.addoption(
+        "--early-stop-confidence",
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help=f"Confidence required to settle an evaluator's outcome (default: {DEFAULT_CONFIDENCE}).",
+    )
+    group.addoption(
+        "--early-stop-min-rows",
+        type=int,
+        default=DEFAULT_MIN_ROWS,
+        help=f"Rows an evaluator must be scored on before it can be settled (default: {DEFAULT_MIN_ROWS}).",
+    )
+
+
+def configure(config):
+    """
+    Set up config._early_stop (None without --early-stop).
+
+    Raises:
+        ValueError: If the --early-stop-* settings leave nothing to decide
+    """
+    config._early_stop = EarlyStopping(
+        config.getoption("--early-stop-target"), config.getoption("--early-stop-margin"),
+        config.getoption("--early-stop-confidence"), config.getoption("--early-stop-min-rows"),
+    ) if config.getoption("--early-stop") else None
+    config._early_stop_summaries = []
+
+
+def worker_output(config, output: Dict[str, Any]):
+    """Hand an xdist worker's decisions to the controller."""
+    if config._early_stop is not None:
+        output["early_stop"] = config._early_stop.summary()
+
+
+def merge_worker_output(config, output: Dict[str, Any]):
+    if "early_stop" in output:
+        config._early_stop_summaries.append(output["early_stop"])
+
+
+def finish(config):
+    if config._early_stop is not None:
+        config._early_stop_summaries.append(config._early_stop.summary())
+
+
+def summary_lines(config) -> List[str]:
+    """The 'Early Stopping' section of the terminal summary."""
+    return format_summary(config._early_stop_summaries)
@@ -0,0 +1,151 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Session startup benchmark for the Pitseleh eval suite.
+
+Runs `pytest test_Pitseleh.py --collect-only --fast-start` under
+`python -X importtime` in a fresh copy of the suite, and reports:
+
+- wall time from process start to the end of collection
+- total import time, and the packages with the most import self time
+  (pytest_agent_evals pulls in the Azure SDKs, openai and pydantic)
+- the cumulative import time of the suite's helper modules (pytest loads
+  conftest.py and test_Pitseleh.py itself, so they only count towards the
+  wall time)
+
+The first run warms the bytecode caches and is not counted; the medians of
+the other runs are reported.
+
+Usage:
+    python startup_bench.py [--repeat 5] [--rows 10] [--top 15]
+        [--budget-ms 4000] [--wall-budget-ms 6000]
+        [--save startup.json] [--baseline startup.json --tolerance 0.2]
+
+Exits with 1 when the median import time or wall time is over its budget,
+or slower than the baseline by more than the tolerance, so CI can fail on
+startup regressions.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from bench_harness import BENCH_ENV, SUITE_DIR, prepare_suite
+
+# "import time:      1234 |       5678 |   package.module" (microseconds; two spaces of indent per nesting level)
+IMPORT_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """Total import time, self time per top-level package and cumulative time per module, in milliseconds."""
+    total_us = 0
+    packages: Dict[str, int] = {}
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        if len(indent) <= 1:
+            total_us += cumulative_us
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+        modules[name] = modules.get(name, 0) + cumulative_us
+    return {
+        "import_ms": total_us / 1000,
+        "packages": {name: us / 1000 for name, us in packages.items()},
+        "modules": {name: us / 1000 for name, us in modules.items()},
+    }
+
+
+def run_once(folder: Path) -> Dict[str, Any]:
+    """Start a collect-only session once and return its measurements."""
+    command = [
+        sys.executable, "-X", "importtime", "-m", "pytest", "test_Pitseleh.py", "--collect-only", "-q", "-s",
+        "--fast-start", "--no-results-db",
+    ]
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=folder, env={**os.environ, **BENCH_ENV}, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"pytest --collect-only failed (exit {process.returncode}):\n"
+                           f"{process.stdout[-2000:]}{process.stderr[-2000:]}")
+    return {"wall_ms": wall * 1000, **parse_importtime(process.stderr)}
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Medians over runs."""
+    packages = {name for run in runs for name in run["packages"]}
+    modules = {name for run in runs for name in run["modules"]}
+    return {
+        "wall_ms": statistics.median(run["wall_ms"] for run in runs),
+        "import_ms": statistics.median(run["import_ms"] for run in runs),
+        "packages": {name: statistics.median(run["packages"].get(name, 0.0) for run in runs) for name in packages},
+        "modules": {name: statistics.median(run["modules"].get(name, 0.0) for run in runs) for name in modules},
+    }
+
+
+def check(result, budget_ms, wall_budget_ms, baseline, tolerance) -> List[str]:
+    """Budget and baseline violations."""
+    violations = []
+    if budget_ms is not None and result["import_ms"] > budget_ms:
+        violations.append(f"import time {result['import_ms']:.0f} ms over budget {budget_ms:.0f} ms")
+    if wall_budget_ms is not None and result["wall_ms"] > wall_budget_ms:
+        violations.append(f"startup wall time {result['wall_ms']:.0f} ms over budget {wall_budget_ms:.0f} ms")
+    if baseline:
+        for field, label in (("import_ms", "import time"), ("wall_ms", "startup wall time")):
+            if result[field] > baseline[field] * (1 + tolerance):
+                violations.append(f"{label} {result[field]:.0f} ms, baseline {baseline[field]:.0f} ms")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark eval session startup with python -X importtime.")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs after the warm-up run (default: 5)")
+    parser.add_argument("--rows", type=int, default=10, help="Rows in the generated dataset (default: 10)")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by import self time (default: 15)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the median import time is higher")
+    parser.add_argument("--wall-budget-ms", type=float, default=None,
+                        help="Fail when the median startup wall time is higher")
+    parser.add_argument("--save", default=None, help="Write the result to this JSON file as a baseline")
+    parser.add_argument("--baseline", default=None, help="Compare against a baseline written with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pitseleh-startup-") as tmp:
+        folder = Path(tmp)
+        prepare_suite(folder, args.rows)
+        run_once(folder)  # Warm-up: compiles bytecode and builds the dataset index
+        result = summarize([run_once(folder) for _ in range(args.repeat)])
+
+    print(f"startup {result['wall_ms']:.0f} ms wall, {result['import_ms']:.0f} ms importing "
+          f"(median of {args.repeat})")
+    print(f"{'package':<32} {'self ms':>8}")
+    for name, ms in sorted(result["packages"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32} {ms:>8.1f}")
+    suite = sorted(path.stem for path in SUITE_DIR.glob("*.py"))
+    print(f"{'suite module':<32} {'cum. ms':>8}")
+    for name in suite:
+        if name in result["modules"]:
+            print(f"{name:<32} {result['modules'][name]:>8.1f}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({"args": vars(args), **result}, indent=2), encoding="utf-8")
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    violations = check(result, args.budget_ms, args.wall_budget_ms, baseline, args.tolerance)
+    for line in violations:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
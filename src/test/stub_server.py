@@ -0,0 +1,355 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Local stand-in for the Foundry agent and Azure OpenAI judge endpoints.
+
+Serves just enough of both APIs for eval_engine.py:
+
+- POST /agent/openai/v1/responses          Foundry Responses API
+- POST /judge/openai/v1/chat/completions   Azure OpenAI chat completions
+- POST /judge/openai/deployments/{model}/chat/completions
+                                           the same, as the SDK evaluators call it
+- GET  /stats                              request counters as JSON
+
+Throttling can be injected per service: requests beyond --capacity
+concurrent ones, and a random --throttle-rate fraction of the rest, get a
+429 with a Retry-After header. A further --error-rate fraction fails with
+a 500.
+
+Latency is drawn per request from a distribution:
+    fixed:S  uniform:LO,HI  normal:MEAN,SD  lognormal:MEDIAN,SIGMA  exponential:MEAN
+(seconds; --latency sets both services, --agent-latency/--judge-latency one).
+
+Agent answers come from a canned JSON file mapping query to answer text
+(--responses), or are generated deterministically from the query. Judge
+verdicts are deterministic per task and response, passing (score >= 3) at
+--judge-pass-rate.
+
+Usage:
+    python stub_server.py [--port 8765] [--latency fixed:0.05] [--capacity 8] [--throttle-rate 0.0]
+        [--error-rate 0.0] [--responses canned.json] [--judge-pass-rate 1.0] [--seed N]
+
+Then run the eval suite against it:
+    pytest --async-engine --stub-url http://127.0.0.1:8765
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICES = ("agent", "judge")
+TASK_RE = re.compile(r"^### Task: (\S+)", re.MULTILINE)
+
+
+WORDS = (
+    "prompt context audience goal draft outline section example review constraint format tone "
+    "detail summary step result answer clarify assume verify structure question"
+).split()
+
+
+def latency_sampler(spec):
+    """
+    Build a function returning latencies (seconds) for a distribution spec.
+
+    A bare number means fixed:N.
+    """
+    if isinstance(spec, (int, float)):
+        spec = f"fixed:{spec}"
+    kind, _, params = str(spec).partition(":")
+    try:
+        values = [float(value) for value in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec {spec!r}")
+    shapes = {
+        "fixed": (1, lambda rng, s: s),
+        "uniform": (2, lambda rng, lo, hi: rng.uniform(lo, hi)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean)),
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Invalid latency spec {spec!r}; expected one of "
+                         "fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exponential:MEAN")
+    draw = shapes[kind][1]
+    return lambda rng: max(0.0, draw(rng, *values))
+
+
+def _digest(*parts):
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+
+
+def generated_answer(query, words=40):
+    """A deterministic answer of roughly `words` words for a query."""
+    digest = _digest(query)
+    picked = [WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(words)]
+    return f"Answer to {query}: " + " ".join(picked) + "."
+
+
+class StubConfig:
+    """
+    Behaviour of the stub server; shared by all handler threads.
+
+    Args:
+        latency: Distribution spec (or seconds) for both services.
+        capacity: Concurrent requests per service before 429s (0 = unlimited).
+        throttle_rate: Fraction of requests answered with 429.
+        retry_after: Retry-After seconds sent with 429s.
+        seed: Seed for latency, throttling and error draws.
+        error_rate: Fraction of requests answered with 500.
+        agent_latency, judge_latency: Per-service overrides of latency.
+        responses: Canned answers, query -> text.
+        response_words: Length of generated answers.
+        judge_pass_rate: Fraction of judge verdicts that pass.
+    """
+
+    def __init__(self, latency=0.05, capacity=0, throttle_rate=0.0, retry_after=1.0, seed=None,
+                 error_rate=0.0, agent_latency=None, judge_latency=None, responses=None,
+                 response_words=40, judge_pass_rate=1.0):
+        self.latency = {
+            "agent": latency_sampler(latency if agent_latency is None else agent_latency),
+            "judge": latency_sampler(latency if judge_latency is None else judge_latency),
+        }
+        self.capacity = capacity
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.responses = responses or {}
+        self.response_words = response_words
+        self.judge_pass_rate = judge_pass_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = {service: 0 for service in SERVICES}
+        self.stats = {service: {"requests": 0, "throttled": 0, "errors": 0, "peak_in_flight": 0}
+                      for service in SERVICES}
+        self.stats["connections"] = 0
+
+
+def agent_payload(body, config):
+    """A Responses API reply with the canned or generated answer for the query."""
+    query = body.get("input")
+    query = query if isinstance(query, str) else json.dumps(query, sort_keys=True)
+    text = config.responses.get(query) or generated_answer(query, config.response_words)
+    return {
+        "id": "resp_stub",
+        "object": "response",
+        "status": "completed",
+        "output_text": text,
+        "output": [{
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": {"input_tokens": len(query.split()), "output_tokens": len(text.split())},
+    }
+
+
+def _message_text(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _judge_score(name, prompt, config):
+    """A deterministic 1-5 score that passes (>= 3) at judge_pass_rate."""
+    draw = int.from_bytes(_digest(name, prompt)[:8], "big") / 2 ** 64
+    if draw < config.judge_pass_rate:
+        score = 3 + int(draw / config.judge_pass_rate * 3)
+    else:
+        score = 1 + int((draw - config.judge_pass_rate) / (1 - config.judge_pass_rate) * 2)
+    return min(score, 5)
+
+
+def _evaluator_verdict(prompt, json_reply, config):
+    """
+    A reply to an azure-ai-evaluation evaluator prompt.
+
+    JSON prompts get every score key the built-in evaluators read (score,
+    tool_calls_success_level, flagged); text prompts get the <S0>/<S1>/<S2>
+    tagged form the quality evaluators parse.
+    """
+    score = _judge_score("", prompt, config)
+    if json_reply:
+        return json.dumps({"score": score, "explanation": "Stub verdict.", "tool_calls_success_level": score,
+                           "chain_of_thought": "Stub verdict.", "flagged": score < 3, "reasoning": "Stub verdict."})
+    return f"<S0>Stub reasoning.</S0><S1>Stub verdict.</S1><S2>{score}</S2>"
+
+
+def judge_payload(body, config):
+    """
+    A chat completion with a deterministic verdict.
+
+    Merged prompts (eval_engine.py, evaluator_batch.py) get one verdict per
+    "### Task:" section; anything else is answered as an SDK evaluator prompt.
+    """
+    prompt = "\n".join(_message_text(message) for message in body.get("messages", []))
+    names = TASK_RE.findall(prompt)
+    if names:
+        content = json.dumps({name: {"result": _judge_score(name, prompt, config), "reason": "Stub verdict."}
+                              for name in names})
+    else:
+        json_reply = (body.get("response_format") or {}).get("type") == "json_object"
+        content = _evaluator_verdict(prompt, json_reply, config)
+    return {
+        "id": "chatcmpl_stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 12 * max(len(names), 1),
+                  "total_tokens": len(prompt.split()) + 12 * max(len(names), 1)},
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: StubConfig = None
+
+    def setup(self):
+        super().setup()
+        with self.config.lock:
+            self.config.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.config.lock:
+                self._send(200, self.config.stats)
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        path = self.path.partition("?")[0]  # The SDK evaluators send ?api-version=...
+        if path.startswith("/agent/") and path.endswith("/responses"):
+            service, build = "agent", agent_payload
+        elif path.startswith("/judge/") and path.endswith("/chat/completions"):
+            service, build = "judge", judge_payload
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        config = self.config
+        with config.lock:
+            stats = config.stats[service]
+            stats["requests"] += 1
+            over_capacity = config.capacity and config.in_flight[service] >= config.capacity
+            draw = config.random.random()
+            if over_capacity or draw < config.throttle_rate:
+                stats["throttled"] += 1
+                outcome = 429
+            elif draw < config.throttle_rate + config.error_rate:
+                stats["errors"] += 1
+                outcome = 500
+            else:
+                outcome = 200
+            config.in_flight[service] += outcome != 429
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], config.in_flight[service])
+            latency = config.latency[service](config.random)
+
+        if outcome == 429:
+            self._send(429, {"error": {"code": "429", "message": "Too Many Requests"}},
+                       {"Retry-After": f"{config.retry_after:g}"})
+            return
+        try:
+            time.sleep(latency)
+            if outcome == 500:
+                self._send(500, {"error": {"code": "InternalServerError", "message": "Injected failure"}})
+            else:
+                self._send(200, build(body, config))
+        finally:
+            with config.lock:
+                config.in_flight[service] -= 1
+
+
+class StubServer:
+    """
+    Run the stub in a background thread.
+
+    Example:
+        with StubServer(StubConfig(capacity=4)) as stub:
+            engine = build_engine(..., stub_url=stub.url)
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        handler = type("Handler", (StubHandler,), {"config": config or StubConfig()})
+        self.config = handler.config
+        server = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 256})
+        self.httpd = server((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Foundry agent and judge endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0.05", help="Latency distribution for both services")
+    parser.add_argument("--agent-latency", default=None, help="Latency distribution for the agent")
+    parser.add_argument("--judge-latency", default=None, help="Latency distribution for the judge")
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="Concurrent requests per service before answering 429 (0 = unlimited)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--responses", default=None, help="JSON file mapping query to canned answer text")
+    parser.add_argument("--response-words", type=int, default=40, help="Length of generated answers")
+    parser.add_argument("--judge-pass-rate", type=float, default=1.0, help="Fraction of judge verdicts that pass")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+    try:
+        config = StubConfig(args.latency, args.capacity, args.throttle_rate, args.retry_after, args.seed,
+                            error_rate=args.error_rate, agent_latency=args.agent_latency,
+                            judge_latency=args.judge_latency, responses=responses,
+                            response_words=args.response_words, judge_pass_rate=args.judge_pass_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    with StubServer(config, args.host, args.port) as stub:
+        print(f"Stub agent and judge listening on {stub.url} (Ctrl+C to stop)")
+        try:
+            stub.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ from pytest_agent_evals import (
     CustomCodeEvaluatorConfig
 )
 
+from evaluators import ForbiddenAssumptions, PlaceholderDensity, ResponseLength
+
 load_dotenv()
 
 # Configuration for the Evaluator (Judge)
@@ -38,6 +40,30 @@ class Test_Pitseleh:
     Test class for the Agent: Pitseleh.
     Each method represents a specific evaluation criteria (e.g., Relevance, Coherence).
     """
+    @evals.evaluator(CustomCodeEvaluatorConfig("response_length", grader=ResponseLength(min_words=20), threshold=1.0))
+    def test_response_length(self, evaluator_results: EvaluatorResults):
+        """
+        Tests that the agent's response is at least 20 words long.
+        Code evaluators from evaluators.py are deterministic and need no judge. They are not
+        gates here (gate=True would skip the LLM-judged tests below for rows that fail them).
+        """
+        assert evaluator_results.response_length.result == "pass"
+
+    @evals.evaluator(CustomCodeEvaluatorConfig("placeholder_density", grader=PlaceholderDensity(), threshold=1.0))
+    def test_placeholder_density(self, evaluator_results: EvaluatorResults):
+        """
+        Tests that the agent's response has no unfilled template placeholders (e.g. [NAME], {{topic}}, TODO).
+        """
+        assert evaluator_results.placeholder_density.result == "pass"
+
+    @evals.evaluator(CustomCodeEvaluatorConfig("forbidden_assumptions", grader=ForbiddenAssumptions(), threshold=1.0))
+    def test_forbidden_assumptions(self, evaluator_results: EvaluatorResults):
+        """
+        Tests that the agent's response makes none of the forbidden assumptions listed in
+        fixtures/prompt-enhancement-evals.json.
+        """
+        assert evaluator_results.forbidden_assumptions.result == "pass"
+
     @evals.evaluator(BuiltInEvaluatorConfig("intent_resolution"))
     def test_intent_resolution(self, evaluator_results: EvaluatorResults):
         """
@@ -0,0 +1,292 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Low-overhead timing spans for the Pitseleh eval harness.
+
+The harness marks its phases with span():
+
+    with tracing.span("agent", category="agent") as span:
+        response = await run_agent(...)
+        span.set(input_tokens=..., output_tokens=..., tool_calls=...)
+
+Tracing is off unless pytest runs with --trace-file or --trace-summary; then
+span() returns a shared no-op object, so instrumented code costs one
+attribute check per span.
+
+Spans belong to a dataset row. A span opened with row=... starts a row's
+lane and the spans nested in it (in the same task or thread, via a context
+variable) inherit the row. Spans without a row go to the session lane.
+
+Recorded spans are exported as Chrome trace JSON (open the file in
+https://ui.perfetto.dev or chrome://tracing; one lane per row) and
+summarized at the end of the session as per-phase latency histograms and
+token totals.
+"""
+
+import bisect
+import contextvars
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Span categories, in summary order; 'queue' is time a row waited for the harness
+CATEGORIES = ("agent", "judge", "evaluator", "queue", "harness")
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("pitseleh_span", default=None)
+
+
+class _NullSpan:
+    """What span() returns while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed phase; use as a context manager."""
+
+    __slots__ = ("tracer", "name", "category", "row", "args", "start", "parent", "child_ns", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, row: Any, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.row = row
+        self.args = args
+        self.child_ns = 0
+
+    def __enter__(self):
+        self.parent = _current.get()
+        if self.row is None and self.parent is not None:
+            self.row = self.parent.row
+        self._token = _current.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.parent is not None:
+            self.parent.child_ns += end - self.start
+        # Children running concurrently (tasks, threads) can add up to more than the span itself
+        self_ns = max(0, end - self.start - self.child_ns)
+        self.tracer.events.append((self.name, self.category, self.start, end, self_ns, self.row, self.args))
+        return False
+
+    def set(self, **args):
+        """Attach values (token counts, flags) to the span."""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Collects spans of one process.
+
+    Events are (name, category, start ns, end ns, self ns, row, args)
+    tuples with perf_counter timestamps, where self time excludes nested
+    spans; snapshot() turns them into wall-clock microseconds so traces
+    from several xdist workers line up.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[tuple] = []
+        self.epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def span(self, name: str, category: str = "harness", row: Any = None, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, row, args)
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, row: Any = None,
+               args: Optional[Dict[str, Any]] = None):
+        """Add a span measured elsewhere (perf_counter_ns timestamps)."""
+        if self.enabled:
+            self.events.append((name, category, start_ns, end_ns, end_ns - start_ns, row, args or {}))
+
+    def annotate(self, **values):
+        """Add numeric values to the innermost open span (e.g. retries inside an HTTP helper)."""
+        if not self.enabled:
+            return
+        span = _current.get()
+        if span is not None:
+            for key, value in values.items():
+                span.args[key] = span.args.get(key, 0) + value
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Events as plain dicts with wall-clock timestamps, for export or to send to the xdist controller."""
+        pid = os.getpid()
+        return [{"name": name, "cat": category, "ts": (start + self.epoch_offset_ns) // 1000,
+                 "dur": (end - start) // 1000, "self": self_ns // 1000, "pid": pid,
+                 "row": None if row is None else str(row), "args": args}
+                for name, category, start, end, self_ns, row, args in self.events]
+
+
+tracer = Tracer()
+span = tracer.span
+annotate = tracer.annotate
+
+
+def export_chrome(events: List[Dict[str, Any]], path: Path):
+    """Write snapshot() events as a Chrome trace, one thread lane per process and row."""
+    lanes: Dict[tuple, int] = {}
+    trace = []
+    for event in sorted(events, key=lambda e: e["ts"]):
+        lane = (event["pid"], event["row"])
+        if lane not in lanes:
+            lanes[lane] = len(lanes) + 1
+            trace.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": lanes[lane],
+                          "args": {"name": event["row"] or "session"}})
+        trace.append({"name": event["name"], "cat": event["cat"], "ph": "X", "ts": event["ts"],
+                      "dur": event["dur"], "pid": event["pid"], "tid": lanes[lane], "args": event["args"]})
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}), encoding="utf-8")
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+# Histogram bucket upper bounds in seconds: 1 ms doubling up to ~9 min
+BUCKETS = [0.001 * 2 ** i for i in range(20)]
+
+
+def summarize(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per span name: count, total, self and percentile seconds, token totals and a bucket histogram."""
+    phases: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        phase = phases.setdefault(event["name"], {"name": event["name"], "category": event["cat"],
+                                                  "durations": [], "self": 0.0,
+                                                  "tokens": dict.fromkeys(TOKEN_FIELDS, 0), "tool_calls": 0})
+        phase["durations"].append(event["dur"] / 1e6)
+        phase["self"] += event["self"] / 1e6
+        for field in TOKEN_FIELDS:
+            phase["tokens"][field] += event["args"].get(field) or 0
+        phase["tool_calls"] += event["args"].get("tool_calls") or 0
+
+    summary = []
+    for phase in phases.values():
+        ordered = sorted(phase.pop("durations"))
+        histogram = [0] * (len(BUCKETS) + 1)
+        for value in ordered:
+            histogram[bisect.bisect_left(BUCKETS, value)] += 1
+        summary.append({**phase, "count": len(ordered), "total": sum(ordered), "p50": percentile(ordered, 0.5),
+                        "p95": percentile(ordered, 0.95), "p99": percentile(ordered, 0.99), "max": ordered[-1],
+                        "histogram": histogram})
+    order = {category: index for index, category in enumerate(CATEGORIES)}
+    summary.sort(key=lambda phase: (order.get(phase["category"], len(order)), -phase["total"]))
+    return summary
+
+
+def _bucket_label(index: int) -> str:
+    bound = BUCKETS[index] if index < len(BUCKETS) else math.inf
+    if bound == math.inf:
+        return f">{BUCKETS[-1]:.0f}s"
+    return f"<{bound * 1000:.0f}ms" if bound < 1 else f"<{bound:.0f}s"
+
+
+def format_summary(summary: List[Dict[str, Any]], width: int = 40) -> List[str]:
+    """Terminal lines: a table of phases, time share per category, then a histogram per phase."""
+    lines = [f"{'phase':<22} {'category':<9} {'count':>6} {'total s':>9} {'p50':>8} {'p95':>8} {'p99':>8} "
+             f"{'max':>8} {'in tok':>9} {'out tok':>9} {'tools':>6}"]
+    for phase in summary:
+        lines.append(f"{phase['name']:<22} {phase['category']:<9} {phase['count']:>6} {phase['total']:>9.2f} "
+                     f"{phase['p50']:>8.3f} {phase['p95']:>8.3f} {phase['p99']:>8.3f} {phase['max']:>8.3f} "
+                     f"{phase['tokens']['input_tokens']:>9} {phase['tokens']['output_tokens']:>9} "
+                     f"{phase['tool_calls']:>6}")
+
+    # Self time, so a phase nested in another (an HTTP attempt in the agent call) is not counted twice
+    totals: Dict[str, float] = {}
+    for phase in summary:
+        totals[phase["category"]] = totals.get(phase["category"], 0.0) + phase["self"]
+    overall = sum(totals.values()) or 1.0
+    lines.append("")
+    lines.append("span time by category: " + ", ".join(f"{category} {total:.1f}s ({total / overall * 100:.0f}%)"
+                                                   for category, total in totals.items()))
+
+    for phase in summary:
+        histogram = phase["histogram"]
+        used = [index for index, count in enumerate(histogram) if count]
+        if not used:
+            continue
+        peak = max(histogram)
+        lines.append("")
+        lines.append(f"{phase['name']} ({phase['count']} spans)")
+        for index in range(used[0], used[-1] + 1):
+            bar = "#" * max(1 if histogram[index] else 0, round(histogram[index] / peak * width))
+            lines.append(f"  {_bucket_label(index):>8} {histogram[index]:>7} {bar}")
+    return lines
+
+
+# pytest session wiring; conftest.py calls these from its hooks
+
+
+def add_options(group):
+    group.addoption(
+        "--trace-file",
+        default=None,
+        help="Record timing spans and token counts per phase and row, and write them to this Chrome trace "
+             "JSON file (open it in https://ui.perfetto.dev). Implies --trace-summary.",
+    )
+    group.addoption(
+        "--trace-summary",
+        action="store_true",
+        help="Record timing spans and print per-phase latency histograms at the end of the session.",
+    )
+
+
+def configure(config):
+    """Start recording spans when --trace-file or --trace-summary is given."""
+    config._trace_events = []
+    if config.getoption("--trace-file") or config.getoption("--trace-summary"):
+        tracer.enable()
+
+
+def worker_output(config, output: Dict[str, Any]):
+    """Hand an xdist worker's spans to the controller."""
+    if tracer.enabled:
+        output["trace_events"] = tracer.snapshot()
+
+
+def merge_worker_output(config, output: Dict[str, Any]):
+    config._trace_events.extend(output.get("trace_events", ()))
+
+
+def finish(config):
+    """Add this process's spans to the session's and write --trace-file."""
+    if tracer.enabled:
+        config._trace_events.extend(tracer.snapshot())
+        if config.getoption("--trace-file"):
+            export_chrome(config._trace_events, config.getoption("--trace-file"))
+
+
+def summary_lines(config) -> List[str]:
+    """The 'Trace' section of the terminal summary."""
+    if not config._trace_events:
+        return []
+    lines = format_summary(summarize(config._trace_events))
+    if config.getoption("--trace-file"):
+        lines.append(f"trace written to {config.getoption('--trace-file')}")
+    return lines
@@ -0,0 +1,23 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Shared set-up for the unit tests: the skill-creator scripts on sys.path and a skill folder factory."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[3] / ".agents" / "skills" / "skill-creator" / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+
+@pytest.fixture
+def make_skill():
+    """Write a minimal valid skill folder: make_skill(root, name, description=..., body=...)."""
+    def make(root, name, description="Does a thing when asked.", body="# Skill\n"):
+        folder = Path(root) / name
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "SKILL.md").write_text(f"---\nname: {name}\ndescription: {description}\n---\n\n{body}",
+                                         encoding="utf-8")
+        return folder
+    return make
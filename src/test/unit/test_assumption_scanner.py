@@ -0,0 +1,66 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for assumption_scanner.py and ForbiddenAssumptions: phrase matching and per-case filtering."""
+
+from assumption_scanner import AssumptionScanner, PhraseAutomaton, default_scanner, normalize
+from evaluators import ForbiddenAssumptions
+
+CASES = [
+    {"id": "email", "forbiddenAssumptions": ["the user is a manager", "formal tone"]},
+    {"id": "code", "forbiddenAssumptions": ["Python", "formal  tone"]},
+    {"id": "empty", "forbiddenAssumptions": []},
+]
+
+
+def test_normalize_folds_case_and_whitespace():
+    assert normalize("  Formal\n\tTONE ") == "formal tone"
+
+
+def test_automaton_finds_overlapping_phrases():
+    automaton = PhraseAutomaton(["he", "she", "hers"])
+    text = normalize("ushers")
+
+    assert {automaton.phrases[index] for _, _, index in automaton.find(text)} == set()
+    assert {automaton.phrases[index] for _, _, index in automaton.find("she hers he")} == {"she", "hers", "he"}
+
+
+def test_matches_must_be_whole_words():
+    scanner = AssumptionScanner(CASES)
+
+    assert scanner.scan("Written in Pythonic style") == []
+    assert scanner.scan("Written in Python.") == [("code", "python")]
+
+
+def test_matching_ignores_case_and_whitespace_runs():
+    scanner = AssumptionScanner(CASES)
+
+    pairs = scanner.scan("Keep a FORMAL\n   tone, since The User is a   manager.")
+
+    assert sorted(pairs) == [("code", "formal tone"), ("email", "formal tone"), ("email", "the user is a manager")]
+
+
+def test_case_id_limits_the_report_to_that_case():
+    scanner = AssumptionScanner(CASES)
+
+    assert scanner.scan("formal tone in Python", case_id="code") == [("code", "formal tone"), ("code", "python")]
+    assert scanner.scan("formal tone in Python", case_id="empty") == []
+
+
+def test_bundled_fixture_loads():
+    scanner = default_scanner()
+
+    assert scanner is default_scanner()
+    assert scanner.case_phrases
+
+
+def test_forbidden_assumptions_checks_only_the_row_case():
+    evaluator = ForbiddenAssumptions(AssumptionScanner(CASES))
+    samples = [{"output_text": "Use a formal tone, as the user is a manager."}] * 4
+    items = [{"id": "email"}, {"id": "code"}, {"id": "not-a-fixture-case"}, {}]
+
+    assert evaluator.score_batch(samples, items).tolist() == [0.0, 0.0, 1.0, 1.0]
+    reasons = evaluator.explain_batch(samples, items, [0.0, 0.0, 1.0, 1.0])
+    assert reasons[0] == "Forbidden assumptions: email: 'the user is a manager', email: 'formal tone'"
+    assert reasons[1] == "Forbidden assumptions: code: 'formal tone'"
+    assert reasons[2:] == ["", ""]
+    assert evaluator(samples[0], {"id": "unknown"}) == 1.0
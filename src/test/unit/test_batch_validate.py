@@ -0,0 +1,103 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for batch_validate.py: JSON and JUnit reports, and the SKILL.md result cache."""
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import batch_validate
+from batch_validate import load_cache, validate_all
+
+
+@pytest.fixture
+def skills(tmp_path, make_skill):
+    """A root with two valid skills and one whose name breaks the rules."""
+    root = tmp_path / "skills"
+    make_skill(root, "alpha")
+    make_skill(root, "beta")
+    make_skill(root, "Gamma_Bad")
+    return root
+
+
+@pytest.fixture
+def checked(monkeypatch):
+    """Names of the skills batch_validate.py actually validated, in order."""
+    names = []
+    real_check_one = batch_validate._check_one
+
+    def check_one(skill_dir):
+        names.append(skill_dir.name)
+        return real_check_one(skill_dir)
+
+    monkeypatch.setattr(batch_validate, "_check_one", check_one)
+    return names
+
+
+def _main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["batch_validate.py", *map(str, args)])
+    with pytest.raises(SystemExit) as exit_info:
+        batch_validate.main()
+    return exit_info.value.code
+
+
+def test_json_report_lists_every_problem(tmp_path, skills, monkeypatch, capsys):
+    code = _main(monkeypatch, skills, "--jobs", "1", "--cache", tmp_path / "cache.json")
+
+    report = json.loads(capsys.readouterr().out)
+    assert code == 1
+    assert report["counts"] == {"total": 3, "valid": 2, "invalid": 1, "cached": 0}
+    records = {record["skill"]: record for record in report["skills"]}
+    assert records["alpha"]["valid"] and records["alpha"]["problems"] == []
+    assert not records["Gamma_Bad"]["valid"] and "Gamma_Bad" in records["Gamma_Bad"]["problems"][0]
+
+
+def test_junit_report_has_one_case_per_skill(tmp_path, skills, monkeypatch, capsys):
+    output = tmp_path / "skills.xml"
+    code = _main(monkeypatch, skills, "-j", "1", "--format", "junit", "--output", output,
+                 "--cache", tmp_path / "cache.json")
+
+    assert code == 1 and "2/3 skills valid (0 from cache)" in capsys.readouterr().out
+    suite = ET.parse(output).getroot()
+    assert suite.tag == "testsuite" and suite.get("tests") == "3" and suite.get("failures") == "1"
+    cases = {case.get("name"): case for case in suite.iter("testcase")}
+    assert set(cases) == {"alpha", "beta", "Gamma_Bad"}
+    assert cases["alpha"].find("failure") is None
+    failure = cases["Gamma_Bad"].find("failure")
+    assert failure.get("message") == failure.text.split("\n")[0]
+
+
+def test_unchanged_skills_come_from_the_cache(tmp_path, skills, checked):
+    cache_path = tmp_path / "cache.json"
+    first = validate_all(skills, jobs=1, cache_path=cache_path)
+    assert sorted(checked) == ["Gamma_Bad", "alpha", "beta"] and first["counts"]["cached"] == 0
+
+    checked.clear()
+    second = validate_all(skills, jobs=1, cache_path=cache_path)
+
+    assert checked == [] and second["counts"]["cached"] == 3
+    assert [record["problems"] for record in second["skills"]] == [record["problems"] for record in first["skills"]]
+
+    checked.clear()
+    validate_all(skills, jobs=1, cache_path=cache_path, use_cache=False)
+    assert sorted(checked) == ["Gamma_Bad", "alpha", "beta"]
+
+
+def test_cache_keeps_only_results_used_by_the_latest_run(tmp_path, skills, make_skill, checked):
+    cache_path = tmp_path / "cache.json"
+    validate_all(skills, jobs=1, cache_path=cache_path)
+    before = set(load_cache(cache_path))
+
+    make_skill(skills, "alpha", description="Does another thing.")
+    checked.clear()
+    validate_all(skills, jobs=1, cache_path=cache_path)
+
+    after = set(load_cache(cache_path))
+    assert checked == ["alpha"]
+    assert len(before) == len(after) == 3 and len(before & after) == 2  # the old alpha result is gone
+
+    mtime = cache_path.stat().st_mtime_ns
+    validate_all(skills, jobs=1, cache_path=cache_path)
+    assert cache_path.stat().st_mtime_ns == mtime  # all hits, nothing to write
@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for dataset_loader.py: indexing, selection and reading rows by offset."""
+
+import gzip
+import json
+
+import pytest
+
+import dataset_loader
+from dataset_loader import load_case, load_index, parse_ids, parse_shard, select, shard_of
+
+
+def _write(path, rows, opener=open):
+    with opener(path, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write(row if isinstance(row, str) else json.dumps(row))
+            f.write("\n")
+    return path
+
+
+@pytest.fixture
+def rows():
+    return [{"id": f"r{i}", "query": f"question {i}"} for i in range(20)]
+
+
+def test_index_skips_blank_and_invalid_lines(tmp_path, rows):
+    path = _write(tmp_path / "data.jsonl", [rows[0], "", "{not json", rows[1]])
+
+    index = load_index(path)
+
+    assert index.ids == ["r0", "r1"]
+
+
+def test_pointers_read_back_their_rows(tmp_path, rows):
+    path = _write(tmp_path / "data.jsonl", rows)
+    index = load_index(path)
+
+    cases = [load_case(pointer) for pointer in index.pointers([3, 0, 19])]
+
+    assert [case["query"] for case in cases] == ["question 3", "question 0", "question 19"]
+    assert cases[0]["_dataset"] == str(path.resolve())
+
+
+def test_index_is_cached_and_rebuilt_when_the_file_changes(tmp_path, rows):
+    path = _write(tmp_path / "data.jsonl", rows)
+    cache = tmp_path / "cache"
+    load_index(path, cache)
+    assert list(cache.glob("*.index.json"))
+
+    dataset_loader._indexes.clear()
+    assert len(load_index(path, cache)) == 20
+
+    _write(path, rows[:5])
+    assert len(load_index(path, cache)) == 5
+
+
+def test_changed_rows_are_detected(tmp_path, rows):
+    path = _write(tmp_path / "data.jsonl", rows)
+    pointer = load_index(path).pointers([1])[0]
+    _write(path, rows[2:])
+    dataset_loader._handles.clear()
+
+    with pytest.raises(ValueError, match="Dataset Mismatch"):
+        load_case(pointer)
+
+
+def test_gzip_datasets_are_decompressed_once(tmp_path, rows):
+    path = _write(tmp_path / "data.jsonl.gz", rows, opener=gzip.open)
+
+    index = load_index(path, tmp_path / "cache")
+
+    assert index.data_path.parent == tmp_path / "cache"
+    assert load_case(index.pointers([5])[0])["id"] == "r5"
+
+
+def test_shards_partition_the_rows(tmp_path, rows):
+    index = load_index(_write(tmp_path / "data.jsonl", rows))
+
+    shards = [select(index, shard=(k, 3)) for k in (1, 2, 3)]
+
+    assert sorted(p for shard in shards for p in shard) == list(range(20))
+    assert all(shard_of(index.ids[p], 3) == 1 for p in shards[0])
+
+
+def test_selection_by_ids_and_reproducible_sample(tmp_path, rows):
+    index = load_index(_write(tmp_path / "data.jsonl", rows))
+
+    assert select(index, ids={"r2", "r7", "missing"}) == [2, 7]
+    sample = select(index, sample=5, seed=3)
+    assert sample == sorted(sample) and len(sample) == 5
+    assert sample == select(index, sample=5, seed=3)
+
+
+def test_parse_shard_and_ids(tmp_path):
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard(None) is None
+    for value in ("0/4", "5/4", "x"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("a\n\nb\n", encoding="utf-8")
+    assert parse_ids("a, b,") == {"a", "b"}
+    assert parse_ids(f"@{ids_file}") == {"a", "b"}
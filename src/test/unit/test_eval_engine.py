@@ -0,0 +1,205 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for eval_engine.py: the adaptive limiter, Retry-After parsing, Endpoint.post retries and Engine.run."""
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+import eval_engine
+from eval_engine import MAX_ATTEMPTS, AdaptiveLimiter, Endpoint, StaticAuth, retry_after_seconds
+
+
+def _release_many(limiter, latencies, **kwargs):
+    async def run():
+        for latency in latencies:
+            await limiter.acquire()
+            await limiter.release(latency=latency, **kwargs)
+    asyncio.run(run())
+
+
+def test_limiter_grows_about_one_slot_per_round_of_fast_responses():
+    limiter = AdaptiveLimiter("agent", initial=4, maximum=64)
+    _release_many(limiter, [0.1] * 4)
+    assert 4.9 < limiter.limit < 5.0
+    _release_many(limiter, [0.1] * 3000)
+    assert limiter.limit == 64 and limiter.stats["decreases"] == 0
+
+
+def test_limiter_halves_once_per_burst_of_throttling():
+    limiter = AdaptiveLimiter("agent", initial=16, minimum=2)
+
+    async def throttle(count):
+        for _ in range(count):
+            await limiter.acquire()
+            await limiter.release(throttled=True)
+
+    asyncio.run(throttle(5))
+    assert limiter.limit == 8
+    assert limiter.stats["throttled"] == 5 and limiter.stats["decreases"] == 1
+    for _ in range(5):
+        limiter._last_decrease = -1e9  # a new latency window each time
+        asyncio.run(throttle(1))
+    assert limiter.limit == 2
+
+
+def test_limiter_ignores_one_slow_response_but_not_a_sustained_rise():
+    limiter = AdaptiveLimiter("judge", initial=8, slow_window=8)
+    _release_many(limiter, [0.1] * 20 + [5.0])
+    assert limiter.stats["slow"] == 1 and limiter.stats["decreases"] == 0
+
+    _release_many(limiter, [5.0] * 8)
+    assert limiter.stats["decreases"] == 1 and limiter.limit < 8
+
+
+def test_limiter_errors_do_not_change_the_limit():
+    limiter = AdaptiveLimiter("agent", initial=4)
+
+    async def fail():
+        await limiter.acquire()
+        await limiter.release(error=True)
+
+    asyncio.run(fail())
+    assert limiter.limit == 4 and limiter.stats["errors"] == 1
+
+
+def test_limiter_caps_requests_in_flight():
+    limiter = AdaptiveLimiter("agent", initial=2, maximum=2)
+
+    async def request():
+        await limiter.acquire()
+        await asyncio.sleep(0.01)
+        await limiter.release(latency=0.01)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(10)))
+
+    asyncio.run(run())
+    assert limiter.stats["peak_in_flight"] == 2 and limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None), ("", None), ("5", 5.0), ("0.5", 0.5), ("-3", 0.0), ("soon", None),
+    (email.utils.formatdate(0, usegmt=True), 0.0),
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_seconds_reads_http_dates():
+    assert 55 < retry_after_seconds(email.utils.formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays Endpoint.post asked for, without waiting."""
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(eval_engine.asyncio, "sleep", sleep)
+    monkeypatch.setattr(eval_engine.random, "uniform", lambda low, high: high)
+    return delays
+
+
+def _post(replies):
+    """Endpoint.post against a transport answering with replies in turn: (result or error, requests, limiter)."""
+    calls = []
+
+    def handler(request):
+        reply = replies[min(len(calls), len(replies) - 1)]
+        calls.append(request)
+        if isinstance(reply, Exception):
+            raise reply
+        status, headers = reply
+        return httpx.Response(status, headers=headers, json={"ok": True, "attempt": len(calls)})
+
+    async def run():
+        endpoint = Endpoint("https://service/v1/", StaticAuth({"api-key": "k"}), AdaptiveLimiter("judge"))
+        await endpoint.client.aclose()
+        endpoint.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await endpoint.post("/chat", {}), endpoint.limiter
+        except RuntimeError as e:
+            return e, endpoint.limiter
+        finally:
+            await endpoint.close()
+
+    result, limiter = asyncio.run(run())
+    return result, calls, limiter
+
+
+def test_post_waits_out_retry_after_instead_of_backing_off(sleeps):
+    result, calls, limiter = _post([(429, {"retry-after": "0"}), (200, {})])
+
+    assert result == {"ok": True, "attempt": 2}
+    assert sleeps == [] and limiter.stats["throttled"] == 1
+    assert str(calls[0].url) == "https://service/v1/chat" and calls[0].headers["api-key"] == "k"
+
+
+def test_post_backs_off_exponentially_on_transient_failures(sleeps):
+    result, calls, limiter = _post([(500, {}), (502, {}), httpx.ConnectError("reset"), (200, {})])
+
+    assert result == {"ok": True, "attempt": 4}
+    assert sleeps == [1, 2, 4]
+    assert limiter.stats["errors"] == 3 and limiter.stats["throttled"] == 0 and limiter.in_flight == 0
+
+
+def test_post_gives_up_after_max_attempts(sleeps):
+    error, calls, _ = _post([(503, {})])
+
+    assert isinstance(error, RuntimeError) and "Giving up" in str(error)
+    assert len(calls) == MAX_ATTEMPTS and sleeps == [min(2 ** attempt, 30) for attempt in range(MAX_ATTEMPTS)]
+
+
+def test_post_does_not_retry_client_errors(sleeps):
+    error, calls, limiter = _post([(400, {}), (200, {})])
+
+    assert isinstance(error, RuntimeError) and "HTTP 400" in str(error)
+    assert len(calls) == 1 and sleeps == [] and limiter.in_flight == 0
+
+
+def _spec(name, kind, threshold, **kwargs):
+    return {"name": name, "kind": kind, "threshold": threshold, "kwargs": kwargs}
+
+
+def test_engine_runs_rows_against_the_stub_server():
+    from evaluators import ResponseLength
+    from stub_server import StubConfig, StubServer
+
+    specs = [_spec("length", "code", 1.0, grader=ResponseLength(min_words=10, gate=True)),
+             _spec("clarity", "prompt", 3, prompt="Rate {{response}} for {{query}}."),
+             _spec("tone", "prompt", 3, prompt="Rate the tone of {{response}}.")]
+    jobs = [{"key": f"row{i}", "case": {"id": f"c{i}", "query": f"question {i}"},
+             "agent": {"name": "Pitseleh", "project_endpoint": "https://project"},
+             "judge_model": "gpt", "specs": specs} for i in range(12)]
+    config = StubConfig(latency=0.0, throttle_rate=0.3, retry_after=0, seed=0, responses={"question 0": "Too short."})
+
+    async def run(url):
+        engine = eval_engine.build_engine("https://project", {"model": "gpt"}, 4, 4, stub_url=url)
+        try:
+            return await engine.run(jobs), engine.stats()
+        finally:
+            await engine.close()
+
+    with StubServer(config) as stub:
+        rows, stats = asyncio.run(run(stub.url))
+
+    assert sorted(rows) == sorted(job["key"] for job in jobs)
+    assert all(row["error"] is None and set(row["evaluators"]) == {"length", "clarity", "tone"}
+               for row in rows.values())
+    # The short answer fails its gate, so its judge evaluators are skipped
+    assert rows["row0"]["evaluators"]["length"]["result"] == "fail"
+    assert {rows["row0"]["evaluators"][name]["result"] for name in ("clarity", "tone")} == {"skipped"}
+    assert all(row["evaluators"][name]["result"] == "pass"
+               for key, row in rows.items() if key != "row0" for name in ("clarity", "tone"))
+    # One agent request per row and one merged judge request per judged row, plus retried 429s
+    requests = {service: config.stats[service]["requests"] - config.stats[service]["throttled"]
+                for service in ("agent", "judge")}
+    assert requests == {"agent": 12, "judge": 11}
+    assert config.stats["agent"]["throttled"] + config.stats["judge"]["throttled"] > 0
+    assert stats["agent"]["throttled"] == config.stats["agent"]["throttled"]
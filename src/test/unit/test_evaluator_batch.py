@@ -0,0 +1,150 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Parity of evaluator_batch.run_evaluators with the plugin's own evaluator_results fixture on fixed inputs."""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+from agent_framework import Content, Message
+from pytest_agent_evals import AgentResponse, plugin
+
+import evaluator_batch
+from evaluator_batch import evaluator_spec, run_evaluators
+
+CASE = {"id": "c1", "query": "Draft a prompt for a weekly status email.", "ground_truth": "A short prompt.",
+        "context": "Team of five.", "_dataset": "prompts", "_test_id": 0}
+RESPONSE = AgentResponse(
+    type="chat_agent", output_text="Write a short, friendly status email.", tool_calls=[], tool_definitions=[],
+    output_items=[Message(role="assistant", contents=[Content(type="text", text="Write a short, friendly status email.")])],
+    instructions="You write prompts.",
+)
+JUDGE = {"type": "openai", "model": "gpt", "base_url": "http://judge", "api_key": "k"}
+
+# Raw outputs of the fake built-in evaluators: an explicit result, the plugin's
+# falsy-score quirk on an evaluator that takes the message history, and gpt_ keys
+RAW = {
+    "relevance": {"relevance": 4.0, "relevance_reason": "On topic.", "relevance_result": "fail",
+                  "relevance_threshold": 3},
+    "task_adherence": {"task_adherence": 0, "task_adherence_reason": "Ignored the task."},
+    "coherence": {"gpt_coherence": 2, "gpt_coherence_reason": "Rambles.", "coherence_threshold": 3},
+}
+
+
+def _builtin_class(name, calls):
+    class Builtin:
+        def __init__(self, model_config, threshold=3):
+            self.threshold = threshold
+
+        def __call__(self, **kwargs):
+            calls.append((name, self.threshold, kwargs))
+            return dict(RAW[name])
+    return Builtin
+
+
+class FakeJudge:
+    """A chat client answering each prompt (or each "### Task:" of a merged one) with the score=... it contains."""
+
+    def __init__(self, prompts):
+        self.prompts = prompts
+
+    async def get_response(self, messages):
+        prompt = messages[0].contents[0].text
+        tasks = re.split(r"^### Task: (\S+)\n\n", prompt, flags=re.M)
+        if len(tasks) > 1:
+            sections = dict(zip(tasks[1::2], tasks[2::2]))
+            self.prompts.update(sections)
+            reply = {name: self._verdict(text) for name, text in sections.items()}
+        else:
+            self.prompts[prompt] = prompt
+            reply = self._verdict(prompt)
+        return SimpleNamespace(messages=[SimpleNamespace(text=f"```json\n{json.dumps(reply)}\n```")])
+
+    @staticmethod
+    def _verdict(text):
+        return {"result": json.loads(re.search(r"score=(\S+)", text).group(1)), "reason": "Judged."}
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    """Fake built-in evaluators and judge client; returns (built-in calls, prompts the judge saw)."""
+    calls, prompts = [], {}
+    monkeypatch.setattr(plugin, "_get_evaluator_registry", lambda: {name: _builtin_class(name, calls) for name in RAW})
+    monkeypatch.setattr(evaluator_batch, "_builtin_instances", {})
+
+    def init(self, prompt_text, model_config, credential=None, is_file=False):
+        self.prompt_text, self.model_config, self.is_file = prompt_text, model_config, is_file
+        self.client = FakeJudge(prompts)
+
+    monkeypatch.setattr(plugin.PromptEvaluator, "__init__", init)
+    return calls, prompts
+
+
+def _plugin_results(marks, test_dir):
+    recorded = {}
+    request = SimpleNamespace(node=SimpleNamespace(iter_markers=lambda name: iter(marks),
+                                                   fspath=str(test_dir / "test_parity.py")),
+                              getfixturevalue=lambda name: None)
+    fixture = plugin.evaluator_results.__wrapped__
+    asyncio.run(fixture(request, RESPONSE, dict(CASE), JUDGE, lambda key, value: recorded.setdefault(key, value)))
+    return recorded["evaluators"]
+
+
+def _batch_results(marks, test_dir):
+    specs = [evaluator_spec(mark) for mark in marks]
+    return asyncio.run(run_evaluators(specs, dict(CASE), RESPONSE, JUDGE, credential=lambda: None,
+                                      test_dir=test_dir))
+
+
+def _marks():
+    def failing(sample, item):
+        raise ValueError("boom")
+
+    evaluator = pytest.mark.evaluator
+    return [
+        evaluator("relevance", threshold=3).mark,
+        evaluator("task_adherence", threshold=3).mark,
+        evaluator("coherence").mark,
+        evaluator("words", grader=lambda sample, item: len(sample["output_text"].split()) / 10, threshold=0.5).mark,
+        evaluator("has_query", grader=lambda sample, item: bool(item["query"]), threshold=True).mark,
+        evaluator("failing", grader=failing, threshold=0.5).mark,
+        evaluator("clarity", prompt="Rate {{response}} for {{query}}. score=4", threshold=3).mark,
+        evaluator("grounded", prompt="Grounded in {{ground_truth}} and {{context}}? score=\"true\"",
+                  threshold=True).mark,
+        evaluator("tone", prompt="judge.prompty", threshold=3).mark,
+    ]
+
+
+@pytest.mark.parametrize("names", [
+    None,
+    ["clarity", "words"],
+], ids=["all", "one-prompt"])
+def test_results_match_the_plugin(tmp_path, fakes, names):
+    calls, prompts = fakes
+    (tmp_path / "judge.prompty").write_text("Tone of {{response}} given {{tool_calls}}? score=2", encoding="utf-8")
+    marks = [mark for mark in _marks() if names is None or mark.args[0] in names]
+
+    expected = _plugin_results(marks, tmp_path)
+    plugin_calls, plugin_prompts = list(calls), set(prompts.values())
+    calls.clear()
+    prompts.clear()
+    actual = _batch_results(marks, tmp_path)
+
+    assert actual == expected
+    assert sorted(calls, key=lambda call: call[0]) == sorted(plugin_calls, key=lambda call: call[0])
+    # A merged request holds exactly the prompts the plugin sends one by one
+    assert {prompt.strip() for prompt in prompts.values()} == {prompt.strip() for prompt in plugin_prompts}
+
+
+def test_parity_covers_the_plugin_quirks(tmp_path, fakes):
+    (tmp_path / "judge.prompty").write_text("score=2", encoding="utf-8")
+
+    results = _batch_results(_marks(), tmp_path)
+
+    assert results["relevance"]["result"] == "fail"  # the explicit result wins over the threshold
+    assert results["task_adherence"]["score"] == -1  # a score of 0 reads as missing
+    assert results["coherence"]["score"] == 2 and results["coherence"]["threshold"] == 3
+    assert results["failing"]["score"] == 0.0 and "boom" in results["failing"]["reason"]
+    assert results["grounded"]["score"] is True and results["tone"]["result"] == "fail"
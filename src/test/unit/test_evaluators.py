@@ -0,0 +1,90 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for evaluators.py: scores of each code evaluator, batch/single-row agreement and gating."""
+
+import numpy as np
+import pytest
+
+from evaluator_batch import is_gate
+from evaluators import (LengthRatio, PlaceholderDensity, ResponseLength, SectionCoverage, StructureRatio,
+                        ToolCallCount)
+
+
+def _sample(text="", tool_calls=()):
+    return {"output_text": text, "tool_calls": list(tool_calls)}
+
+
+def _words(count):
+    return " ".join(["word"] * count)
+
+
+def test_response_length_scores_the_ratio_to_the_nearest_bound():
+    evaluator = ResponseLength(min_words=10, max_words=20)
+    samples = [_sample(_words(5)), _sample(_words(15)), _sample(_words(40)), _sample("")]
+
+    assert evaluator.score_batch(samples, [{}] * 4).tolist() == [0.5, 1.0, 0.5, 0.0]
+
+
+def test_length_ratio_compares_against_the_query():
+    evaluator = LengthRatio(min_ratio=2.0, max_ratio=10.0)
+    items = [{"query": _words(10)}, {"query": _words(10)}, {"query": None}]
+    samples = [_sample(_words(10)), _sample(_words(30)), _sample(_words(4))]
+
+    assert evaluator.score_batch(samples, items).tolist() == [0.5, 1.0, 1.0]
+
+
+def test_structure_ratio_counts_headings_lists_quotes_and_tables():
+    text = "# Title\nplain line\n- item\n1. step\n> quote\n| a | b |\nplain\n\n"
+    evaluator = StructureRatio(min_ratio=0.5)
+
+    assert evaluator.score_batch([_sample(text), _sample("just prose")], [{}, {}]).tolist() == \
+        pytest.approx([1.0, 0.0])
+    assert StructureRatio(min_ratio=1.0)(_sample(text), {}) == pytest.approx(5 / 7)
+
+
+@pytest.mark.parametrize("text, score", [
+    (_words(100), 1.0),
+    (_words(99) + " [NAME]", 0.5),
+    ("Dear {{name}}, TODO: lorem ipsum <COMPANY>", 1 / (1 + 4 / 6 * 100)),
+    ("", 1.0),
+])
+def test_placeholder_density(text, score):
+    assert PlaceholderDensity()(_sample(text), {}) == pytest.approx(score)
+
+
+def test_section_coverage_adds_row_specific_sections():
+    evaluator = SectionCoverage(sections=["Goal", "Constraints"])
+    samples = [_sample("Goal: x. Constraints: y. Examples: z."), _sample("goal only"), _sample("anything")]
+    items = [{"required_sections": ["examples", "goal"]}, {}, {"required_sections": []}]
+
+    assert evaluator.score_batch(samples, items).tolist() == [1.0, 0.5, 0.0]
+    assert SectionCoverage()(_sample("anything"), {}) == 1.0
+
+
+def test_tool_call_count_bounds():
+    evaluator = ToolCallCount(min_calls=1, max_calls=2)
+    samples = [_sample(), _sample(tool_calls=[{}]), _sample(tool_calls=[{}] * 3)]
+
+    assert evaluator.score_batch(samples, [{}] * 3).tolist() == [0.0, 1.0, 0.0]
+
+
+@pytest.mark.parametrize("evaluator", [
+    ResponseLength(min_words=3, max_words=8), LengthRatio(), StructureRatio(), PlaceholderDensity(),
+    SectionCoverage(sections=["goal"]), ToolCallCount(max_calls=1),
+])
+def test_single_row_calls_match_the_batch(evaluator):
+    samples = [_sample("# Goal\n- TODO " + _words(i), tool_calls=[{}] * (i % 3)) for i in range(6)]
+    items = [{"query": _words(i % 4)} for i in range(6)]
+
+    batch = evaluator.score_batch(samples, items)
+    assert isinstance(batch, np.ndarray) and batch.shape == (6,)
+    assert [evaluator(sample, item) for sample, item in zip(samples, items)] == pytest.approx(batch.tolist())
+    assert ((batch >= 0) & (batch <= 1)).all()
+
+
+def test_gating_is_opt_in():
+    def spec(grader):
+        return {"kind": "code", "kwargs": {"grader": grader}}
+
+    assert not ResponseLength().gate and not is_gate(spec(PlaceholderDensity()))
+    assert is_gate(spec(PlaceholderDensity(gate=True)))
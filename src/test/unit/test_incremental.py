@@ -0,0 +1,103 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for incremental.py: pair fingerprint stability and the reuse split."""
+
+import incremental
+
+JUDGE = {"endpoint": "https://judge.openai.azure.com", "model": "gpt-4o", "api_key": "secret"}
+AGENT = [{"name": "Pitseleh", "project_endpoint": "https://p", "version": None}, None]
+
+
+def _length(sample, case):
+    return 1.0
+
+
+def _length_v2(sample, case):
+    return 0.5
+
+
+def _gate(sample, case):
+    return 1.0
+
+
+_gate.gate = True
+
+
+def _spec(name, kind, threshold=0.5, **kwargs):
+    return {"name": name, "kind": kind, "threshold": threshold, "kwargs": {"name": name, "threshold": threshold,
+                                                                           **kwargs}}
+
+
+def _fingerprints(tmp_path, specs, row=None, judge=JUDGE, engine=False):
+    row = row or incremental.row_fingerprint("data.jsonl", "r1", {"id": "r1", "query": "q"})
+    return incremental.pair_fingerprints(row, AGENT, judge, specs, tmp_path, engine=engine)
+
+
+def test_fingerprints_are_stable_across_calls_and_spec_instances(tmp_path):
+    first = _fingerprints(tmp_path, [_spec("length", "code", grader=_length), _spec("relevance", "builtin")])
+    second = _fingerprints(tmp_path, [_spec("length", "code", grader=_length), _spec("relevance", "builtin")])
+    assert first == second
+    assert set(first) == {"length", "relevance"}
+
+
+def test_row_fingerprint_ignores_loader_fields_and_key_order():
+    plain = incremental.row_fingerprint("data.jsonl", "r1", {"id": "r1", "query": "q"})
+    loaded = incremental.row_fingerprint("data.jsonl", "r1", {"query": "q", "id": "r1", "_offset": 42})
+    assert plain == loaded
+    assert plain != incremental.row_fingerprint("data.jsonl", "r1", {"id": "r1", "query": "other"})
+
+
+def test_grader_threshold_and_judge_changes_change_the_fingerprint(tmp_path):
+    base = _fingerprints(tmp_path, [_spec("length", "code", grader=_length), _spec("relevance", "builtin")])
+
+    regraded = _fingerprints(tmp_path, [_spec("length", "code", grader=_length_v2)])
+    assert regraded["length"] != base["length"]
+
+    rethresholded = _fingerprints(tmp_path, [_spec("relevance", "builtin", threshold=0.7)])
+    assert rethresholded["relevance"] != base["relevance"]
+
+    rejudged = _fingerprints(tmp_path, [_spec("length", "code", grader=_length), _spec("relevance", "builtin")],
+                             judge={**JUDGE, "model": "gpt-4.1"})
+    assert rejudged["relevance"] != base["relevance"]
+    assert rejudged["length"] == base["length"]
+
+
+def test_judge_api_key_is_not_part_of_the_fingerprint(tmp_path):
+    specs = [_spec("relevance", "builtin")]
+    assert _fingerprints(tmp_path, specs) == _fingerprints(tmp_path, specs, judge={**JUDGE, "api_key": "rotated"})
+
+
+def test_prompt_text_and_scoring_path_change_the_fingerprint(tmp_path):
+    prompt = tmp_path / "tone.prompty"
+    prompt.write_text("Rate the tone.", encoding="utf-8")
+    plugin = _fingerprints(tmp_path, [_spec("tone", "prompt", prompt="tone.prompty")])
+    engine = _fingerprints(tmp_path, [_spec("tone", "prompt", prompt="tone.prompty")], engine=True)
+    assert plugin != engine
+
+    prompt.write_text("Rate the tone strictly.", encoding="utf-8")
+    assert _fingerprints(tmp_path, [_spec("tone", "prompt", prompt="tone.prompty")]) != plugin
+
+
+def test_builtins_share_fingerprints_across_scoring_paths(tmp_path):
+    specs = [_spec("relevance", "builtin")]
+    assert _fingerprints(tmp_path, specs) == _fingerprints(tmp_path, specs, engine=True)
+
+
+def test_split_reruns_gates_with_judged_evaluators():
+    gate, judge = _spec("gate", "code", grader=_gate), _spec("relevance", "builtin")
+    stored = {"gate": {"result": "pass", "score": 1.0}}
+
+    to_run, reused = incremental.split([gate, judge], stored)
+
+    assert [spec["name"] for spec in to_run] == ["relevance", "gate"]
+    assert reused == {}
+
+
+def test_split_reuses_everything_stored():
+    gate, judge = _spec("gate", "code", grader=_gate), _spec("relevance", "builtin")
+    stored = {"gate": {"result": "pass"}, "relevance": {"result": "fail"}}
+
+    to_run, reused = incremental.split([gate, judge], stored)
+
+    assert to_run == []
+    assert reused == stored
@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for init_skill.py: creating many skills at once, all or nothing."""
+
+import os
+
+import pytest
+
+import init_skill
+from init_skill import RESOURCE_TYPES, init_skills
+
+
+def _specs(tmp_path, names=("alpha", "beta", "gamma", "delta")):
+    """Specs spread over two destination folders, so there are two staging directories."""
+    return [{"name": name, "skill_dir": tmp_path / ("team" if i % 2 else "skills") / name,
+             "resources": RESOURCE_TYPES, "description": f"Helps with {name}."} for i, name in enumerate(names)]
+
+
+def _leftovers(tmp_path):
+    """Everything under tmp_path apart from the (empty) destination folders."""
+    return sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*")
+                  if path.name not in ("skills", "team"))
+
+
+def test_init_skills_creates_every_skill(tmp_path, capsys):
+    specs = _specs(tmp_path)
+
+    created = init_skills(specs, jobs=2)
+
+    assert created == [spec["skill_dir"] for spec in specs]
+    for skill_dir in created:
+        assert (skill_dir / "SKILL.md").is_file() and os.access(skill_dir / "scripts" / "example.py", os.X_OK)
+    assert not list(tmp_path.glob("*/.init-skill-*"))
+    assert "Initialized 4 skills (16 files)" in capsys.readouterr().out
+
+
+def test_invalid_spec_stops_the_run_before_anything_is_written(tmp_path, capsys):
+    specs = _specs(tmp_path, names=("alpha", "Bad_Name", "gamma"))
+
+    assert init_skills(specs) is None
+
+    assert "Nothing was created" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failure_while_staging_leaves_nothing_behind(tmp_path, monkeypatch, capsys):
+    write_rendered = init_skill.write_rendered
+
+    def failing_write(skill_dir, files):
+        write_rendered(skill_dir, files)
+        if skill_dir.name == "gamma":
+            raise OSError("disk full")
+
+    monkeypatch.setattr(init_skill, "write_rendered", failing_write)
+
+    assert init_skills(_specs(tmp_path), jobs=4) is None
+
+    assert "Nothing was created: disk full" in capsys.readouterr().out
+    assert _leftovers(tmp_path) == []
+
+
+@pytest.mark.parametrize("failing", ["alpha", "gamma", "delta"])
+def test_failure_while_renaming_rolls_back_the_skills_already_moved(tmp_path, monkeypatch, capsys, failing):
+    specs = _specs(tmp_path)
+    rename = os.rename
+    renamed = []
+
+    def failing_rename(src, dst):
+        if os.path.basename(dst) == failing:
+            raise OSError(f"cannot rename {failing}")
+        rename(src, dst)
+        renamed.append(os.path.basename(dst))
+
+    monkeypatch.setattr(os, "rename", failing_rename)
+
+    assert init_skills(specs) is None
+
+    names = [spec["name"] for spec in specs]
+    moved = names[:names.index(failing)]
+    assert renamed == moved + moved[::-1]  # each moved skill went back to staging, last first
+    assert f"Nothing was created: cannot rename {failing}" in capsys.readouterr().out
+    assert _leftovers(tmp_path) == []
+
+
+def test_a_directory_appearing_while_staging_aborts_the_run(tmp_path, monkeypatch, capsys):
+    specs = _specs(tmp_path)
+    write_rendered = init_skill.write_rendered
+
+    def racing_write(skill_dir, files):
+        write_rendered(skill_dir, files)
+        (tmp_path / "team" / "delta").mkdir(exist_ok=True)
+
+    monkeypatch.setattr(init_skill, "write_rendered", racing_write)
+
+    assert init_skills(specs, jobs=1) is None
+
+    assert "appeared while staging" in capsys.readouterr().out
+    assert _leftovers(tmp_path) == ["team/delta"]  # someone else's directory is left alone
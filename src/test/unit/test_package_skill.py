@@ -0,0 +1,208 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for package_skill.py: deterministic archives and manifest reuse between runs."""
+
+import json
+import os
+import random
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import package_skill
+from package_skill import manifest_path_for
+
+
+@pytest.fixture
+def skill(tmp_path, make_skill):
+    """A skill with text, an executable script and a nested data file."""
+    folder = make_skill(tmp_path / "skills", "alpha", body="# Alpha\n\n" + "Use the script.\n" * 50)
+    (folder / "scripts").mkdir()
+    (folder / "scripts" / "run.sh").write_text("#!/bin/sh\necho run\n", encoding="utf-8")
+    (folder / "scripts" / "run.sh").chmod(0o755)
+    (folder / "data").mkdir()
+    (folder / "data" / "table.csv").write_text("a,b\n1,2\n" * 200, encoding="utf-8")
+    return folder
+
+
+@pytest.fixture
+def hashed(monkeypatch, skill):
+    """Skill files package_skill.py reads to hash, in order."""
+    paths = []
+    real_hash_file = package_skill.hash_file
+
+    def hash_file(path):
+        if skill in Path(path).parents:
+            paths.append(Path(path).relative_to(skill).as_posix())
+        return real_hash_file(path)
+
+    monkeypatch.setattr(package_skill, "hash_file", hash_file)
+    return paths
+
+
+def _touch(path, seconds=10):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_archives_are_byte_identical_across_runs(tmp_path, skill):
+    first = package_skill.package_skill(skill, tmp_path / "one", use_cache=False)
+    for path in skill.rglob("*"):
+        _touch(path)
+    second = package_skill.package_skill(skill, tmp_path / "two", use_cache=False)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert zipfile.ZipFile(first).getinfo("alpha/scripts/run.sh").external_attr >> 16 & 0o777 == 0o755
+
+
+def test_unchanged_files_keep_their_manifest_hashes(tmp_path, skill, hashed):
+    archive = package_skill.package_skill(skill, tmp_path / "dist")
+    assert sorted(hashed) == ["SKILL.md", "data/table.csv", "scripts/run.sh"]
+    manifest = json.loads(manifest_path_for(archive).read_text())
+    assert set(manifest["files"]) == {"alpha/SKILL.md", "alpha/data/table.csv", "alpha/scripts/run.sh"}
+
+    hashed.clear()
+    assert package_skill.package_skill(skill, tmp_path / "dist") == archive
+    assert hashed == []
+
+
+def test_up_to_date_archive_is_left_alone(tmp_path, skill, capsys):
+    archive = package_skill.package_skill(skill, tmp_path / "dist")
+    before = archive.stat().st_mtime_ns
+    capsys.readouterr()
+
+    package_skill.package_skill(skill, tmp_path / "dist")
+
+    assert "Up to date" in capsys.readouterr().out
+    assert archive.stat().st_mtime_ns == before
+
+
+def test_archive_matches_rejects_a_replaced_archive(tmp_path, skill, capsys):
+    archive = package_skill.package_skill(skill, tmp_path / "dist")
+    manifest = json.loads(manifest_path_for(archive).read_text())
+    expected = archive.read_bytes()
+    assert package_skill.archive_matches(archive, manifest)
+
+    _touch(archive)
+    assert not package_skill.archive_matches(archive, manifest)
+    assert not package_skill.archive_matches(tmp_path / "missing.skill", manifest)
+    assert not package_skill.archive_matches(archive, {"archive": None})
+
+    capsys.readouterr()
+    package_skill.package_skill(skill, tmp_path / "dist")
+    out = capsys.readouterr().out
+    assert "Up to date" not in out and "Reused" not in out  # an unknown archive is not copied from
+    assert archive.read_bytes() == expected
+
+
+def test_touching_one_file_rehashes_only_that_entry(tmp_path, skill, hashed, capsys):
+    package_skill.package_skill(skill, tmp_path / "dist")
+    hashed.clear()
+    _touch(skill / "data" / "table.csv")
+    capsys.readouterr()
+
+    archive = package_skill.package_skill(skill, tmp_path / "dist")
+
+    assert hashed == ["data/table.csv"]
+    assert "Up to date" in capsys.readouterr().out  # same contents, so the archive stands
+    manifest = json.loads(manifest_path_for(archive).read_text())
+    assert manifest["files"]["alpha/data/table.csv"]["mtime_ns"] == (skill / "data" / "table.csv").stat().st_mtime_ns
+    hashed.clear()
+    package_skill.package_skill(skill, tmp_path / "dist")
+    assert hashed == []  # the new mtime was recorded
+
+    (skill / "SKILL.md").write_text("---\nname: alpha\ndescription: Edited.\n---\n", encoding="utf-8")
+    package_skill.package_skill(skill, tmp_path / "dist")
+    out = capsys.readouterr().out
+    assert hashed == ["SKILL.md"]
+    assert "Added: alpha/SKILL.md" in out
+    assert "Reused: alpha/data/table.csv" in out and "Reused: alpha/scripts/run.sh" in out
+
+
+def _mixed_bytes(size, seed=0):
+    """Bytes that deflate to roughly 60%: random runs between runs of zeros."""
+    rng = random.Random(seed)
+    return b"".join(rng.randbytes(60) + bytes(40) for _ in range(size // 100))
+
+
+@pytest.mark.parametrize("arcname, data, expected", [
+    ("notes.md", b"Use the script.\n" * 100, (zipfile.ZIP_DEFLATED, 9)),
+    ("table.csv", b"", (zipfile.ZIP_STORED, None)),
+    ("logo.png", b"\0" * 4096, (zipfile.ZIP_STORED, None)),
+    ("noise.bin", random.Random(0).randbytes(4096), (zipfile.ZIP_STORED, None)),
+    ("zeros.bin", bytes(4096), (zipfile.ZIP_DEFLATED, 9)),
+    ("mixed.bin", _mixed_bytes(100_000), (zipfile.ZIP_DEFLATED, 6)),
+])
+def test_choose_codec(arcname, data, expected):
+    assert package_skill.choose_codec(arcname, data) == expected
+
+
+def test_archives_do_not_depend_on_the_number_of_jobs(tmp_path, skill):
+    rng = random.Random(1)
+    (skill / "assets").mkdir()
+    for i in range(40):
+        (skill / "assets" / f"noise{i}.bin").write_bytes(rng.randbytes(rng.randrange(1, 20_000)))
+        (skill / "assets" / f"mixed{i}.dat").write_bytes(_mixed_bytes(rng.randrange(100, 50_000), seed=i))
+        (skill / "assets" / f"notes{i}.md").write_text("Use the script.\n" * rng.randrange(1, 500), encoding="utf-8")
+
+    serial = package_skill.package_skill(skill, tmp_path / "one", use_cache=False, jobs=1)
+    parallel = package_skill.package_skill(skill, tmp_path / "eight", use_cache=False, jobs=8)
+
+    assert serial.read_bytes() == parallel.read_bytes()
+    methods = {(info.filename.rsplit(".", 1)[-1], info.compress_type) for info in zipfile.ZipFile(parallel).infolist()}
+    assert {("bin", zipfile.ZIP_STORED), ("dat", zipfile.ZIP_DEFLATED), ("md", zipfile.ZIP_DEFLATED)} <= methods
+    codecs = {record["codec"] for record in json.loads(manifest_path_for(parallel).read_text())["files"].values()}
+    assert codecs == {"stored", "deflate-6", "deflate-9"}
+
+
+def test_large_files_stream_into_a_valid_archive(tmp_path, skill, monkeypatch):
+    size = package_skill.STREAM_THRESHOLD + package_skill.CHUNK_SIZE // 2
+    (skill / "data" / "big.log").write_bytes(b"line of log output\n" * (size // 19 + 1))
+    (skill / "data" / "big.bin").write_bytes(random.Random(2).randbytes(size))
+    # Deflate random bytes anyway, so the streamed entry has to be rewritten as stored
+    choose_codec = package_skill.choose_codec
+    monkeypatch.setattr(package_skill, "choose_codec", lambda arcname, data: (
+        (zipfile.ZIP_DEFLATED, 6) if arcname.endswith(".bin") else choose_codec(arcname, data)))
+
+    streamed = package_skill.package_skill(skill, tmp_path / "streamed", use_cache=False,
+                                           report_path=tmp_path / "report.json")
+
+    with zipfile.ZipFile(streamed) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.getinfo("alpha/data/big.log").compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.getinfo("alpha/data/big.bin").compress_type == zipfile.ZIP_STORED
+        assert zipf.read("alpha/data/big.bin") == (skill / "data" / "big.bin").read_bytes()
+    report = {entry["name"]: entry for entry in json.loads((tmp_path / "report.json").read_text())["entries"]}
+    assert report["alpha/data/big.log"]["streamed"] and report["alpha/data/big.bin"]["streamed"]
+    assert not report["alpha/SKILL.md"]["streamed"]
+
+    # Streaming is only a memory bound: the bytes match reading the files whole
+    monkeypatch.setattr(package_skill, "STREAM_THRESHOLD", float("inf"))
+    whole = package_skill.package_skill(skill, tmp_path / "whole", use_cache=False)
+    assert whole.read_bytes() == streamed.read_bytes()
+
+
+@pytest.mark.parametrize("budgets, message", [
+    ({"max_file_size": 1000}, "1 file(s) exceed the per-file budget of"),
+    ({"max_total_size": 2000}, "over the archive budget of"),
+])
+def test_size_budgets_fail_before_anything_is_read(tmp_path, skill, hashed, capsys, budgets, message):
+    assert package_skill.package_skill(skill, tmp_path / "dist", **budgets) is None
+
+    out = capsys.readouterr().out
+    assert "Size budget exceeded" in out and message in out
+    assert hashed == [] and not (tmp_path / "dist" / "alpha.skill").exists()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1048576", 1048576), ("512K", 512 * 1024), ("50M", 50 * 1024 ** 2), ("50MB", 50 * 1024 ** 2),
+    ("2g", 2 * 1024 ** 3), ("1.5MiB", 3 * 1024 ** 2 // 2),
+])
+def test_parse_size(text, expected):
+    assert package_skill.parse_size(text) == expected
+
+
+def test_parse_size_rejects_nonsense():
+    with pytest.raises(package_skill.argparse.ArgumentTypeError):
+        package_skill.parse_size("lots")
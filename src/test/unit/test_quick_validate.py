@@ -0,0 +1,163 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for quick_validate.py: fast frontmatter parsing against PyYAML, and checks on .skill archives."""
+
+import itertools
+import stat
+import warnings
+import zipfile
+
+import pytest
+import yaml
+
+from quick_validate import find_archive_problems, parse_frontmatter, parse_simple_frontmatter, validate_skill
+
+# (frontmatter, handled by the fast parser); everything else must fall back to PyYAML
+CASES = [
+    ("name: my-skill\ndescription: Does a thing.", True),
+    ("name: 'my-skill'\ndescription: \"Quoted: with a colon\"", True),
+    ("description: 'It''s quoted'", True),
+    ("description: It's plain", True),
+    ("description: see http://example.com/a:b", True),
+    ("description: ratio 3:1 works", True),
+    ("description: has#hash", True),
+    ("description: use `code`", True),
+    ("description: trailing   ", True),
+    ("license: Complete terms in LICENSE.txt\nallowed-tools: Read, Write", True),
+    ("metadata:\n  author: me\n  version: '1.0'", True),
+    ("metadata:", True),
+    # Colons and comments YAML reads differently
+    ("description: a: b", False),
+    ("description: ends with colon:", False),
+    ("description: has # a comment", False),
+    # Block scalars, flow collections and lists
+    ("description: |\n  Line one\n  Line two", False),
+    ("description: >\n  Folded\n  text", False),
+    ("description: >-\n  Folded\n  text", False),
+    ("description: multi\n  line plain", False),
+    ("tags:\n  - one\n  - two", False),
+    ("tags: [one, two]", False),
+    ("description: {a: b}", False),
+    ("description: - dash", False),
+    # Values that aren't strings, escapes, duplicates and malformed quoting
+    ("metadata:\n  version: 1.0", False),
+    ("description: yes", False),
+    ("description: null", False),
+    ("description: ~", False),
+    ("description: 2024-01-01", False),
+    ("description: \"escaped \\\" quote\"", False),
+    ("name: x\nname: y", False),
+    ("description: 'unterminated", False),
+    ("description: 'a' trailing", False),
+    ("description: @at", False),
+    ("metadata:\n  a: b\n    c: d", False),
+]
+
+
+def _yaml(text):
+    """What PyYAML makes of the text: (data, None) or (None, error)."""
+    try:
+        data = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return None, "error"
+    return data, None
+
+
+@pytest.mark.parametrize("text, fast", CASES)
+def test_frontmatter_matches_pyyaml(text, fast):
+    assert (parse_simple_frontmatter(text) is not None) is fast
+
+    frontmatter, error = parse_frontmatter(text)
+    expected, yaml_error = _yaml(text)
+    if yaml_error:
+        assert frontmatter is None and error.startswith("Invalid YAML")
+    else:
+        assert frontmatter == expected and error is None
+
+
+VALUES = ["plain", "two words", "'single'", "'it''s'", '"double"', '"with: colon"', "a:b", "a: b", "x #y", "x#y",
+          "true", "False", "~", "1.5", "0x1F", ".5", "+1", "-", "- item", "[a]", "{a: b}", "|", ">", "&anchor",
+          "*alias", "!tag", "%pct", "@at", "`tick`", "=eq", "<lt", "end:", "'open", '"open', '"esc\\n"', "''", '""']
+
+
+@pytest.mark.parametrize("value, nested", list(itertools.product(VALUES, [False, True])))
+def test_fast_parser_never_disagrees_with_pyyaml(value, nested):
+    text = f"name: skill\nmetadata:\n  note: {value}" if nested else f"name: skill\ndescription: {value}"
+
+    parsed = parse_simple_frontmatter(text)
+
+    expected, error = _yaml(text)
+    assert parsed is None or (error is None and parsed == expected)
+
+
+SKILL_MD = "---\nname: alpha\ndescription: Does a thing when asked.\n---\n\n# Alpha\n"
+
+
+def _archive(path, entries):
+    """Write a zip of (name or ZipInfo, data) entries, duplicates and all."""
+    with warnings.catch_warnings(), zipfile.ZipFile(path, "w") as zipf:
+        warnings.simplefilter("ignore")  # zipfile warns about duplicate names but writes them
+        for name, data in entries:
+            zipf.writestr(name, data)
+    return path
+
+
+def _symlink(name, target):
+    info = zipfile.ZipInfo(name)
+    info.external_attr = (stat.S_IFLNK | 0o777) << 16
+    return info, target
+
+
+@pytest.mark.parametrize("entries, problem", [
+    ([("alpha/SKILL.md", SKILL_MD), ("alpha/../evil.sh", "x")], "Unsafe entry 'alpha/../evil.sh': path traversal"),
+    ([("alpha/SKILL.md", SKILL_MD), ("/etc/cron.d/evil", "x")], "Unsafe entry '/etc/cron.d/evil': absolute path"),
+    ([("alpha/SKILL.md", SKILL_MD), ("C:/evil.bat", "x")], "Unsafe entry 'C:/evil.bat': absolute path"),
+    ([("alpha/SKILL.md", SKILL_MD), ("alpha\\..\\evil.sh", "x")],
+     "Unsafe entry 'alpha\\..\\evil.sh': backslash in path"),
+    ([("alpha/SKILL.md", SKILL_MD), _symlink("alpha/passwd", "/etc/passwd")],
+     "Unsafe entry 'alpha/passwd': symbolic link"),
+    ([("alpha/SKILL.md", SKILL_MD), ("alpha/SKILL.md", "---\nname: other\n---\n")],
+     "Duplicate entry 'alpha/SKILL.md'"),
+    ([("SKILL.md", SKILL_MD)], "Entry 'SKILL.md' is not inside the skill folder"),
+    ([("alpha/SKILL.md", SKILL_MD), ("beta/SKILL.md", SKILL_MD)],
+     "Archive must contain a single top-level skill folder, found: alpha, beta"),
+    ([("beta/SKILL.md", SKILL_MD)], "Top-level folder 'beta' does not match skill name 'alpha'"),
+    ([("alpha/README.md", "# Alpha\n")], "SKILL.md not found"),
+    ([("alpha/SKILL.md", "# No frontmatter\n")], "No YAML frontmatter found"),
+], ids=["traversal", "absolute", "drive", "backslash", "symlink", "duplicate", "top-level-file", "two-folders",
+        "folder-mismatch", "no-skill-md", "no-frontmatter"])
+def test_find_archive_problems_rejects_unsafe_archives(tmp_path, entries, problem):
+    archive = _archive(tmp_path / "alpha.skill", entries)
+
+    assert problem in find_archive_problems(archive)
+    assert list(tmp_path.iterdir()) == [archive]  # nothing was extracted
+
+
+def test_find_archive_problems_accepts_a_packaged_skill(tmp_path, make_skill):
+    import package_skill
+
+    folder = make_skill(tmp_path / "skills", "alpha")
+    (folder / "scripts").mkdir()
+    (folder / "scripts" / "run.sh").write_text("#!/bin/sh\n", encoding="utf-8")
+    archive = package_skill.package_skill(folder, tmp_path / "dist", use_cache=False)
+
+    assert find_archive_problems(archive) == []
+    assert validate_skill(archive) == (True, "Skill is valid!")
+
+
+def test_find_archive_problems_enforces_entry_and_size_limits(tmp_path):
+    archive = _archive(tmp_path / "alpha.skill", [("alpha/SKILL.md", SKILL_MD)]
+                       + [(f"alpha/data/{i}.txt", "x" * 1000) for i in range(5)])
+
+    assert find_archive_problems(archive) == []
+    assert find_archive_problems(archive, max_entries=5) == ["Archive has too many entries (6). Maximum is 5."]
+    problems = find_archive_problems(archive, max_uncompressed_size=4096)
+    assert problems == [f"Archive is too large uncompressed ({5000 + len(SKILL_MD)} bytes). Maximum is 4096 bytes."]
+
+
+def test_find_archive_problems_rejects_files_that_are_not_zips(tmp_path):
+    archive = tmp_path / "alpha.skill"
+    archive.write_bytes(b"not a zip")
+
+    [problem] = find_archive_problems(archive)
+    assert problem.startswith("Not a valid .skill archive")
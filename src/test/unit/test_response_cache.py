@@ -0,0 +1,125 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for response_cache.py: expiry, LRU eviction, fingerprint keys and the opt-in flag."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import response_cache
+from response_cache import CachedAgentRunner, ResponseCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable time.time() for the cache."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(response_cache.time, "time", lambda: now.value)
+    return now
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "responses.sqlite", ttl_hours=1)
+    cache.put("k", "agent", "https://p", "f", {"output_text": "hi"})
+
+    clock.value += 3599
+    assert cache.get("k") == {"output_text": "hi"}
+    clock.value += 2
+    assert cache.get("k") is None
+    assert cache.stats["expired"] == 1 and cache.summary()["entries"] == 0
+    cache.close()
+
+
+def test_opening_purges_expired_entries_and_ttl_zero_keeps_them(tmp_path, clock):
+    path = tmp_path / "responses.sqlite"
+    cache = ResponseCache(path, ttl_hours=0)
+    cache.put("old", "agent", "https://p", "f", {"output_text": "old"})
+    clock.value += 10 * 3600
+    assert cache.get("old") is not None
+    cache.close()
+
+    cache = ResponseCache(path, ttl_hours=1)
+    assert cache.stats["expired"] == 1 and cache.summary()["entries"] == 0
+    cache.close()
+
+
+def test_eviction_drops_the_least_recently_used_entries(tmp_path, clock):
+    text = "x" * 400
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_mb=1200 / 1024 / 1024)
+    for key in ("a", "b"):
+        cache.put(key, "agent", "https://p", "f", {"output_text": text})
+        clock.value += 1
+    cache.get("a")  # b is now the least recently used
+    clock.value += 1
+    cache.put("c", "agent", "https://p", "f", {"output_text": text})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats["evicted"] == 1
+    assert cache.summary()["bytes"] <= cache.max_bytes
+    cache.close()
+
+
+class FakeRunner:
+    name = "Pitseleh"
+    project_endpoint = "https://p"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, query):
+        from pytest_agent_evals import AgentResponse
+
+        self.calls += 1
+        return AgentResponse(type="foundry_agent", output_text=f"answer {self.calls}", tool_calls=[],
+                             tool_definitions=[], output_items=[])
+
+
+def test_a_changed_agent_fingerprint_misses_the_cache(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+    runner = FakeRunner()
+
+    first = asyncio.run(CachedAgentRunner(runner, cache, fingerprint="v1").run("q"))
+    again = CachedAgentRunner(runner, cache, fingerprint="v1")
+    assert asyncio.run(again.run("q")).output_text == first.output_text and again.hit
+    edited = CachedAgentRunner(runner, cache, fingerprint="v2")
+    assert asyncio.run(edited.run("q")).output_text == "answer 2" and not edited.hit
+
+    assert runner.calls == 2
+    assert cache_key("Pitseleh", "https://p", "q", "v1") != cache_key("Pitseleh", "https://p", "q", "v2")
+    cache.close()
+
+
+def _config(tmp_path, **options):
+    defaults = {"--response-cache": False, "--response-cache-path": None}
+    return SimpleNamespace(getoption=lambda name: {**defaults, **options}[name],
+                           cache=SimpleNamespace(mkdir=lambda name: tmp_path / name))
+
+
+def test_the_cache_is_off_unless_asked_for(tmp_path):
+    config = _config(tmp_path)
+    response_cache.session_start(config)
+    assert config._response_cache_path is None
+
+    config = _config(tmp_path, **{"--response-cache": True})
+    response_cache.session_start(config)
+    assert config._response_cache_path == tmp_path / "pitseleh" / "responses.sqlite"
+
+    config = _config(tmp_path, **{"--response-cache-path": "elsewhere.sqlite"})
+    response_cache.session_start(config)
+    assert config._response_cache_path == "elsewhere.sqlite"
+
+
+def test_responses_deserialize_without_patching_the_plugin():
+    from pytest_agent_evals import AgentResponse
+
+    original = AgentResponse.__dict__["from_json"]
+    response_cache.configure(SimpleNamespace())
+    assert AgentResponse.__dict__["from_json"] is original
+
+    data = {"type": "foundry_agent", "output_text": "hi", "tool_calls": [], "tool_definitions": [],
+            "output_items": [{"id": "m1", "type": "message", "role": "assistant", "status": "completed",
+                              "content": [{"type": "output_text", "text": "hi", "annotations": []}]}]}
+    response = response_cache.response_from_json(data)
+    assert response.to_json() == AgentResponse.from_json(data).to_json() | {"instructions": None}
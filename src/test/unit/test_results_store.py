@@ -0,0 +1,99 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for results_store.py: runs, summaries, diffs and reusable results."""
+
+import pytest
+
+from results_store import ResultsStore, config_fingerprint
+
+
+def _row(row_id):
+    return {"dataset": "data.jsonl", "row_id": row_id, "agent_fingerprint": "a", "judge_fingerprint": "j",
+            "total_seconds": 1.5}
+
+
+def _result(row_id, result, score, inputs=None, reused=None):
+    return {"dataset": "data.jsonl", "row_id": row_id, "evaluator": "relevance", "score": score,
+            "result": result, "threshold": 3, "reason": "because", "inputs": inputs, "reused": reused}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite")
+    yield store
+    store.close()
+
+
+def test_runs_are_numbered_and_resolved(store):
+    first = store.add_run([_row("r1")], [_result("r1", "pass", 5)], started=1.0, label="base")
+    second = store.add_run([_row("r1")], [_result("r1", "fail", 1)], started=2.0, label="head")
+
+    assert store.resolve("latest") == second
+    assert store.resolve("latest~1") == first
+    assert store.resolve(first) == first
+    assert [run["label"] for run in store.runs()] == ["head", "base"]
+    with pytest.raises(ValueError):
+        store.resolve("latest~5")
+
+
+def test_summary_excludes_skipped_rows_from_the_pass_rate(store):
+    run = store.add_run([_row("r1"), _row("r2"), _row("r3")],
+                        [_result("r1", "pass", 5), _result("r2", "fail", 1),
+                         {**_result("r3", "skipped", None)}], started=1.0)
+
+    [summary] = store.summary([run])
+
+    assert (summary["total"], summary["passed"], summary["failed"], summary["skipped"]) == (3, 1, 1, 1)
+    assert summary["pass_rate"] == 0.5
+    assert summary["mean_score"] == 3
+
+
+def test_diff_reports_regressions_and_improvements(store):
+    base = store.add_run([_row("r1"), _row("r2")], [_result("r1", "pass", 5), _result("r2", "fail", 1)], started=1.0)
+    head = store.add_run([_row("r1"), _row("r2")], [_result("r1", "fail", 2), _result("r2", "pass", 4)], started=2.0)
+
+    [regressed] = store.diff(base, head)
+    [improved] = store.diff(base, head, improved=True)
+
+    assert (regressed["row_id"], regressed["base_result"], regressed["head_result"]) == ("r1", "pass", "fail")
+    assert improved["row_id"] == "r2"
+
+
+def test_diff_with_score_drop(store):
+    base = store.add_run([_row("r1")], [_result("r1", "pass", 5)], started=1.0)
+    head = store.add_run([_row("r1")], [_result("r1", "pass", 3.5)], started=2.0)
+
+    assert store.diff(base, head) == []
+    assert len(store.diff(base, head, score_drop=1.0)) == 1
+
+
+def test_reusable_keeps_the_latest_pass_or_fail_per_fingerprint(store):
+    first = store.add_run([_row("r1")], [_result("r1", "pass", 5, inputs="fp1")], started=1.0)
+    store.add_run([_row("r1")], [_result("r1", "error", 0, inputs="fp1")], started=2.0)
+
+    found = store.reusable(["fp1", "missing"])
+
+    assert set(found) == {"fp1"}
+    assert (found["fp1"]["result"], found["fp1"]["reused"]) == ("pass", first)
+
+
+def test_reused_results_keep_the_run_they_came_from(store):
+    first = store.add_run([_row("r1")], [_result("r1", "fail", 1, inputs="fp1")], started=1.0)
+    store.add_run([_row("r1")], [_result("r1", "fail", 1, inputs="fp1", reused=first)], started=2.0)
+
+    assert store.reusable(["fp1"])["fp1"]["reused"] == first
+
+
+def test_reusable_handles_more_fingerprints_than_sqlite_parameters(store):
+    results = [{**_result(f"r{i}", "pass", 5, inputs=f"fp{i}"), "row_id": f"r{i}"} for i in range(1200)]
+    store.add_run([_row(f"r{i}") for i in range(1200)], results, started=1.0)
+
+    assert len(store.reusable(f"fp{i}" for i in range(1200))) == 1200
+
+
+def test_config_fingerprint_ignores_key_order_and_function_addresses():
+    def agent():
+        pass
+
+    assert config_fingerprint({"a": 1, "b": agent}) == config_fingerprint({"b": agent, "a": 1})
+    assert config_fingerprint({"a": 1}) != config_fingerprint({"a": 2})
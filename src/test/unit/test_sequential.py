@@ -0,0 +1,119 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for sequential.py: SPRT boundaries and the early-stop gate rule."""
+
+import math
+
+import pytest
+
+from sequential import SPRT, EarlyStopping
+
+
+def _gate(sample, case):
+    return 1.0
+
+
+_gate.gate = True
+
+
+def _spec(name, kind, grader=None):
+    kwargs = {"grader": grader} if grader else {}
+    return {"name": name, "kind": kind, "threshold": 0.5, "kwargs": kwargs}
+
+
+def test_all_passes_settle_as_pass_on_the_upper_boundary():
+    test = SPRT(target=0.9, margin=0.05, confidence=0.95, min_rows=1)
+    needed = math.ceil(test.upper / test.step_pass)
+    for _ in range(needed - 1):
+        assert test.observe(True) is None
+    assert test.observe(True) == "pass"
+    assert test.llr >= test.upper
+
+
+def test_failures_settle_as_fail_on_the_lower_boundary():
+    test = SPRT(target=0.9, margin=0.05, confidence=0.95, min_rows=1)
+    needed = math.ceil(test.lower / test.step_fail)
+    for _ in range(needed - 1):
+        assert test.observe(False) is None
+    assert test.observe(False) == "fail"
+
+
+def test_no_decision_before_min_rows():
+    test = SPRT(min_rows=10)
+    for _ in range(9):
+        assert test.observe(False) is None
+    assert test.llr < test.lower
+    assert test.observe(False) == "fail"
+
+
+def test_decision_is_final():
+    test = SPRT(min_rows=1)
+    while test.observe(False) is None:
+        pass
+    total = test.total
+    assert test.observe(True) == "fail"
+    assert test.total == total
+
+
+@pytest.mark.parametrize("settings", [{"confidence": 0.5}, {"confidence": 1.0}, {"target": 0.5, "margin": 0.0}])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        SPRT(**settings)
+
+
+def test_only_pass_and_fail_results_are_counted():
+    early_stop = EarlyStopping(min_rows=1)
+    early_stop.observe({"a": {"result": "pass"}, "b": {"result": "error"}, "c": {"result": "skipped"}})
+    assert set(early_stop.tests) == {"a"}
+
+
+def _settle(early_stop, name, passed):
+    while early_stop.decision(name) is None:
+        early_stop.observe({name: {"result": "pass" if passed else "fail"}})
+
+
+def test_settled_evaluators_are_stopped():
+    early_stop = EarlyStopping(min_rows=1)
+    _settle(early_stop, "done", passed=True)
+    specs = [_spec("done", "builtin"), _spec("open", "builtin")]
+
+    running, stopped = early_stop.active(specs, "row-1")
+
+    assert [spec["name"] for spec in running] == ["open"]
+    assert stopped["done"]["result"] == "skipped"
+    assert "settled as pass" in stopped["done"]["reason"]
+
+
+def test_gates_keep_running_while_a_judged_evaluator_is_open():
+    early_stop = EarlyStopping(min_rows=1)
+    _settle(early_stop, "gate", passed=True)
+    specs = [_spec("gate", "code", _gate), _spec("judge", "builtin")]
+
+    running, stopped = early_stop.active(specs, "row-1")
+
+    assert {spec["name"] for spec in running} == {"gate", "judge"}
+    assert stopped == {}
+
+
+def test_gates_stop_once_every_judged_evaluator_is_settled():
+    early_stop = EarlyStopping(min_rows=1)
+    _settle(early_stop, "gate", passed=True)
+    _settle(early_stop, "judge", passed=False)
+    specs = [_spec("gate", "code", _gate), _spec("judge", "prompt")]
+
+    running, stopped = early_stop.active(specs, "row-1")
+
+    assert running == []
+    assert set(stopped) == {"gate", "judge"}
+
+
+def test_asking_twice_for_a_row_counts_it_once():
+    early_stop = EarlyStopping(min_rows=1)
+    _settle(early_stop, "done", passed=True)
+    specs = [_spec("done", "builtin")]
+
+    early_stop.active(specs, "row-1")
+    early_stop.active(specs, "row-1")
+    early_stop.active(specs, "row-2")
+
+    assert early_stop.summary()["done"]["stopped"] == 2
@@ -0,0 +1,60 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for skill_delta.py: .skillpatch round trips and refusal of a wrong base."""
+
+import zipfile
+
+import pytest
+
+from package_skill import package_skill
+from skill_delta import apply_delta, create_delta
+
+
+def _package(folder, out):
+    archive = package_skill(folder, out, use_cache=False)
+    assert archive is not None
+    return archive
+
+
+@pytest.fixture
+def releases(tmp_path, capsys, make_skill):
+    """Two releases of one skill: a reference file changed, one added, one removed."""
+    folder = make_skill(tmp_path / "src", "demo")
+    (folder / "references").mkdir()
+    (folder / "references" / "keep.md").write_text("unchanged\n" * 200, encoding="utf-8")
+    (folder / "references" / "edit.md").write_text("first\n", encoding="utf-8")
+    (folder / "references" / "drop.md").write_text("gone soon\n", encoding="utf-8")
+    old = _package(folder, tmp_path / "v1")
+
+    (folder / "references" / "edit.md").write_text("second\n", encoding="utf-8")
+    (folder / "references" / "drop.md").unlink()
+    (folder / "references" / "new.md").write_text("added\n", encoding="utf-8")
+    new = _package(folder, tmp_path / "v2")
+    capsys.readouterr()
+    return old, new
+
+
+def test_delta_round_trip_rebuilds_the_archive_byte_for_byte(tmp_path, releases):
+    old, new = releases
+
+    patch = create_delta(old, new, tmp_path / "demo.skillpatch")
+    rebuilt = apply_delta(old, patch, tmp_path / "rebuilt.skill")
+
+    assert rebuilt.read_bytes() == new.read_bytes()
+    with zipfile.ZipFile(patch) as zf:
+        names = set(zf.namelist())
+    assert "demo/references/keep.md" not in names
+    assert {"demo/references/edit.md", "demo/references/new.md"} <= names
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_delta_refuses_a_different_base(tmp_path, releases, capsys, make_skill):
+    old, new = releases
+    patch = create_delta(old, new, tmp_path / "demo.skillpatch")
+    other = _package(make_skill(tmp_path / "other", "demo", body="# Other\n"), tmp_path / "v0")
+    capsys.readouterr()
+
+    assert apply_delta(other, patch, tmp_path / "rebuilt.skill") is None
+    assert "is not the archive this patch was made from" in capsys.readouterr().out
+    assert not (tmp_path / "rebuilt.skill").exists()
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,140 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for skill_files.py: .skillignore rules and the pruning skill folder walk."""
+
+import os
+
+import pytest
+
+from skill_files import DEFAULT_IGNORE_PATTERNS, IgnoreMatcher, iter_skill_files
+
+
+@pytest.mark.parametrize("rules, relpath, is_dir, expected", [
+    # A pattern without a slash matches at any depth
+    (["*.log"], "debug.log", False, True),
+    (["*.log"], "logs/deep/debug.log", False, True),
+    (["*.log"], "debug.log.txt", False, False),
+    # A leading or middle slash anchors the pattern to the skill root
+    (["/build"], "build", True, True),
+    (["/build"], "src/build", True, False),
+    (["docs/*.md"], "docs/intro.md", False, True),
+    (["docs/*.md"], "guide/docs/intro.md", False, False),
+    (["docs/*.md"], "docs/sub/intro.md", False, False),
+    # "**/" matches zero or more directories, a trailing "/**" everything inside
+    (["**/tmp"], "tmp", True, True),
+    (["**/tmp"], "a/b/tmp", True, True),
+    (["a/**/b"], "a/b", False, True),
+    (["a/**/b"], "a/x/y/b", False, True),
+    (["a/**/b"], "c/a/b", False, False),
+    (["logs/**"], "logs/2024/run.txt", False, True),
+    (["logs/**"], "logs", True, False),
+    (["a**b"], "a/b", False, False),
+    # The last matching rule decides, so "!" re-includes only after the rule it undoes
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["*.log", "!keep.log"], "drop.log", False, True),
+    (["!keep.log", "*.log"], "keep.log", False, True),
+    # A trailing slash matches directories only
+    (["out/"], "out", True, True),
+    (["out/"], "out", False, False),
+    (["out/", "!out/"], "out", True, False),
+    # Character classes, "?", escapes, comments and trailing spaces
+    (["file?.txt"], "file1.txt", False, True),
+    (["file?.txt"], "file10.txt", False, False),
+    (["[ab].txt"], "b.txt", False, True),
+    (["[!ab].txt"], "b.txt", False, False),
+    (["\\#notes"], "#notes", False, True),
+    (["# notes"], "# notes", False, False),
+    (["\\!bang"], "!bang", False, True),
+    (["draft.md   "], "draft.md", False, True),
+    ([""], "anything", False, False),
+])
+def test_ignore_matcher(rules, relpath, is_dir, expected):
+    assert IgnoreMatcher(rules).ignored(relpath, is_dir=is_dir) is expected
+
+
+def test_reincluded_reports_the_deciding_rule():
+    matcher = IgnoreMatcher(["env/", "!env/"])
+    assert matcher.reincluded("env", is_dir=True)
+    assert not matcher.reincluded("other", is_dir=True)
+    assert not IgnoreMatcher([]).reincluded("env", is_dir=True)
+
+
+def _tree(root, paths):
+    for relpath in paths:
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relpath, encoding="utf-8")
+
+
+def _walk(root):
+    return sorted(relpath for relpath, _, _ in iter_skill_files(root))
+
+
+TREE = [
+    "SKILL.md",
+    "scripts/run.py",
+    "scripts/__pycache__/run.cpython-311.pyc",
+    "scripts/helper.pyc",
+    ".git/HEAD",
+    "node_modules/pkg/index.js",
+    "notes/draft.md",
+    "notes/keep.md",
+    "env/pyvenv.cfg",
+    "env/lib/site.py",
+    "tools/.venv/bin/python",
+]
+
+
+@pytest.mark.parametrize("skillignore, expected", [
+    (None, ["SKILL.md", "notes/draft.md", "notes/keep.md", "scripts/run.py"]),
+    ("notes/\n!notes/keep.md\n", ["SKILL.md", "scripts/run.py"]),  # files inside a pruned directory stay out
+    ("notes/*\n!notes/keep.md\n", ["SKILL.md", "notes/keep.md", "scripts/run.py"]),
+    ("/notes/draft.md\n!node_modules/\n",
+     ["SKILL.md", "node_modules/pkg/index.js", "notes/keep.md", "scripts/run.py"]),
+    ("!env/\n", ["SKILL.md", "env/lib/site.py", "env/pyvenv.cfg", "notes/draft.md", "notes/keep.md",
+                 "scripts/run.py"]),
+    ("!*.pyc\n", ["SKILL.md", "notes/draft.md", "notes/keep.md", "scripts/helper.pyc", "scripts/run.py"]),
+])
+def test_iter_skill_files(tmp_path, skillignore, expected):
+    _tree(tmp_path, TREE)
+    if skillignore is not None:
+        (tmp_path / ".skillignore").write_text(skillignore, encoding="utf-8")
+
+    assert _walk(tmp_path) == expected
+
+
+def test_iter_skill_files_prunes_ignored_directories_without_listing_them(tmp_path, monkeypatch):
+    _tree(tmp_path, TREE)
+    (tmp_path / ".skillignore").write_text("notes/\n", encoding="utf-8")
+    listed = []
+    scandir = os.scandir
+
+    def tracking_scandir(path):
+        listed.append(os.path.relpath(path, tmp_path).replace(os.sep, "/"))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", tracking_scandir)
+    _walk(tmp_path)
+
+    assert sorted(listed) == [".", "env", "scripts", "tools"]  # env is listed to find pyvenv.cfg, then pruned
+
+
+def test_iter_skill_files_yields_stat_results_and_skips_symlinked_directories(tmp_path):
+    _tree(tmp_path, ["SKILL.md", "outside/secret.txt"])
+    skill = tmp_path
+    try:
+        (skill / "linked").symlink_to(skill / "outside", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks are not available")
+
+    files = {relpath: (path, st) for relpath, path, st in iter_skill_files(skill)}
+
+    assert sorted(files) == ["SKILL.md", "outside/secret.txt"]
+    path, st = files["SKILL.md"]
+    assert st.st_size == os.stat(path).st_size == len("SKILL.md")
+
+
+def test_default_patterns_combine_with_skill_rules():
+    matcher = IgnoreMatcher(list(DEFAULT_IGNORE_PATTERNS) + ["*.tmp"])
+    assert matcher.ignored("a/__pycache__", is_dir=True) and matcher.ignored("x.tmp")
+    assert matcher.ignored(".skillignore") and not matcher.ignored("SKILL.md")
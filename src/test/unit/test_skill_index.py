@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Unit tests for skill_index.py: change tracking and reuse of stored hashes and validation results."""
+
+import os
+from pathlib import Path
+
+import package_skill
+import quick_validate
+from skill_files import iter_skill_files
+from skill_index import SkillIndex
+
+
+def test_index_update_tracks_added_changed_and_removed_skills(tmp_path, make_skill):
+    root = tmp_path / "skills"
+    alpha = make_skill(root, "alpha")
+    make_skill(root, "beta")
+    with SkillIndex(tmp_path / "index.sqlite") as index:
+        first = index.update(root)
+        assert sorted(Path(path).name for path in first["added"]) == ["alpha", "beta"]
+
+        unchanged = index.update(root)
+        assert unchanged["added"] == unchanged["updated"] == [] and len(unchanged["unchanged"]) == 2
+
+        (alpha / "SKILL.md").write_text("---\nname: Alpha_Bad\ndescription: x\n---\n", encoding="utf-8")
+        make_skill(root, "gamma")
+        for path in (root / "beta").iterdir():
+            path.unlink()
+        (root / "beta").rmdir()
+        changes = index.update(root)
+
+        assert [Path(path).name for path in changes["updated"]] == ["alpha"]
+        assert [Path(path).name for path in changes["added"]] == ["gamma"]
+        assert [Path(path).name for path in changes["removed"]] == ["beta"]
+        skills = {Path(skill["path"]).name: skill for skill in index.skills(root)}
+        assert set(skills) == {"alpha", "gamma"}
+        assert not skills["alpha"]["valid"] and skills["gamma"]["valid"]
+
+
+def test_stored_problems_apply_only_while_files_are_unchanged(tmp_path, make_skill):
+    folder = make_skill(tmp_path / "skills", "alpha")
+    with SkillIndex(tmp_path / "index.sqlite") as index:
+        index.update(tmp_path / "skills")
+
+        def files():
+            return [(relpath, st) for relpath, _, st in iter_skill_files(folder)]
+
+        assert index.stored_problems(folder, files()) == []
+
+        st = (folder / "SKILL.md").stat()
+        os.utime(folder / "SKILL.md", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert index.stored_problems(folder, files()) is None
+        assert index.stored_problems(tmp_path / "elsewhere", []) is None
+
+
+def test_packager_and_validator_reuse_the_index_for_unchanged_skills(tmp_path, make_skill, monkeypatch):
+    folder = make_skill(tmp_path / "skills", "alpha")
+    index_path = tmp_path / "index.sqlite"
+    with SkillIndex(index_path) as index:
+        index.update(tmp_path / "skills")
+
+    def unexpected(*args):
+        raise AssertionError("an indexed skill was read again")
+
+    def hash_file(path):
+        if folder in Path(path).parents:
+            unexpected()
+        return real_hash_file(path)
+
+    real_hash_file = package_skill.hash_file
+    monkeypatch.setattr(package_skill, "hash_file", hash_file)
+    monkeypatch.setattr(package_skill, "validate_skill", unexpected)
+    monkeypatch.setattr(quick_validate, "find_problems", unexpected)
+    assert package_skill.package_skill(folder, tmp_path / "dist", index_path=index_path)
+    assert quick_validate.validate_skill(folder, index_path=index_path) == (True, "Skill is valid!")
+
+    (folder / "SKILL.md").write_text("---\nname: alpha\ndescription: Edited.\n---\n", encoding="utf-8")
+    monkeypatch.undo()
+    assert quick_validate.indexed_problems(folder, index_path) is None
+    assert quick_validate.validate_skill(folder, index_path=index_path) == (True, "Skill is valid!")